@@ -57,7 +57,11 @@ register(id="JobShop-v0", entry_point="jumanji.environments:JobShop")
 
 # Knapsack problem with 50 randomly generated items, a total budget
 # of 12.5, and a dense reward function.
-register(id="Knapsack-v1", entry_point="jumanji.environments:Knapsack")
+register(
+    id="Knapsack-v1",
+    entry_point="jumanji.environments:Knapsack",
+    size_kwarg="num_items",
+)
 
 
 ###
@@ -81,4 +85,4 @@ register(id="Maze-v0", entry_point="jumanji.environments:Maze")
 register(id="Snake-v1", entry_point="jumanji.environments:Snake")
 
 # TSP with 20 randomly generated cities and a dense reward function.
-register(id="TSP-v1", entry_point="jumanji.environments:TSP")
+register(id="TSP-v1", entry_point="jumanji.environments:TSP", size_kwarg="num_cities")
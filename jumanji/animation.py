@@ -0,0 +1,322 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Streaming animation writer. Unlike `Viewer.animate`, which keeps all the states of an episode
+to build a matplotlib animation, states are rendered as they are pushed and their frames are
+encoded to disk by a background thread, so memory does not grow with the episode length.
+"""
+
+import abc
+import io
+import os
+import queue
+import shutil
+import struct
+import subprocess
+import threading
+from types import TracebackType
+from typing import Any, Callable, Generic, Iterable, Optional, Type
+
+import jax
+import numpy as np
+from numpy.typing import NDArray
+from PIL import Image
+
+from jumanji.env import State
+
+# Time in seconds after which blocking queue operations check whether to stop.
+_POLL_INTERVAL = 0.1
+
+
+class FrameWriter(abc.ABC):
+    """Encodes uint8 RGB frames of shape (height, width, 3) one at a time."""
+
+    @abc.abstractmethod
+    def write(self, frame: NDArray) -> None:
+        """Appends a frame to the animation."""
+
+    @abc.abstractmethod
+    def close(self) -> None:
+        """Finalizes the animation."""
+
+
+class GifFrameWriter(FrameWriter):
+    """Writes an animated GIF frame by frame: each frame is encoded by Pillow with its own
+    (adaptive) color table and appended to the file, so no frame is kept in memory.
+    """
+
+    def __init__(self, path: str, interval: int = 200, loop: int = 0):
+        """
+        Args:
+            path: path of the GIF file.
+            interval: delay between frames in milliseconds, rounded to centiseconds.
+            loop: number of times the animation loops, 0 for forever.
+        """
+        self._file = open(path, "wb")
+        self._delay = max(round(interval / 10), 1)
+        self._loop = loop
+        self._shape: Optional[Any] = None
+
+    def write(self, frame: NDArray) -> None:
+        buffer = io.BytesIO()
+        Image.fromarray(frame).save(buffer, format="GIF")
+        data = buffer.getvalue()
+        if self._shape is None:
+            self._shape = frame.shape
+            self._write_header(*frame.shape[:2])
+        elif frame.shape != self._shape:
+            raise ValueError(
+                f"Expected frames of shape {self._shape}, got {frame.shape}."
+            )
+        # Single-frame GIF: header, logical screen descriptor, global color table, extensions,
+        # image descriptor, image data, trailer.
+        flags = data[10]
+        table_end = 13 + (3 * 2 ** ((flags & 7) + 1) if flags & 0x80 else 0)
+        color_table = data[13:table_end]
+        position = table_end
+        while data[position] == 0x21:  # Skip the extensions and their sub-blocks.
+            position += 2
+            while data[position]:
+                position += data[position] + 1
+            position += 1
+        descriptor = bytearray(data[position : position + 10])
+        image_data = data[position + 10 : -1]
+        if color_table and not descriptor[9] & 0x80:
+            # Turn the global color table into the frame's local color table.
+            descriptor[9] |= 0x80 | (flags & 7)
+            image_data = color_table + image_data
+        # Graphic control extension holding the frame's delay.
+        self._file.write(struct.pack("<4BH2B", 0x21, 0xF9, 4, 0, self._delay, 0, 0))
+        self._file.write(bytes(descriptor) + image_data)
+
+    def close(self) -> None:
+        self._file.write(b";")
+        self._file.close()
+
+    def _write_header(self, height: int, width: int) -> None:
+        # No global color table, every frame has its own.
+        self._file.write(b"GIF89a" + struct.pack("<2H3B", width, height, 0, 0, 0))
+        # Netscape extension holding the number of loops.
+        self._file.write(
+            b"\x21\xff\x0bNETSCAPE2.0" + struct.pack("<2BHB", 3, 1, self._loop, 0)
+        )
+
+
+class PngFrameWriter(FrameWriter):
+    """Writes each frame as a PNG file `frame_000000.png`, `frame_000001.png`, ... in a
+    directory, e.g. to be encoded to a video later with `ffmpeg -i frame_%06d.png`.
+    """
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._num_frames = 0
+
+    def write(self, frame: NDArray) -> None:
+        path = os.path.join(self.directory, f"frame_{self._num_frames:06d}.png")
+        Image.fromarray(frame).save(path)
+        self._num_frames += 1
+
+    def close(self) -> None:
+        pass
+
+
+class FFmpegFrameWriter(FrameWriter):
+    """Pipes raw frames to an `ffmpeg` process, which encodes them to any video format it
+    supports, e.g. MP4. Requires the `ffmpeg` executable.
+    """
+
+    def __init__(self, path: str, interval: int = 200):
+        """
+        Args:
+            path: path of the video file, its extension selects the format.
+            interval: delay between frames in milliseconds.
+        """
+        if shutil.which("ffmpeg") is None:
+            raise FileNotFoundError(
+                "The ffmpeg executable was not found, write a GIF or PNG frames instead."
+            )
+        self.path = path
+        self.fps = 1000 / interval
+        self._process: Optional[subprocess.Popen] = None
+        self._shape: Optional[Any] = None
+
+    def write(self, frame: NDArray) -> None:
+        # yuv420p, the most widely supported pixel format, requires an even width and height.
+        frame = np.pad(
+            frame, ((0, frame.shape[0] % 2), (0, frame.shape[1] % 2), (0, 0)), "edge"
+        )
+        if self._process is None:
+            self._shape = frame.shape
+            height, width = frame.shape[:2]
+            self._process = subprocess.Popen(
+                # fmt: off
+                [
+                    "ffmpeg", "-y", "-loglevel", "error",
+                    "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}",
+                    "-r", str(self.fps), "-i", "-",
+                    "-pix_fmt", "yuv420p", self.path,
+                ],
+                # fmt: on
+                stdin=subprocess.PIPE,
+            )
+        elif frame.shape != self._shape:
+            raise ValueError(
+                f"Expected frames of shape {self._shape}, got {frame.shape}."
+            )
+        assert self._process.stdin is not None
+        self._process.stdin.write(np.ascontiguousarray(frame, np.uint8).tobytes())
+
+    def close(self) -> None:
+        if self._process is None:
+            return
+        assert self._process.stdin is not None
+        self._process.stdin.close()
+        if self._process.wait() != 0:
+            raise RuntimeError(
+                f"ffmpeg failed to write {self.path} with exit code "
+                f"{self._process.returncode}."
+            )
+
+
+def make_frame_writer(path: str, interval: int = 200) -> FrameWriter:
+    """Frame writer selected by the extension of `path`: `.gif` for `GifFrameWriter`, no
+    extension for `PngFrameWriter` (a directory), and `FFmpegFrameWriter` otherwise.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".gif":
+        return GifFrameWriter(path, interval)
+    if not extension:
+        return PngFrameWriter(path)
+    return FFmpegFrameWriter(path, interval)
+
+
+class AnimationWriter(Generic[State]):
+    """Renders states as they are pushed and writes their frames with a `FrameWriter` in a
+    background thread. Use it as a context manager to start the thread, and to finalize the
+    animation when leaving.
+
+    At most `max_pending` frames wait for the thread, `push` blocks beyond that, so memory is
+    bounded regardless of the number of frames. With a jitted renderer, e.g. the `rasterize`
+    functions of the grid environments, `push` only dispatches the rendering and starts copying
+    the frame to host, both finishing while the thread encodes the previous frames:
+
+    ```python
+    from jumanji.environments.routing.snake.rasterizer import rasterize
+
+    with AnimationWriter("snake.gif", jax.jit(rasterize)) as writer:
+        state, timestep = env.reset(key)
+        writer.push(state)
+        while not timestep.last():
+            state, timestep = env.step(state, policy(timestep.observation))
+            writer.push(state)
+    ```
+    """
+
+    def __init__(
+        self,
+        path: str,
+        render: Callable[[State], Any],
+        interval: int = 200,
+        max_pending: int = 16,
+        frame_writer: Optional[FrameWriter] = None,
+    ):
+        """
+        Args:
+            path: path of the animation, see `make_frame_writer` for the supported formats.
+            render: function mapping a state to a uint8 RGB frame of shape (height, width, 3),
+                e.g. a rasterizer or a viewer's `render` in "rgb_array" mode.
+            interval: delay between frames in milliseconds.
+            max_pending: maximum number of frames waiting to be written.
+            frame_writer: frame writer to use instead of the one selected by `path`'s extension.
+        """
+        self.path = path
+        self.render = render
+        self.num_frames = 0
+        self._frame_writer = frame_writer or make_frame_writer(path, interval)
+        self._frames: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(
+            target=self._run, name="animation_writer", daemon=True
+        )
+        self._error: Optional[BaseException] = None
+
+    def __enter__(self) -> "AnimationWriter":
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        # The sentinel makes the thread finalize the animation after the pending frames. It is
+        # not needed if the thread already stopped on an error, which must not mask an
+        # exception raised in the body.
+        while self._thread.is_alive():
+            try:
+                self._frames.put(None, timeout=_POLL_INTERVAL)
+                break
+            except queue.Full:
+                continue
+        if self._thread.ident is not None:
+            self._thread.join()
+        if exc_type is None and self._error is not None:
+            raise RuntimeError("The animation writer thread failed.") from self._error
+
+    def push(self, state: State) -> None:
+        """Renders `state` and queues its frame to be written."""
+        if self._error is None and not self._thread.is_alive():
+            raise RuntimeError(
+                "The animation writer thread is not running, use the writer as a context "
+                "manager to push states."
+            )
+        frame = self.render(state)
+        if isinstance(frame, jax.Array):
+            frame.copy_to_host_async()
+        self._put(frame)
+        self.num_frames += 1
+
+    def push_all(self, states: Iterable[State]) -> None:
+        """Pushes the states of an iterable, e.g. a generator stepping the environment."""
+        for state in states:
+            self.push(state)
+
+    def _put(self, frame: Any) -> None:
+        while True:
+            if self._error is not None:
+                raise RuntimeError(
+                    "The animation writer thread failed."
+                ) from self._error
+            try:
+                self._frames.put(frame, timeout=_POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+
+    def _run(self) -> None:
+        try:
+            while True:
+                frame = self._frames.get()
+                if frame is None:
+                    break
+                self._frame_writer.write(np.asarray(frame, np.uint8))
+        except BaseException as error:  # noqa: B902
+            self._error = error
+        finally:
+            # Also close on errors, e.g. to release the file or the ffmpeg process.
+            try:
+                self._frame_writer.close()
+            except BaseException as error:  # noqa: B902
+                self._error = self._error or error
@@ -0,0 +1,164 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+from typing import List
+
+import numpy as np
+import pytest
+from PIL import Image, ImageSequence
+
+from jumanji.animation import (
+    AnimationWriter,
+    FFmpegFrameWriter,
+    FrameWriter,
+    GifFrameWriter,
+    PngFrameWriter,
+    make_frame_writer,
+)
+
+
+@pytest.fixture
+def frames() -> List[np.ndarray]:
+    """Frames with more colors than a GIF color table, each of them different."""
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, (6, 10, 3), dtype=np.uint8) for _ in range(5)]
+
+
+def test_animation_writer__gif(tmp_path: str, frames: List[np.ndarray]) -> None:
+    """Validates that the streamed GIF holds all the frames with the requested delay."""
+    path = os.path.join(tmp_path, "animation.gif")
+    # Frames are rendered from states, here indices into the list of frames.
+    with AnimationWriter(
+        path, lambda i: frames[i], interval=50, max_pending=2
+    ) as writer:
+        writer.push_all(range(len(frames)))
+    assert writer.num_frames == len(frames)
+    with Image.open(path) as image:
+        assert image.n_frames == len(frames)
+        assert image.size == (10, 6)
+        assert image.info["duration"] == 50
+        for frame, gif_frame in zip(frames, ImageSequence.Iterator(image)):
+            gif_frame = np.asarray(gif_frame.convert("RGB"), int)
+            # Colors are quantized to the 256 colors of each frame's table.
+            assert np.abs(gif_frame - frame).mean() < 16
+
+
+def test_animation_writer__gif_exact_colors(tmp_path: str) -> None:
+    path = os.path.join(tmp_path, "animation.gif")
+    frames = [np.full((4, 4, 3), value, np.uint8) for value in (0, 128, 255)]
+    with AnimationWriter(path, lambda frame: frame) as writer:
+        writer.push_all(frames)
+    with Image.open(path) as image:
+        for frame, gif_frame in zip(frames, ImageSequence.Iterator(image)):
+            np.testing.assert_array_equal(np.asarray(gif_frame.convert("RGB")), frame)
+
+
+def test_animation_writer__png(tmp_path: str, frames: List[np.ndarray]) -> None:
+    directory = os.path.join(tmp_path, "frames")
+    with AnimationWriter(directory, lambda frame: frame) as writer:
+        writer.push_all(frames)
+    assert sorted(os.listdir(directory)) == [
+        f"frame_{i:06d}.png" for i in range(len(frames))
+    ]
+    np.testing.assert_array_equal(
+        np.asarray(Image.open(os.path.join(directory, "frame_000003.png"))), frames[3]
+    )
+
+
+def test_animation_writer__thread_error(tmp_path: str) -> None:
+    """Validates that errors of the writer thread are raised in the main thread."""
+    path = os.path.join(tmp_path, "animation.gif")
+    with pytest.raises(RuntimeError):
+        with AnimationWriter(path, lambda shape: np.zeros(shape, np.uint8)) as writer:
+            writer.push_all([(4, 4, 3), (5, 4, 3)])
+
+
+class FailingFrameWriter(FrameWriter):
+    """Frame writer failing on its second frame, which records whether it was closed."""
+
+    def __init__(self) -> None:
+        self.num_frames = 0
+        self.closed = False
+
+    def write(self, frame: np.ndarray) -> None:
+        self.num_frames += 1
+        if self.num_frames == 2:
+            raise OSError("disk full")
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_animation_writer__closes_on_error() -> None:
+    """Validates that the frame writer is closed when writing a frame fails."""
+    frame_writer = FailingFrameWriter()
+    with pytest.raises(RuntimeError) as error:
+        with AnimationWriter(
+            "unused.gif", lambda frame: frame, frame_writer=frame_writer
+        ) as writer:
+            writer.push_all([np.zeros((4, 4, 3), np.uint8)] * 3)
+    assert isinstance(error.value.__cause__, OSError)
+    assert frame_writer.closed
+
+
+def test_animation_writer__body_error_not_masked() -> None:
+    """Validates that an exception raised in the body is raised as is when leaving, even if the
+    writer thread failed as well.
+    """
+    frame_writer = FailingFrameWriter()
+    with pytest.raises(KeyError):
+        with AnimationWriter(
+            "unused.gif", lambda frame: frame, max_pending=1, frame_writer=frame_writer
+        ) as writer:
+            writer.push_all([np.zeros((4, 4, 3), np.uint8)] * 2)
+            writer._thread.join()
+            raise KeyError("body")
+    assert frame_writer.closed
+
+
+def test_animation_writer__not_started() -> None:
+    """Validates that pushing a state without entering the writer raises instead of blocking
+    once `max_pending` frames are queued, and that pushing after leaving raises as well.
+    """
+    writer = AnimationWriter(
+        "unused.gif",
+        lambda frame: frame,
+        max_pending=1,
+        frame_writer=FailingFrameWriter(),
+    )
+    with pytest.raises(RuntimeError):
+        writer.push(np.zeros((4, 4, 3), np.uint8))
+    assert writer.num_frames == 0
+    with writer:
+        writer.push(np.zeros((4, 4, 3), np.uint8))
+    with pytest.raises(RuntimeError):
+        writer.push(np.zeros((4, 4, 3), np.uint8))
+
+
+def test_make_frame_writer(tmp_path: str) -> None:
+    assert isinstance(
+        make_frame_writer(os.path.join(tmp_path, "a.gif")), GifFrameWriter
+    )
+    assert isinstance(make_frame_writer(os.path.join(tmp_path, "a")), PngFrameWriter)
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="requires ffmpeg")
+def test_animation_writer__ffmpeg(tmp_path: str, frames: List[np.ndarray]) -> None:
+    path = os.path.join(tmp_path, "animation.mp4")
+    with AnimationWriter(path, lambda frame: frame) as writer:
+        assert isinstance(writer._frame_writer, FFmpegFrameWriter)
+        writer.push_all(frames)
+    assert os.path.getsize(path) > 0
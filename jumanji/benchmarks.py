@@ -0,0 +1,418 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Throughput benchmarks and static cost reports of the registered environments.
+
+Run all the throughput benchmarks and write the results as JSON with:
+    python -m jumanji.benchmarks --batch-sizes 1 128 --unrolls 1 8 --output results.json
+
+Report the memory footprint and step cost of every environment, and the largest batch that fits
+in 16GB, with:
+    python -m jumanji.benchmarks --mode cost --memory-budget-gb 16
+
+Compare the throughput of instances padded to shape buckets with the one of unpadded instances:
+    python -m jumanji.benchmarks --mode padding --envs TSP-v1 --sizes 20 40 --bucket-sizes 32 64
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import chex
+import jax
+import numpy as np
+
+import jumanji
+from jumanji import registration
+from jumanji.env import Environment
+from jumanji.testing.env_not_smoke import make_random_select_action_fn
+from jumanji.wrappers import VmapAutoResetWrapper, VmapWrapper
+
+
+def benchmark_env(
+    env: Environment,
+    batch_size: int,
+    num_steps: int = 100,
+    unroll: int = 1,
+    num_repeats: int = 3,
+    seed: int = 0,
+) -> Dict[str, float]:
+    """Measure the reset and step throughput of an environment batched over `batch_size`.
+
+    Resets are batched with `VmapWrapper` and steps with `VmapAutoResetWrapper`, so that episodes
+    that terminate during the `num_steps` steps are automatically reset. Steps are rolled out in a
+    single `jax.lax.scan` with random actions sampled from the action spec. Compilation is timed
+    separately from execution, and execution is timed as the best of `num_repeats` runs.
+
+    Args:
+        env: environment to benchmark, not already batched.
+        batch_size: number of environments run in parallel.
+        num_steps: number of steps in the scanned rollout. Defaults to 100.
+        unroll: `unroll` argument of `jax.lax.scan`. Defaults to 1.
+        num_repeats: number of timed executions of the compiled functions. Defaults to 3.
+        seed: seed of the keys used to reset the environment and sample actions.
+
+    Returns:
+        dictionary of the compile times and run times in seconds, and the number of resets and
+            steps per second.
+    """
+    reset_fn = VmapWrapper(env).reset
+    auto_reset_env = VmapAutoResetWrapper(env)
+    select_action = jax.vmap(make_random_select_action_fn(env.action_spec()))
+
+    def rollout(state: Any, timestep: Any, key: chex.PRNGKey) -> Tuple[Any, Any]:
+        def step(carry: Tuple[Any, Any], key: chex.PRNGKey) -> Tuple[Any, None]:
+            state, timestep = carry
+            action = select_action(
+                jax.random.split(key, batch_size), timestep.observation
+            )
+            return auto_reset_env.step(state, action), None
+
+        keys = jax.random.split(key, num_steps)
+        (state, timestep), _ = jax.lax.scan(
+            step, (state, timestep), keys, unroll=unroll
+        )
+        return state, timestep
+
+    key, reset_key, rollout_key = jax.random.split(jax.random.PRNGKey(seed), 3)
+    reset_keys = jax.random.split(reset_key, batch_size)
+    reset_compile_time, compiled_reset = _compile(reset_fn, reset_keys)
+    reset_time = _time_best_of(compiled_reset, (reset_keys,), num_repeats)
+    state, timestep = compiled_reset(reset_keys)
+    rollout_compile_time, compiled_rollout = _compile(
+        rollout, state, timestep, rollout_key
+    )
+    rollout_time = _time_best_of(
+        compiled_rollout, (state, timestep, rollout_key), num_repeats
+    )
+    return {
+        "reset_compile_time": reset_compile_time,
+        "reset_time": reset_time,
+        "resets_per_second": batch_size / reset_time,
+        "step_compile_time": rollout_compile_time,
+        "step_time": rollout_time,
+        "steps_per_second": batch_size * num_steps / rollout_time,
+    }
+
+
+def run_benchmarks(
+    env_ids: Optional[Sequence[str]] = None,
+    batch_sizes: Sequence[int] = (1, 128),
+    unrolls: Sequence[int] = (1,),
+    num_steps: int = 100,
+    num_repeats: int = 3,
+    env_kwargs: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """Run `benchmark_env` for every combination of environment, batch size and unroll length.
+
+    Args:
+        env_ids: IDs of the environments to benchmark. Defaults to all registered environments.
+        batch_sizes: batch sizes to sweep. Defaults to (1, 128).
+        unrolls: `jax.lax.scan` unroll lengths to sweep. Defaults to (1,).
+        num_steps: number of steps in each scanned rollout. Defaults to 100.
+        num_repeats: number of timed executions of each compiled function. Defaults to 3.
+        env_kwargs: optional mapping from environment ID to the keyword arguments passed to
+            `jumanji.make` to override the registered ones.
+
+    Returns:
+        list of results, one per combination, each one being a flat JSON-serializable dictionary
+            that identifies the combination and contains the metrics returned by `benchmark_env`.
+    """
+    env_ids = sorted(env_ids or jumanji.registered_environments())
+    env_kwargs = env_kwargs or {}
+    results = []
+    for env_id in env_ids:
+        env = jumanji.make(env_id, **env_kwargs.get(env_id, {}))
+        for batch_size in batch_sizes:
+            for unroll in unrolls:
+                metrics = benchmark_env(
+                    env,
+                    batch_size=batch_size,
+                    num_steps=num_steps,
+                    unroll=unroll,
+                    num_repeats=num_repeats,
+                )
+                results.append(
+                    {
+                        "env_id": env_id,
+                        "batch_size": batch_size,
+                        "unroll": unroll,
+                        "num_steps": num_steps,
+                        "backend": jax.default_backend(),
+                        **metrics,
+                    }
+                )
+    return results
+
+
+def run_padding_benchmarks(
+    env_ids: Sequence[str],
+    sizes: Sequence[int],
+    bucket_sizes: Sequence[int],
+    batch_sizes: Sequence[int] = (128,),
+    num_steps: int = 100,
+    num_repeats: int = 3,
+    env_kwargs: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """Run `benchmark_env` on instances of every size, padded to their bucket (see the
+    `bucket_sizes` argument of `jumanji.make`) and unpadded, to report the throughput as a
+    function of the padding overhead.
+
+    Args:
+        env_ids: IDs of environments registered with a `size_kwarg`.
+        sizes: instance sizes to sweep, e.g. numbers of cities.
+        bucket_sizes: sizes the instances are padded to.
+        batch_sizes: batch sizes to sweep. Defaults to (128,).
+        num_steps: number of steps in each scanned rollout. Defaults to 100.
+        num_repeats: number of timed executions of each compiled function. Defaults to 3.
+        env_kwargs: optional mapping from environment ID to the keyword arguments passed to
+            `jumanji.make` to override the registered ones.
+
+    Returns:
+        list of results, one per combination, with the padding overhead (fraction of padding
+            elements), the padded and unpadded throughputs and their ratio.
+    """
+    env_kwargs = env_kwargs or {}
+    results = []
+    for env_id in env_ids:
+        size_kwarg = registration.spec(env_id).size_kwarg
+        if size_kwarg is None:
+            raise ValueError(
+                f"The environment {env_id} does not support bucketed instance sizes."
+            )
+        for size in sizes:
+            kwargs = {**env_kwargs.get(env_id, {}), size_kwarg: size}
+            env = jumanji.make(env_id, **kwargs)
+            padded_env = jumanji.make(env_id, bucket_sizes=bucket_sizes, **kwargs)
+            bucket_size = registration.bucket_size(size, bucket_sizes)
+            for batch_size in batch_sizes:
+                metrics = benchmark_env(
+                    env, batch_size, num_steps=num_steps, num_repeats=num_repeats
+                )
+                padded_metrics = benchmark_env(
+                    padded_env, batch_size, num_steps=num_steps, num_repeats=num_repeats
+                )
+                results.append(
+                    {
+                        "env_id": env_id,
+                        "size": size,
+                        "bucket_size": bucket_size,
+                        "padding_overhead": 1 - size / bucket_size,
+                        "batch_size": batch_size,
+                        "num_steps": num_steps,
+                        "backend": jax.default_backend(),
+                        "steps_per_second": padded_metrics["steps_per_second"],
+                        "unpadded_steps_per_second": metrics["steps_per_second"],
+                        "relative_throughput": padded_metrics["steps_per_second"]
+                        / metrics["steps_per_second"],
+                    }
+                )
+    return results
+
+
+def cost_report(
+    env: Environment, memory_budget: Optional[int] = None
+) -> Dict[str, Any]:
+    """Statically report the memory footprint of a single environment and the cost of its step
+    function, without running it.
+
+    The sizes of the state and timestep are derived from the shapes returned by `jax.eval_shape`
+    on `reset`, and the size of the observation from the observation spec. FLOPs and bytes
+    accessed are the XLA estimates of the compiled (unbatched) step function. The memory needed
+    per environment of a batch is estimated as twice the state and timestep, as both the input
+    and the output of `step` are alive at once, plus the temporary buffers of the compiled step
+    when the backend reports them.
+
+    Args:
+        env: environment to report on, not already batched.
+        memory_budget: optional memory budget in bytes. If given, the largest batch size whose
+            estimated memory fits in the budget is reported.
+
+    Returns:
+        flat JSON-serializable dictionary of byte sizes and costs.
+    """
+    state, timestep = jax.eval_shape(env.reset, jax.random.PRNGKey(0))
+    action = env.action_spec().generate_value()
+    compiled_step = jax.jit(env.step).lower(state, action).compile()
+    cost_analysis = compiled_step.cost_analysis() or [{}]
+    if isinstance(cost_analysis, dict):
+        cost_analysis = [cost_analysis]
+    memory_analysis = compiled_step.memory_analysis()
+    temp_bytes = getattr(memory_analysis, "temp_size_in_bytes", 0)
+    state_bytes = _tree_num_bytes(state)
+    timestep_bytes = _tree_num_bytes(timestep)
+    bytes_per_env = 2 * (state_bytes + timestep_bytes) + temp_bytes
+    report = {
+        "state_bytes": state_bytes,
+        "observation_bytes": _tree_num_bytes(env.observation_spec().generate_value()),
+        "timestep_bytes": timestep_bytes,
+        "step_flops": sum(cost.get("flops", 0.0) for cost in cost_analysis),
+        "step_bytes_accessed": sum(
+            cost.get("bytes accessed", 0.0) for cost in cost_analysis
+        ),
+        "step_temp_bytes": temp_bytes,
+        "bytes_per_env": bytes_per_env,
+    }
+    if memory_budget is not None:
+        report["memory_budget"] = memory_budget
+        report["max_batch_size"] = memory_budget // bytes_per_env
+    return report
+
+
+def run_cost_reports(
+    env_ids: Optional[Sequence[str]] = None,
+    memory_budget: Optional[int] = None,
+    env_kwargs: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """Run `cost_report` for every environment.
+
+    Args:
+        env_ids: IDs of the environments to report on. Defaults to all registered environments.
+        memory_budget: optional memory budget in bytes used to compute the maximum batch size.
+        env_kwargs: optional mapping from environment ID to the keyword arguments passed to
+            `jumanji.make` to override the registered ones.
+
+    Returns:
+        list of reports, one per environment, each one identified by its "env_id".
+    """
+    env_ids = sorted(env_ids or jumanji.registered_environments())
+    env_kwargs = env_kwargs or {}
+    return [
+        {
+            "env_id": env_id,
+            "backend": jax.default_backend(),
+            **cost_report(
+                jumanji.make(env_id, **env_kwargs.get(env_id, {})), memory_budget
+            ),
+        }
+        for env_id in env_ids
+    ]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the reset and step throughput of the registered environments, "
+        "or report their memory footprint and step cost."
+    )
+    parser.add_argument(
+        "--mode", choices=["throughput", "cost", "padding"], default="throughput"
+    )
+    parser.add_argument(
+        "--envs",
+        nargs="+",
+        default=None,
+        help="IDs of the environments to benchmark, defaults to all registered ones.",
+    )
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 128])
+    parser.add_argument("--unrolls", nargs="+", type=int, default=[1])
+    parser.add_argument("--num-steps", type=int, default=100)
+    parser.add_argument("--num-repeats", type=int, default=3)
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=int,
+        default=[20],
+        help="Instance sizes benchmarked in padding mode.",
+    )
+    parser.add_argument(
+        "--bucket-sizes",
+        nargs="+",
+        type=int,
+        default=[32],
+        help="Sizes the instances are padded to in padding mode.",
+    )
+    parser.add_argument(
+        "--memory-budget-gb",
+        type=float,
+        default=None,
+        help="Memory budget used to report the maximum batch size in cost mode.",
+    )
+    parser.add_argument(
+        "--env-kwargs",
+        type=json.loads,
+        default=None,
+        help='JSON mapping from env ID to `jumanji.make` kwargs, e.g. \'{"TSP-v1": '
+        '{"num_cities": 100}}\'.',
+    )
+    parser.add_argument(
+        "--output", default=None, help="JSON file to write, defaults to stdout."
+    )
+    args = parser.parse_args(argv)
+    if args.mode == "cost":
+        memory_budget = (
+            None
+            if args.memory_budget_gb is None
+            else int(args.memory_budget_gb * 1024**3)
+        )
+        results = run_cost_reports(
+            env_ids=args.envs,
+            memory_budget=memory_budget,
+            env_kwargs=args.env_kwargs,
+        )
+    elif args.mode == "padding":
+        results = run_padding_benchmarks(
+            env_ids=args.envs or ["TSP-v1"],
+            sizes=args.sizes,
+            bucket_sizes=args.bucket_sizes,
+            batch_sizes=args.batch_sizes,
+            num_steps=args.num_steps,
+            num_repeats=args.num_repeats,
+            env_kwargs=args.env_kwargs,
+        )
+    else:
+        results = run_benchmarks(
+            env_ids=args.envs,
+            batch_sizes=args.batch_sizes,
+            unrolls=args.unrolls,
+            num_steps=args.num_steps,
+            num_repeats=args.num_repeats,
+            env_kwargs=args.env_kwargs,
+        )
+    if args.output is None:
+        json.dump(results, sys.stdout, indent=2)
+    else:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+def _compile(fn: Callable, *args: Any) -> Tuple[float, Callable]:
+    """Ahead-of-time compile `fn` for `args`, returning the compile time and compiled function."""
+    start_time = time.perf_counter()
+    compiled_fn = jax.jit(fn).lower(*args).compile()
+    return time.perf_counter() - start_time, compiled_fn
+
+
+def _time_best_of(fn: Callable, args: Tuple, num_repeats: int) -> float:
+    """Return the shortest run time of `fn(*args)` over `num_repeats` runs."""
+    run_times = []
+    for _ in range(num_repeats):
+        start_time = time.perf_counter()
+        jax.block_until_ready(fn(*args))
+        run_times.append(time.perf_counter() - start_time)
+    return min(run_times)
+
+
+def _tree_num_bytes(tree: Any) -> int:
+    """Return the number of bytes of the arrays (or shape-dtype structs) of a pytree."""
+    return sum(
+        int(np.prod(leaf.shape)) * np.dtype(leaf.dtype).itemsize
+        for leaf in jax.tree_util.tree_leaves(tree)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import json
+
+import py
+
+from jumanji import benchmarks
+
+
+def test_run_benchmarks() -> None:
+    """Validate that one result is returned per combination of the sweep."""
+    results = benchmarks.run_benchmarks(
+        env_ids=["Knapsack-v1"],
+        batch_sizes=[1, 4],
+        unrolls=[1, 2],
+        num_steps=3,
+        num_repeats=1,
+    )
+    assert len(results) == 4
+    for result in results:
+        assert result["env_id"] == "Knapsack-v1"
+        assert result["steps_per_second"] > 0
+        assert result["resets_per_second"] > 0
+        assert result["step_compile_time"] > 0
+
+
+def test_main(tmpdir: py.path.local) -> None:
+    """Validate that the CLI writes the results as JSON."""
+    output = str(tmpdir.join("results.json"))
+    benchmarks.main(
+        [
+            "--envs",
+            "TSP-v1",
+            "--batch-sizes",
+            "2",
+            "--num-steps",
+            "2",
+            "--num-repeats",
+            "1",
+            "--output",
+            output,
+        ]
+    )
+    with open(output) as file:
+        results = json.load(file)
+    assert [(result["env_id"], result["batch_size"]) for result in results] == [
+        ("TSP-v1", 2)
+    ]
+
+
+def test_run_cost_reports() -> None:
+    """Validate the byte sizes of the TSP report and that make kwargs are overridden."""
+    (report,) = benchmarks.run_cost_reports(
+        env_ids=["TSP-v1"],
+        memory_budget=10**6,
+        env_kwargs={"TSP-v1": {"num_cities": 10}},
+    )
+    assert report["env_id"] == "TSP-v1"
+    # The coordinates of 10 cities in float32 dominate the observation.
+    assert report["observation_bytes"] >= 10 * 2 * 4
+    assert report["timestep_bytes"] > report["observation_bytes"]
+    assert report["state_bytes"] >= 10 * 2 * 4
+    assert report["step_flops"] > 0
+    assert report["max_batch_size"] == 10**6 // report["bytes_per_env"]
+
+
+def test_run_padding_benchmarks() -> None:
+    """Validate that every size is compared with its padded version."""
+    results = benchmarks.run_padding_benchmarks(
+        env_ids=["TSP-v1"],
+        sizes=[5, 8],
+        bucket_sizes=[8],
+        batch_sizes=[2],
+        num_steps=3,
+        num_repeats=1,
+    )
+    assert [(result["size"], result["bucket_size"]) for result in results] == [
+        (5, 8),
+        (8, 8),
+    ]
+    assert [result["padding_overhead"] for result in results] == [3 / 8, 0]
+    for result in results:
+        assert result["relative_throughput"] > 0
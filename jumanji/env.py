@@ -15,7 +15,7 @@
 """Abstract environment class"""
 
 import abc
-from typing import Any, Generic, Tuple, TypeVar
+from typing import Any, Dict, Generic, Tuple, TypeVar
 
 import chex
 from typing_extensions import Protocol
@@ -40,6 +40,11 @@ class Environment(abc.ABC, Generic[State]):
     The API is inspired by [brax](https://github.com/google/brax/blob/main/brax/envs/env.py).
     """
 
+    # Names of the observation fields that are constant within an episode, e.g. the instance
+    # data of combinatorial problems. Consumers may store them once per episode instead of once
+    # per step, see `split_observation`.
+    static_observation_fields: Tuple[str, ...] = ()
+
     def __repr__(self) -> str:
         return "Environment."
 
@@ -104,6 +109,31 @@ class Environment(abc.ABC, Generic[State]):
             shape=(), dtype=float, minimum=0.0, maximum=1.0, name="discount"
         )
 
+    def split_observation(self, observation: Any) -> Tuple[Dict[str, Any], Any]:
+        """Splits an observation into its static and dynamic parts.
+
+        Args:
+            observation: NamedTuple observation of the environment, possibly batched.
+
+        Returns:
+            static_observation: dictionary of the fields in `static_observation_fields`.
+            dynamic_observation: observation whose static fields are replaced by None.
+        """
+        static_observation = {
+            field: getattr(observation, field)
+            for field in self.static_observation_fields
+        }
+        dynamic_observation = observation._replace(
+            **{field: None for field in self.static_observation_fields}
+        )
+        return static_observation, dynamic_observation
+
+    def merge_observation(
+        self, static_observation: Dict[str, Any], dynamic_observation: Any
+    ) -> Any:
+        """Inverse of `split_observation`."""
+        return dynamic_observation._replace(**static_observation)
+
     @property
     def unwrapped(self) -> "Environment":
         return self
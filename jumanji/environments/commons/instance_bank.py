@@ -0,0 +1,179 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import abc
+from typing import Dict, Generic, Mapping, Optional, Sequence, Union
+
+import chex
+import jax
+import jax.numpy as jnp
+import numpy as np
+
+from jumanji.env import State
+
+InstanceBankSource = Union[str, Mapping[str, chex.ArrayNumpy]]
+
+
+def load_instance_bank(
+    source: InstanceBankSource,
+    fields: Sequence[str],
+    optional_fields: Sequence[str] = (),
+) -> Dict[str, chex.Array]:
+    """Load a bank of problem instances and stage it on the default device once.
+
+    Args:
+        source: either a mapping from field name to an array whose leading dimension indexes the
+            instances, or a path to a `.npz` archive holding one array per field. A path to a
+            `.npy` file is also accepted when a single field is requested. `.npy` files are
+            memory-mapped so that only the bank itself, and no intermediate copy, is materialized.
+        fields: names of the arrays that make up an instance.
+        optional_fields: names of arrays that are loaded only if the bank contains them, e.g. the
+            number of elements of each instance of a padded bank (see `pad_instances`).
+
+    Returns:
+        dictionary mapping each field name to a device array of shape (num_instances, ...).
+
+    Raises:
+        ValueError: if a field is missing, the bank is empty or the fields disagree on the number
+            of instances.
+    """
+    if isinstance(source, str):
+        if source.endswith(".npy"):
+            if len(fields) != 1:
+                raise ValueError(
+                    f"A .npy file holds a single array but the fields {list(fields)} were "
+                    f"requested, use a .npz archive instead."
+                )
+            arrays: Mapping[str, chex.ArrayNumpy] = {
+                fields[0]: np.load(source, mmap_mode="r")
+            }
+        else:
+            arrays = np.load(source)
+    else:
+        arrays = source
+    missing_fields = [field for field in fields if field not in arrays]
+    if missing_fields:
+        raise ValueError(f"The instance bank is missing the fields {missing_fields}.")
+    fields = [*fields, *(field for field in optional_fields if field in arrays)]
+    bank = {field: jnp.asarray(arrays[field]) for field in fields}
+    num_instances = {field: array.shape[0] for field, array in bank.items()}
+    if len(set(num_instances.values())) != 1:
+        raise ValueError(
+            f"All fields of the instance bank must have the same number of instances, "
+            f"got {num_instances}."
+        )
+    if not next(iter(num_instances.values())):
+        raise ValueError("The instance bank must contain at least one instance.")
+    return bank
+
+
+def select_from_instance_bank(
+    index: chex.Numeric, bank: Dict[str, chex.Array]
+) -> Dict[str, chex.Array]:
+    """Gather the instance at `index` from a bank loaded by `load_instance_bank`, e.g. to evaluate
+    a policy on every instance of a benchmark. `index` may be traced, so that all the instances
+    share the same compiled program.
+
+    Args:
+        index: index of the instance in [0, num_instances). Out-of-range indices are clamped, as
+            any JAX gather.
+        bank: dictionary of device arrays of shape (num_instances, ...).
+
+    Returns:
+        dictionary mapping each field name to the array of the instance.
+    """
+    return jax.tree_util.tree_map(lambda array: array[index], bank)
+
+
+class IndexedGenerator(abc.ABC, Generic[State]):
+    """Base class of the generators that reset to one of a fixed set of `num_instances`
+    instances, e.g. a bank or a dataset. Calling the generator resets to an instance sampled
+    uniformly at random, while `generate_instance` resets to a given one.
+    """
+
+    num_instances: int
+
+    def __call__(self, key: chex.PRNGKey) -> State:
+        key, index_key = jax.random.split(key)
+        index = jax.random.randint(index_key, (), 0, self.num_instances)
+        return self.generate_instance(index, key)
+
+    @abc.abstractmethod
+    def generate_instance(self, index: chex.Numeric, key: chex.PRNGKey) -> State:
+        """Generate the instance at `index` rather than a random one, e.g. to evaluate a policy on
+        every instance with `jax.vmap(generator.generate_instance)`. `index` may be traced, so
+        that all the instances share the same compiled program.
+
+        Args:
+            index: index of the instance in [0, num_instances).
+            key: random key of the state.
+
+        Returns:
+            the initial state of an episode on the instance.
+        """
+
+
+def pad_instances(
+    instances: Sequence[Mapping[str, chex.ArrayNumpy]],
+    size_field: str,
+    num_elements: Optional[int] = None,
+) -> Dict[str, chex.ArrayNumpy]:
+    """Stack instances of different sizes into a padded bank, so that a single compiled program
+    serves all of them. Every field is zero-padded along its leading (element) axis.
+
+    Args:
+        instances: sequence of instances, each one mapping field names to arrays whose leading
+            dimension is the number of elements of the instance, e.g. the number of cities.
+        size_field: name of the array of the bank holding the number of elements of each
+            instance, e.g. "num_cities".
+        num_elements: size of the padded element axis. Defaults to the largest instance.
+
+    Returns:
+        dictionary mapping each field name to an array of shape (num_instances, num_elements, ...),
+            and `size_field` to the number of elements of each instance.
+
+    Raises:
+        ValueError: if an instance has more than `num_elements` elements or if its fields
+            disagree on its number of elements.
+    """
+    sizes = []
+    for instance in instances:
+        field_sizes = {field: len(array) for field, array in instance.items()}
+        if len(set(field_sizes.values())) != 1:
+            raise ValueError(
+                "All fields of an instance must have the same number of elements, got "
+                f"{field_sizes}."
+            )
+        sizes.append(next(iter(field_sizes.values())))
+    if num_elements is None:
+        num_elements = max(sizes)
+    if max(sizes) > num_elements:
+        raise ValueError(
+            f"Cannot pad instances of up to {max(sizes)} elements to {num_elements} elements."
+        )
+    bank = {
+        field: np.stack(
+            [
+                np.pad(
+                    np.asarray(instance[field]),
+                    [(0, num_elements - size)]
+                    + [(0, 0)] * (np.ndim(instance[field]) - 1),
+                )
+                for instance, size in zip(instances, sizes)
+            ]
+        )
+        for field in instances[0]
+    }
+    bank[size_field] = np.asarray(sizes, np.int32)
+    return bank
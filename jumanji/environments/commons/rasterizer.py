@@ -0,0 +1,84 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Jittable rasterization of grids into uint8 RGB frames. Each grid environment maps its state to
+a grid of palette indices, which is upsampled to `cell_size` pixels per cell and colored with a
+single gather, e.g. to log videos of evaluation episodes with `jax.vmap` over a batch of states.
+The matplotlib viewers are still used by `render` and `animate`.
+"""
+
+from typing import Any, Optional, Sequence
+
+import chex
+import jax.numpy as jnp
+import matplotlib.colors
+import numpy as np
+
+NO_MARKER = -1
+
+
+def make_palette(colors: Sequence[Any]) -> np.ndarray:
+    """Converts matplotlib colors, e.g. "white" or "#ccc0b3", to a uint8 RGB palette of shape
+    (len(colors), 3).
+    """
+    return np.round(
+        255 * np.array([matplotlib.colors.to_rgb(c) for c in colors])
+    ).astype(np.uint8)
+
+
+def rasterize_grid(
+    cells: chex.Array,
+    palette: np.ndarray,
+    cell_size: int,
+    markers: Optional[chex.Array] = None,
+    grid_color: Optional[int] = None,
+) -> chex.Array:
+    """Draws a grid of colored cells, optionally with a smaller square (marker) at the center of
+    some cells and 1-pixel grid lines.
+
+    Args:
+        cells: palette indices of the cells, of shape (..., num_rows, num_cols).
+        palette: uint8 RGB colors of shape (num_colors, 3), see `make_palette`.
+        cell_size: side of the cells in pixels.
+        markers: palette indices of the markers, of the same shape as `cells`. Cells without a
+            marker are `NO_MARKER`.
+        grid_color: palette index of the grid lines, no lines are drawn if None.
+
+    Returns:
+        uint8 RGB frame of shape (..., num_rows * cell_size, num_cols * cell_size, 3).
+    """
+    num_rows, num_cols = cells.shape[-2:]
+
+    def upsample(x: chex.Array) -> chex.Array:
+        return jnp.repeat(jnp.repeat(x, cell_size, axis=-2), cell_size, axis=-1)
+
+    def tile(cell_mask: np.ndarray) -> np.ndarray:
+        """Repeats a (cell_size, cell_size) mask over all the cells."""
+        return np.tile(cell_mask, (num_rows, num_cols))
+
+    offset = np.arange(cell_size)
+    pixels = upsample(cells)
+    if markers is not None:
+        margin = cell_size // 4
+        inner = (offset >= margin) & (offset < cell_size - margin)
+        pixel_markers = upsample(markers)
+        pixels = jnp.where(
+            tile(np.logical_and.outer(inner, inner)) & (pixel_markers != NO_MARKER),
+            pixel_markers,
+            pixels,
+        )
+    if grid_color is not None:
+        edge = offset == 0
+        pixels = jnp.where(tile(np.logical_or.outer(edge, edge)), grid_color, pixels)
+    return jnp.asarray(palette)[pixels]
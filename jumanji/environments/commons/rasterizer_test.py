@@ -0,0 +1,100 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import ModuleType
+
+import jax
+import jax.numpy as jnp
+import numpy as np
+import pytest
+
+from jumanji.env import Environment
+from jumanji.environments import Cleaner, Connector, Game2048, Maze, Minesweeper, Snake
+from jumanji.environments.commons.rasterizer import (
+    NO_MARKER,
+    make_palette,
+    rasterize_grid,
+)
+from jumanji.environments.logic.game_2048 import rasterizer as game_2048_rasterizer
+from jumanji.environments.logic.minesweeper import rasterizer as minesweeper_rasterizer
+from jumanji.environments.routing.cleaner import rasterizer as cleaner_rasterizer
+from jumanji.environments.routing.connector import rasterizer as connector_rasterizer
+from jumanji.environments.routing.maze import rasterizer as maze_rasterizer
+from jumanji.environments.routing.snake import rasterizer as snake_rasterizer
+
+PALETTE = make_palette(["white", "black", "red"])
+
+
+def test_make_palette() -> None:
+    np.testing.assert_array_equal(
+        PALETTE, np.array([[255, 255, 255], [0, 0, 0], [255, 0, 0]], np.uint8)
+    )
+
+
+def test_rasterize_grid__cells() -> None:
+    """Validates that each cell is upsampled to a square of its color."""
+    cells = jnp.array([[0, 1], [2, 0]])
+    frame = rasterize_grid(cells, PALETTE, cell_size=3)
+    assert frame.shape == (6, 6, 3) and frame.dtype == np.uint8
+    np.testing.assert_array_equal(frame[3:, :3], np.broadcast_to(PALETTE[2], (3, 3, 3)))
+    np.testing.assert_array_equal(frame[:3, 3:], np.broadcast_to(PALETTE[1], (3, 3, 3)))
+
+
+def test_rasterize_grid__markers_and_grid_lines() -> None:
+    cells = jnp.zeros((2, 2), int)
+    markers = jnp.array([[NO_MARKER, 2], [NO_MARKER, NO_MARKER]])
+    frame = rasterize_grid(cells, PALETTE, cell_size=4, markers=markers, grid_color=1)
+    # The marker is the central square of the cell, surrounded by the cell's color.
+    np.testing.assert_array_equal(
+        frame[1:3, 5:7], np.broadcast_to(PALETTE[2], (2, 2, 3))
+    )
+    np.testing.assert_array_equal(frame[3, 7], PALETTE[0])
+    # Grid lines on the first row and column of pixels of each cell.
+    np.testing.assert_array_equal(frame[4, :], np.broadcast_to(PALETTE[1], (8, 3)))
+    np.testing.assert_array_equal(frame[:, 4], np.broadcast_to(PALETTE[1], (8, 3)))
+    np.testing.assert_array_equal(
+        frame[1:4, 1:4], np.broadcast_to(PALETTE[0], (3, 3, 3))
+    )
+
+
+def test_rasterize_grid__batch_dims() -> None:
+    cells = jnp.arange(6).reshape(2, 1, 3) % 3
+    frames = rasterize_grid(cells, PALETTE, cell_size=2)
+    assert frames.shape == (2, 2, 6, 3)
+    np.testing.assert_array_equal(
+        frames[1], rasterize_grid(cells[1], PALETTE, cell_size=2)
+    )
+
+
+@pytest.mark.parametrize(
+    ["env", "rasterizer"],
+    [
+        (Snake(num_rows=5, num_cols=6), snake_rasterizer),
+        (Maze(), maze_rasterizer),
+        (Cleaner(), cleaner_rasterizer),
+        (Connector(), connector_rasterizer),
+        (Minesweeper(), minesweeper_rasterizer),
+        (Game2048(), game_2048_rasterizer),
+    ],
+)
+def test_env_rasterizers(env: Environment, rasterizer: ModuleType) -> None:
+    """Validates that the environments' rasterizers jit and vmap over a batch of states."""
+    states, timesteps = jax.vmap(env.reset)(jax.random.split(jax.random.PRNGKey(0), 3))
+    frames = jax.jit(
+        jax.vmap(rasterizer.rasterize, in_axes=(0, None)), static_argnums=1
+    )(states, 4)
+    assert frames.dtype == np.uint8
+    assert frames.shape[0] == 3 and frames.shape[-1] == 3
+    assert frames.shape[1] % 4 == 0 and frames.shape[2] % 4 == 0
+    assert len(np.unique(np.asarray(frames[0]).reshape(-1, 3), axis=0)) > 1
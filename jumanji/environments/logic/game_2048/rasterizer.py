@@ -0,0 +1,37 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import chex
+import jax.numpy as jnp
+
+from jumanji.environments.commons.rasterizer import make_palette, rasterize_grid
+from jumanji.environments.logic.game_2048.types import State
+from jumanji.environments.logic.game_2048.viewer import Game2048Viewer
+
+# Tiles are colored by their exponent (0 for empty tiles) as in the viewer, the values above
+# 2**MAX_EXPONENT share the "other" color, followed by the edge color.
+MAX_EXPONENT = 14
+PALETTE = make_palette(
+    [Game2048Viewer.COLORS[2**exponent] for exponent in range(MAX_EXPONENT + 1)]
+    + [Game2048Viewer.COLORS["other"], Game2048Viewer.COLORS["edge"]]
+)
+EDGE = MAX_EXPONENT + 2
+
+
+def rasterize(state: State, cell_size: int = 8) -> chex.Array:
+    """Jittable rendering of a 2048 state as a uint8 RGB frame of shape
+    (board_size * cell_size, board_size * cell_size, 3), use `jax.vmap` for a batch of states.
+    """
+    cells = jnp.minimum(state.board, MAX_EXPONENT + 1)
+    return rasterize_grid(cells, PALETTE, cell_size, grid_color=EDGE)
@@ -48,6 +48,7 @@ class Minesweeper(Environment[State]):
         - num_mines: jax array (int32) of shape `()`, indicates the number of mines to locate.
         - step_count: jax array (int32) of shape ():
             specifies how many timesteps have elapsed since environment reset.
+        If `compact_observation` is True, the board is a jax array (int8) instead.
 
     - action:
         multi discrete array containing the square to explore (row and col).
@@ -93,6 +94,7 @@ class Minesweeper(Environment[State]):
         reward_function: Optional[RewardFn] = None,
         done_function: Optional[DoneFn] = None,
         viewer: Optional[Viewer[State]] = None,
+        compact_observation: bool = False,
     ):
         """Instantiate a `Minesweeper` environment.
 
@@ -114,6 +116,8 @@ class Minesweeper(Environment[State]):
                 episode on solving the board, revealing a mine, or picking an invalid action.
             viewer: `Viewer` to support rendering and animation methods.
                 Implemented options are [`MinesweeperViewer`]. Defaults to `MinesweeperViewer`.
+            compact_observation: whether to emit the observation board as int8 instead of int32,
+                which makes it 4 times smaller. Defaults to False.
         """
         self.reward_function = reward_function or DefaultRewardFn(
             revealed_empty_square_reward=1.0,
@@ -127,6 +131,7 @@ class Minesweeper(Environment[State]):
         self.num_rows = self.generator.num_rows
         self.num_cols = self.generator.num_cols
         self.num_mines = self.generator.num_mines
+        self.compact_observation = compact_observation
         self._viewer = viewer or MinesweeperViewer(
             num_rows=self.num_rows, num_cols=self.num_cols
         )
@@ -187,14 +192,15 @@ class Minesweeper(Environment[State]):
 
         Returns:
             Spec for the `Observation` whose fields are:
-             - board: BoundedArray (int32) of shape (num_rows, num_cols).
+             - board: BoundedArray (int32, or int8 if `compact_observation` is True) of shape
+                (num_rows, num_cols).
              - action_mask: BoundedArray (bool) of shape (num_rows, num_cols).
              - num_mines: BoundedArray (int32) of shape ().
              - step_count: BoundedArray (int32) of shape ().
         """
         board = specs.BoundedArray(
             shape=(self.num_rows, self.num_cols),
-            dtype=jnp.int32,
+            dtype=jnp.int8 if self.compact_observation else jnp.int32,
             minimum=-1,
             maximum=PATCH_SIZE * PATCH_SIZE - 1,
             name="board",
@@ -243,8 +249,11 @@ class Minesweeper(Environment[State]):
         )
 
     def _state_to_observation(self, state: State) -> Observation:
+        board = (
+            state.board.astype(jnp.int8) if self.compact_observation else state.board
+        )
         return Observation(
-            board=state.board,
+            board=board,
             action_mask=jnp.equal(state.board, UNEXPLORED_ID),
             num_mines=jnp.array(self.num_mines, jnp.int32),
             step_count=state.step_count,
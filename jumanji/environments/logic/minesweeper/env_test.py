@@ -209,3 +209,13 @@ def test_minesweeper_animation(
     states = mocker.MagicMock()
     animation = minesweeper_env.animate(states)
     assert isinstance(animation, matplotlib.animation.Animation)
+
+
+def test_minesweeper__compact_observation() -> None:
+    """Validates that the compact observation contains the same board as int8."""
+    minesweeper_env = Minesweeper(compact_observation=True)
+    state, timestep = minesweeper_env.reset(jax.random.PRNGKey(0))
+    state, timestep = minesweeper_env.step(state, jnp.array([0, 0], jnp.int32))
+    minesweeper_env.observation_spec().validate(timestep.observation)
+    assert timestep.observation.board.dtype == jnp.int8
+    assert jnp.array_equal(timestep.observation.board, state.board)
@@ -0,0 +1,46 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import chex
+import jax.numpy as jnp
+
+from jumanji.environments.commons.rasterizer import (
+    NO_MARKER,
+    make_palette,
+    rasterize_grid,
+)
+from jumanji.environments.logic.minesweeper.constants import (
+    DEFAULT_COLOR_MAPPING,
+    IS_MINE,
+    UNEXPLORED_ID,
+)
+from jumanji.environments.logic.minesweeper.types import State
+from jumanji.environments.logic.minesweeper.utils import get_mined_board
+
+# Numbers of adjacent mines are drawn as squares with the colors of the viewer's digits.
+UNEXPLORED, EXPLORED, MINE, GRID, COUNT = 0, 1, 2, 3, 4
+PALETTE = make_palette(["lightgray", "white", "black", "black", *DEFAULT_COLOR_MAPPING])
+
+
+def rasterize(state: State, cell_size: int = 8) -> chex.Array:
+    """Jittable rendering of a Minesweeper state as a uint8 RGB frame of shape
+    (num_rows * cell_size, num_cols * cell_size, 3), use `jax.vmap` for a batch of states.
+    """
+    explored = state.board != UNEXPLORED_ID
+    mined = get_mined_board(state).reshape(state.board.shape) == IS_MINE
+    cells = jnp.where(explored, jnp.where(mined, MINE, EXPLORED), UNEXPLORED)
+    markers = jnp.where(
+        explored & ~mined & (state.board > 0), COUNT + state.board, NO_MARKER
+    )
+    return rasterize_grid(cells, PALETTE, cell_size, markers=markers, grid_color=GRID)
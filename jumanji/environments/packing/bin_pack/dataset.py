@@ -0,0 +1,136 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import glob
+import os
+import time
+from typing import Dict, List
+
+import chex
+import jax
+import jax.numpy as jnp
+import numpy as np
+
+from jumanji.environments.packing.bin_pack.generator import Generator
+from jumanji.environments.packing.bin_pack.types import State
+
+
+def save_solution_dataset(
+    generator: Generator,
+    key: chex.PRNGKey,
+    num_instances: int,
+    directory: str,
+    batch_size: int = 1024,
+) -> Dict[str, float]:
+    """Generate solved instances in vmapped batches and write them to disk chunk by chunk, e.g. to
+    build a supervised dataset for imitation learning.
+
+    Each batch is written to `directory/chunk_{index}.npz` with the arrays:
+    - items: int32 array of shape (batch_size, 3, max_num_items) of item lengths along x, y, z.
+    - items_mask: bool array of shape (batch_size, max_num_items) of the items to pack.
+    - items_location: int32 array of shape (batch_size, 3, max_num_items) of the x, y, z
+        coordinates of the items in the solution.
+    The instance is the solution with all its items unpacked, hence it is not saved separately.
+    Generation of the next batch is dispatched before the current one is written to disk so that
+    the device and the host work concurrently.
+
+    Args:
+        generator: `Generator` that implements `generate_solution`, e.g. `RandomGenerator`.
+        key: random key used to generate the instances.
+        num_instances: total number of solved instances to generate.
+        directory: directory in which the chunks are written, created if it does not exist. It
+            must not already hold chunks, which `load_solution_dataset` would mix with the new
+            ones.
+        batch_size: number of instances generated per vmapped call and written per chunk. The last
+            chunk may be smaller. Defaults to 1024.
+
+    Returns:
+        throughput report with the number of instances, the total time in seconds and the
+            number of instances generated and written per second.
+
+    Raises:
+        FileExistsError: if `directory` already holds chunks, e.g. from a previous dataset.
+    """
+    if num_instances <= 0 or batch_size <= 0:
+        raise ValueError(
+            f"Expected positive num_instances and batch_size, got {num_instances} and "
+            f"{batch_size}."
+        )
+    if _chunk_paths(directory):
+        raise FileExistsError(
+            f"{directory} already holds a dataset, write the new one to an empty directory."
+        )
+    os.makedirs(directory, exist_ok=True)
+    generate_batch = jax.jit(jax.vmap(generator.generate_solution))
+    num_batches = -(-num_instances // batch_size)
+    batch_keys = jax.random.split(key, num_batches)
+
+    def dispatch(batch_index: int) -> State:
+        keys = jax.random.split(batch_keys[batch_index], batch_size)
+        return generate_batch(keys)
+
+    start_time = time.perf_counter()
+    next_solutions = dispatch(0)
+    for batch_index in range(num_batches):
+        solutions = next_solutions
+        if batch_index + 1 < num_batches:
+            next_solutions = dispatch(batch_index + 1)
+        num_in_batch = min(batch_size, num_instances - batch_index * batch_size)
+        _save_chunk(
+            solutions,
+            num_in_batch,
+            os.path.join(directory, f"chunk_{batch_index:06d}.npz"),
+        )
+    total_time = time.perf_counter() - start_time
+    return {
+        "num_instances": num_instances,
+        "time": total_time,
+        "instances_per_second": num_instances / total_time,
+    }
+
+
+def load_solution_dataset(directory: str) -> Dict[str, np.ndarray]:
+    """Load all the chunks written by `save_solution_dataset` in a directory.
+
+    Args:
+        directory: directory containing the `chunk_*.npz` files.
+
+    Returns:
+        dictionary with the "items", "items_mask" and "items_location" arrays of all chunks
+            concatenated along the first axis.
+    """
+    chunk_paths = _chunk_paths(directory)
+    if not chunk_paths:
+        raise ValueError(f"No chunk found in {directory}.")
+    chunks = [dict(np.load(path)) for path in chunk_paths]
+    return {
+        name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]
+    }
+
+
+def _chunk_paths(directory: str) -> List[str]:
+    """Return the paths of the chunks in `directory`, in the order they were written."""
+    return sorted(glob.glob(os.path.join(directory, "chunk_*.npz")))
+
+
+def _save_chunk(solutions: State, num_instances: int, path: str) -> None:
+    """Transfer a batch of solutions to host and write its first `num_instances` instances."""
+    items = jnp.stack(solutions.items, axis=1)[:num_instances]
+    items_location = jnp.stack(solutions.items_location, axis=1)[:num_instances]
+    items_mask = solutions.items_mask[:num_instances]
+    items, items_location, items_mask = jax.device_get(
+        (items, items_location, items_mask)
+    )
+    np.savez(path, items=items, items_mask=items_mask, items_location=items_location)
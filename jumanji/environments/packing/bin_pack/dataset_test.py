@@ -0,0 +1,113 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import jax
+import jax.numpy as jnp
+import numpy as np
+import py
+import pytest
+
+from jumanji.environments.packing.bin_pack.dataset import (
+    load_solution_dataset,
+    save_solution_dataset,
+)
+from jumanji.environments.packing.bin_pack.generator import RandomGenerator
+from jumanji.environments.packing.bin_pack.types import Item, Location
+
+
+def test_save_solution_dataset(tmpdir: py.path.local) -> None:
+    """Validate that the saved dataset matches the solutions returned by the generator."""
+    generator = RandomGenerator(max_num_items=10, max_num_ems=20)
+    directory = str(tmpdir.join("dataset"))
+    report = save_solution_dataset(
+        generator,
+        jax.random.PRNGKey(0),
+        num_instances=5,
+        directory=directory,
+        batch_size=2,
+    )
+    assert report["num_instances"] == 5
+    assert report["instances_per_second"] > 0
+    assert len(tmpdir.join("dataset").listdir()) == 3
+
+    dataset = load_solution_dataset(directory)
+    assert dataset["items"].shape == (5, 3, 10)
+    assert dataset["items_location"].shape == (5, 3, 10)
+    assert dataset["items_mask"].shape == (5, 10)
+
+    batch_keys = jax.random.split(jax.random.PRNGKey(0), 3)
+    solution = generator.generate_solution(jax.random.split(batch_keys[1], 2)[1])
+    assert jnp.array_equal(Item(*dataset["items"][3]), solution.items)
+    assert jnp.array_equal(
+        Location(*dataset["items_location"][3]), solution.items_location
+    )
+    assert np.array_equal(dataset["items_mask"][3], solution.items_mask)
+
+
+@pytest.mark.parametrize(
+    "num_instances, batch_size", [(1, 4), (3, 4), (4, 4), (6, 4), (9, 4)]
+)
+def test_save_solution_dataset__batching(
+    tmpdir: py.path.local, num_instances: int, batch_size: int
+) -> None:
+    """Validate that a single batch, full batches and a partial last batch are all written."""
+    generator = RandomGenerator(max_num_items=5, max_num_ems=10)
+    directory = str(tmpdir.join("dataset"))
+    save_solution_dataset(
+        generator,
+        jax.random.PRNGKey(0),
+        num_instances=num_instances,
+        directory=directory,
+        batch_size=batch_size,
+    )
+    num_batches = -(-num_instances // batch_size)
+    assert len(tmpdir.join("dataset").listdir()) == num_batches
+    dataset = load_solution_dataset(directory)
+    assert dataset["items"].shape == (num_instances, 3, 5)
+    assert dataset["items_mask"].shape == (num_instances, 5)
+
+    # The last instance comes from the last batch.
+    batch_keys = jax.random.split(jax.random.PRNGKey(0), num_batches)
+    keys = jax.random.split(batch_keys[-1], batch_size)
+    solution = generator.generate_solution(keys[(num_instances - 1) % batch_size])
+    assert jnp.array_equal(Item(*dataset["items"][-1]), solution.items)
+
+
+def test_save_solution_dataset__invalid_num_instances(tmpdir: py.path.local) -> None:
+    generator = RandomGenerator(max_num_items=5, max_num_ems=10)
+    with pytest.raises(ValueError):
+        save_solution_dataset(
+            generator, jax.random.PRNGKey(0), num_instances=0, directory=str(tmpdir)
+        )
+
+
+def test_save_solution_dataset__existing_dataset(tmpdir: py.path.local) -> None:
+    """Validate that a directory holding a previous dataset is not overwritten, as loading it
+    would otherwise mix stale chunks with the new ones.
+    """
+    generator = RandomGenerator(max_num_items=5, max_num_ems=10)
+    directory = str(tmpdir.join("dataset"))
+    save_solution_dataset(
+        generator,
+        jax.random.PRNGKey(0),
+        num_instances=4,
+        directory=directory,
+        batch_size=2,
+    )
+    with pytest.raises(FileExistsError):
+        save_solution_dataset(
+            generator, jax.random.PRNGKey(1), num_instances=2, directory=directory
+        )
+    assert load_solution_dataset(directory)["items"].shape == (4, 3, 5)
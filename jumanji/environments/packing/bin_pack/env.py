@@ -112,6 +112,8 @@ class BinPack(Environment[State]):
     ```
     """
 
+    static_observation_fields = ("items", "items_mask")
+
     def __init__(
         self,
         generator: Optional[Generator] = None,
@@ -550,22 +552,28 @@ class BinPack(Environment[State]):
         )
 
         # Delete EMSs that intersect the new item.
-        ems_mask_after_intersect = ~item_space.intersect(state.ems) & state.ems_mask
+        with jax.named_scope("delete_intersected_ems"):
+            ems_mask_after_intersect = ~item_space.intersect(state.ems) & state.ems_mask
 
         # Get the EMSs created by splitting the intersected EMSs.
-        intersections_ems_dict, intersections_mask_dict = self._get_intersections_dict(
-            state, item_space, ems_mask_after_intersect
-        )
+        with jax.named_scope("split_intersected_ems"):
+            (
+                intersections_ems_dict,
+                intersections_mask_dict,
+            ) = self._get_intersections_dict(
+                state, item_space, ems_mask_after_intersect
+            )
 
         # Loop over intersection EMSs from all directions to add them to the current set of EMSs.
         new_ems = state.ems
         new_ems_mask = ems_mask_after_intersect
-        for intersection_ems, intersection_mask in zip(
-            intersections_ems_dict.values(), intersections_mask_dict.values()
-        ):
-            new_ems, new_ems_mask = self._add_ems(
-                intersection_ems, intersection_mask, new_ems, new_ems_mask
-            )
+        with jax.named_scope("add_ems"):
+            for intersection_ems, intersection_mask in zip(
+                intersections_ems_dict.values(), intersections_mask_dict.values()
+            ):
+                new_ems, new_ems_mask = self._add_ems(
+                    intersection_ems, intersection_mask, new_ems, new_ems_mask
+                )
 
         state.ems = new_ems
         state.ems_mask = new_ems_mask
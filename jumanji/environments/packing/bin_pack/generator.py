@@ -16,13 +16,17 @@ import abc
 import collections
 import csv
 import functools
+import glob
 import operator
-from typing import List, Tuple
+import os
+from typing import Iterator, List, Tuple
 
 import chex
 import jax
 import jax.numpy as jnp
+import numpy as np
 
+from jumanji.environments.commons.instance_bank import IndexedGenerator
 from jumanji.environments.packing.bin_pack.space import Space
 from jumanji.environments.packing.bin_pack.types import (
     Container,
@@ -41,6 +45,7 @@ from jumanji.tree_utils import tree_slice, tree_transpose
 TWENTY_FOOT_DIMS = (5870, 2330, 2200)
 
 CSV_COLUMNS = ["Item_Name", "Length", "Width", "Height", "Quantity"]
+DATASET_CSV_COLUMNS = ["Instance_Name"] + CSV_COLUMNS
 
 
 def make_container(container_dims: Tuple[int, int, int]) -> Container:
@@ -473,28 +478,13 @@ class CSVGenerator(Generator):
         return reset_state
 
     def _read_csv(self, csv_path: str) -> List[Tuple[str, int, int, int, int]]:
-        rows = []
-        with open(csv_path, newline="") as csvfile:
-            reader = csv.reader(csvfile)
-            for row_index, row in enumerate(reader):
-                if row_index == 0:
-                    if len(row) != len(CSV_COLUMNS):
-                        raise ValueError(
-                            f"Got wrong number of columns, expected: {', '.join(CSV_COLUMNS)}"
-                        )
-                    elif row != CSV_COLUMNS:
-                        raise ValueError("Columns in wrong order")
-                else:
-                    # Column order: Item_Name, Length, Width, Height, Quantity.
-                    rows.append(
-                        (
-                            row[0],
-                            int(row[1]),
-                            int(row[2]),
-                            int(row[3]),
-                            int(row[4]),
-                        )
-                    )
+        # Column order: Item_Name, Length, Width, Height, Quantity.
+        rows = [
+            (row[0], *_parse_item_row(row[1:], csv_path))
+            for row in _read_csv_rows(csv_path, CSV_COLUMNS)
+        ]
+        if not rows:
+            raise ValueError(f"No item found in {csv_path}.")
         return rows
 
     def _generate_list_of_items(
@@ -522,6 +512,202 @@ class CSVGenerator(Generator):
         return list_of_items
 
 
+class CSVDatasetGenerator(IndexedGenerator[State], Generator):
+    """`Generator` that streams a whole dataset of instances, e.g. a day of orders, from CSV files
+    and stages it on device. Each reset samples one of the staged instances uniformly at random,
+    which allows active search over many instances without parsing any file at reset time. The
+    generator can handle any container dimensions but assumes a 20-ft container by default.
+
+    The dataset is either:
+    - a directory of CSV files with the same columns as the ones expected by `CSVGenerator`, each
+        file defining one instance.
+    - a single CSV file whose first column `Instance_Name` groups the rows of the same instance,
+        followed by the columns expected by `CSVGenerator`. The rows of a given instance must be
+        contiguous.
+
+    Example of such a single CSV file:
+        Instance_Name,Item_Name,Length,Width,Height,Quantity
+        order_1,shape_1,1080,760,300,5
+        order_1,shape_2,1100,430,250,3
+        order_2,shape_1,500,500,600,2
+
+    Instances are read `chunk_size` at a time, padded to `max_num_items` with vectorized NumPy
+    operations and copied to device chunk by chunk, so that the host only ever holds one chunk.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_num_items: int,
+        max_num_ems: int,
+        container_dims: Tuple[int, int, int] = TWENTY_FOOT_DIMS,
+        chunk_size: int = 1024,
+    ):
+        """Instantiate a `CSVDatasetGenerator` that resets to instances of a dataset.
+
+        Args:
+            path: path to either a directory of CSV files or a single CSV file with an
+                `Instance_Name` column, see the class docstring.
+            max_num_items: number of items every instance is padded to. An error is raised if an
+                instance has more items.
+            max_num_ems: maximum number of ems the environment will handle. This defines the shape
+                of the EMS buffer that is kept in the environment state.
+            container_dims: (length, width, height) tuple of integers corresponding to the
+                dimensions of the container in millimeters. By default, assume a 20-ft container.
+            chunk_size: number of instances read and transferred to device at once. Defaults to
+                1024.
+        """
+        super().__init__(max_num_items, max_num_ems, container_dims)
+        self._chunk_size = chunk_size
+        if os.path.isdir(path):
+            chunks = self._read_directory_in_chunks(path)
+        else:
+            chunks = self._read_file_in_chunks(path)
+        staged_chunks = [jax.device_put(self._pad_chunk(*chunk)) for chunk in chunks]
+        if not staged_chunks:
+            raise ValueError(f"No instance found in {path}.")
+        # Item dimensions of shape (num_instances, 3, max_num_items).
+        self.items_dims = jnp.concatenate(staged_chunks, axis=0)
+        self.num_instances = self.items_dims.shape[0]
+
+    def generate_instance(self, index: chex.Numeric, key: chex.PRNGKey) -> State:
+        """See `IndexedGenerator.generate_instance`. Instances are indexed in the order they
+        were read.
+        """
+        container = make_container(self.container_dims)
+        list_of_ems = [container] + (self.max_num_ems - 1) * [empty_ems()]
+        items = Item(*self.items_dims[index])
+        items_mask = items.x_len > 0
+        return State(
+            container=container,
+            ems=tree_transpose(list_of_ems),
+            ems_mask=jnp.zeros(self.max_num_ems, bool).at[0].set(True),
+            items=items,
+            items_mask=items_mask,
+            items_placed=jnp.zeros(self.max_num_items, bool),
+            items_location=Location(
+                *tuple(jnp.zeros((3, self.max_num_items), jnp.int32))
+            ),
+            action_mask=None,
+            sorted_ems_indexes=jnp.arange(0, self.max_num_ems, dtype=jnp.int32),
+            key=key,
+        )
+
+    def _read_directory_in_chunks(
+        self, directory: str
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Yield the rows of `chunk_size` CSV files at a time, see `_pad_chunk` for the format."""
+        csv_paths = sorted(glob.glob(os.path.join(directory, "*.csv")))
+        for start in range(0, len(csv_paths), self._chunk_size):
+            instance_ids: List[int] = []
+            rows: List[Tuple[int, int, int, int]] = []
+            for instance_id, csv_path in enumerate(
+                csv_paths[start : start + self._chunk_size]
+            ):
+                # Column order: Item_Name, Length, Width, Height, Quantity.
+                file_rows = [
+                    _parse_item_row(row[1:], csv_path)
+                    for row in _read_csv_rows(csv_path, CSV_COLUMNS)
+                ]
+                if not file_rows:
+                    raise ValueError(f"No item found in {csv_path}.")
+                instance_ids.extend(len(file_rows) * [instance_id])
+                rows.extend(file_rows)
+            yield np.array(instance_ids), np.array(rows, np.int64)
+
+    def _read_file_in_chunks(
+        self, csv_path: str
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Yield the rows of `chunk_size` instances at a time, see `_pad_chunk` for the format."""
+        instance_ids: List[int] = []
+        rows: List[Tuple[int, int, int, int]] = []
+        previous_name = None
+        for row in _read_csv_rows(csv_path, DATASET_CSV_COLUMNS):
+            if row[0] != previous_name:
+                if instance_ids and instance_ids[-1] == self._chunk_size - 1:
+                    yield np.array(instance_ids), np.array(rows, np.int64)
+                    instance_ids, rows = [], []
+                previous_name = row[0]
+                instance_id = instance_ids[-1] + 1 if instance_ids else 0
+            # Column order: Instance_Name, Item_Name, Length, Width, Height, Quantity.
+            instance_ids.append(instance_id)
+            rows.append(_parse_item_row(row[2:], csv_path))
+        if instance_ids:
+            yield np.array(instance_ids), np.array(rows, np.int64)
+
+    def _pad_chunk(self, instance_ids: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Expand the item quantities of a chunk of instances and pad every instance to
+        `max_num_items` items without any Python loop over instances or items.
+
+        Args:
+            instance_ids: array of shape (num_rows,) of the index (within the chunk) of the
+                instance each row belongs to, in increasing order.
+            rows: array of shape (num_rows, 4) of the length, width, height and quantity of the
+                items defined by each row.
+
+        Returns:
+            array of shape (num_instances_in_chunk, 3, max_num_items) of item dimensions, padded
+                with zeros.
+        """
+        if len(instance_ids) == 0:
+            raise ValueError("Got a chunk of instances without any item.")
+        dims, quantities = rows[:, :3], rows[:, 3]
+        items_instance_ids = np.repeat(instance_ids, quantities)
+        items_dims = np.repeat(dims, quantities, axis=0)
+        num_instances = instance_ids[-1] + 1
+        num_items = np.bincount(items_instance_ids, minlength=num_instances)
+        if np.any(num_items > self.max_num_items):
+            raise ValueError(
+                f"Got an instance with {num_items.max()} items while max_num_items is "
+                f"{self.max_num_items}."
+            )
+        if np.any(items_dims <= 0):
+            raise ValueError("Item dimensions must be positive.")
+        first_item_index = np.cumsum(num_items) - num_items
+        items_position = (
+            np.arange(len(items_instance_ids)) - first_item_index[items_instance_ids]
+        )
+        padded_dims = np.zeros((num_instances, 3, self.max_num_items), np.int32)
+        padded_dims[items_instance_ids, :, items_position] = items_dims
+        return padded_dims
+
+
+def _read_csv_rows(csv_path: str, expected_columns: List[str]) -> Iterator[List[str]]:
+    """Yield the non-empty rows of a CSV file after checking its header. This is the single CSV
+    parser of the generators, whether an instance is read from its own file or from a dataset.
+    """
+    with open(csv_path, newline="") as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader, None)
+        if header is None:
+            raise ValueError(
+                f"{csv_path} is empty, expected the header: {', '.join(expected_columns)}."
+            )
+        _check_csv_header(header, expected_columns)
+        yield from (row for row in reader if row)
+
+
+def _parse_item_row(row: List[str], csv_path: str) -> Tuple[int, int, int, int]:
+    """Parse the length, width, height and quantity columns of an item row."""
+    try:
+        x_len, y_len, z_len, quantity = (int(value) for value in row)
+    except ValueError as error:
+        raise ValueError(
+            f"Expected 4 integers for the length, width, height and quantity of an item in "
+            f"{csv_path}, got {row}."
+        ) from error
+    return x_len, y_len, z_len, quantity
+
+
+def _check_csv_header(header: List[str], expected_columns: List[str]) -> None:
+    if len(header) != len(expected_columns):
+        raise ValueError(
+            f"Got wrong number of columns, expected: {', '.join(expected_columns)}"
+        )
+    elif header != expected_columns:
+        raise ValueError("Columns in wrong order")
+
+
 def save_instance_to_csv(state: State, path: str) -> None:
     """Save an instance to a CSV file. The conversion to CSV will save item dimensions
     in millimeters.
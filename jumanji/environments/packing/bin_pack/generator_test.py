@@ -20,6 +20,7 @@ import pytest
 
 from jumanji.environments.packing.bin_pack.conftest import DummyGenerator
 from jumanji.environments.packing.bin_pack.generator import (
+    CSVDatasetGenerator,
     CSVGenerator,
     RandomGenerator,
     ToyGenerator,
@@ -143,6 +144,106 @@ class TestCSVGenerator:
         )
         assert_trees_are_equal(state1, state2)
 
+    @pytest.mark.parametrize(
+        "content", ["", "Item_Name,Length,Width,Height,Quantity\n"]
+    )
+    def test_csv_generator__empty_file(
+        self, tmpdir: py.path.local, content: str
+    ) -> None:
+        """Validate that an empty or header-only file raises a ValueError."""
+        path = tmpdir.join("instance.csv")
+        path.write(content)
+        with pytest.raises(ValueError):
+            CSVGenerator(str(path), max_num_ems=20)
+
+
+class TestCSVDatasetGenerator:
+    @pytest.fixture
+    def dataset_csv_path(self, tmpdir: py.path.local) -> str:
+        """Write a single CSV file that defines 3 instances of respectively 7, 1 and 4 items."""
+        path = str(tmpdir.join("dataset.csv"))
+        with open(path, "w") as csvfile:
+            csvfile.write(
+                "Instance_Name,Item_Name,Length,Width,Height,Quantity\n"
+                "order_1,shape_1,1000,700,900,5\n"
+                "order_1,shape_2,500,500,600,2\n"
+                "order_2,shape_1,300,300,300,1\n"
+                "order_3,shape_1,400,200,100,4\n"
+            )
+        return path
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 4])
+    def test_csv_dataset_generator__single_file(
+        self, dataset_csv_path: str, chunk_size: int
+    ) -> None:
+        """Validate that instances are padded and staged in order whatever the chunk size."""
+        generator = CSVDatasetGenerator(
+            dataset_csv_path, max_num_items=8, max_num_ems=20, chunk_size=chunk_size
+        )
+        assert generator.num_instances == 3
+        assert generator.items_dims.shape == (3, 3, 8)
+        state = generator.generate_instance(0, jax.random.PRNGKey(0))
+        assert jnp.array_equal(state.items_mask, jnp.arange(8) < 7)
+        assert jnp.array_equal(state.items.x_len[:7], jnp.array(5 * [1000] + 2 * [500]))
+        state = generator.generate_instance(2, jax.random.PRNGKey(0))
+        assert jnp.array_equal(state.items_mask, jnp.arange(8) < 4)
+        assert jnp.all(state.items.z_len[:4] == 100)
+
+    def test_csv_dataset_generator__directory(
+        self, dummy_state: State, tmpdir: py.path.local
+    ) -> None:
+        """Validate that a directory of CSV files is read in the same way as `CSVGenerator`."""
+        for i in range(3):
+            save_instance_to_csv(dummy_state, str(tmpdir.join(f"instance_{i}.csv")))
+        generator = CSVDatasetGenerator(
+            str(tmpdir), max_num_items=5, max_num_ems=20, chunk_size=2
+        )
+        assert generator.num_instances == 3
+        chex.clear_trace_counter()
+        call_fn = jax.jit(chex.assert_max_traces(generator.__call__, n=1))
+        state = call_fn(jax.random.PRNGKey(1))
+        state = call_fn(jax.random.PRNGKey(2))
+        assert jnp.sum(state.items_mask) == jnp.sum(dummy_state.items_mask)
+        assert_trees_are_equal(
+            item_volume(state.items).sum(), item_volume(dummy_state.items).sum()
+        )
+
+    def test_csv_dataset_generator__too_many_items(self, dataset_csv_path: str) -> None:
+        with pytest.raises(ValueError):
+            CSVDatasetGenerator(dataset_csv_path, max_num_items=6, max_num_ems=20)
+
+    @pytest.mark.parametrize(
+        "content", ["", "Item_Name,Length,Width,Height,Quantity\n"]
+    )
+    def test_csv_dataset_generator__empty_directory_file(
+        self, tmpdir: py.path.local, content: str
+    ) -> None:
+        """Validate that an empty or header-only file of a directory raises a ValueError."""
+        tmpdir.join("instance_0.csv").write(content)
+        with pytest.raises(ValueError):
+            CSVDatasetGenerator(str(tmpdir), max_num_items=5, max_num_ems=20)
+
+    @pytest.mark.parametrize(
+        "content", ["", "Instance_Name,Item_Name,Length,Width,Height,Quantity\n"]
+    )
+    def test_csv_dataset_generator__empty_file(
+        self, tmpdir: py.path.local, content: str
+    ) -> None:
+        """Validate that an empty or header-only dataset file raises a ValueError."""
+        path = tmpdir.join("dataset.csv")
+        path.write(content)
+        with pytest.raises(ValueError):
+            CSVDatasetGenerator(str(path), max_num_items=5, max_num_ems=20)
+
+    def test_csv_dataset_generator__invalid_row(self, tmpdir: py.path.local) -> None:
+        path = tmpdir.join("dataset.csv")
+        path.write(
+            "Instance_Name,Item_Name,Length,Width,Height,Quantity\n"
+            "order_1,shape_1,1000,700,900\n"
+        )
+        with pytest.raises(ValueError):
+            CSVDatasetGenerator(str(path), max_num_items=5, max_num_ems=20)
+
 
 class TestRandomGenerator:
     @pytest.fixture
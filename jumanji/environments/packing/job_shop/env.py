@@ -89,6 +89,8 @@ class JobShop(Environment[State]):
     ```
     """
 
+    static_observation_fields = ("ops_machine_ids", "ops_durations")
+
     def __init__(
         self,
         generator: Optional[Generator] = None,
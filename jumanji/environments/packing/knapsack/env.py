@@ -22,6 +22,10 @@ from numpy.typing import NDArray
 
 from jumanji import specs
 from jumanji.env import Environment
+from jumanji.environments.packing.knapsack.generator import (
+    Generator,
+    RandomGenerator,
+)
 from jumanji.environments.packing.knapsack.reward import DenseReward, RewardFn
 from jumanji.environments.packing.knapsack.types import Observation, State
 from jumanji.environments.packing.knapsack.viewer import KnapsackViewer
@@ -63,7 +67,9 @@ class Knapsack(Environment[State]):
         - values: jax array (float) of shape (num_items,)
             the values of the items.
         - packed_items: jax array (bool) of shape (num_items,)
-            binary mask denoting which items are already packed into the knapsack.
+            binary mask denoting which items are already packed into the knapsack. Instances
+            smaller than the environment are padded with items of zero weight and value that
+            are marked as packed from the start.
         - remaining_budget: jax array (float)
             the budget currently remaining.
 
@@ -81,33 +87,53 @@ class Knapsack(Environment[State]):
     ```
     """
 
+    static_observation_fields = ("weights", "values")
+
     def __init__(
         self,
         num_items: int = 50,
         total_budget: float = 12.5,
+        generator: Optional[Generator] = None,
         reward_fn: Optional[RewardFn] = None,
         viewer: Optional[Viewer[State]] = None,
+        min_num_items: Optional[int] = None,
+        max_num_items: Optional[int] = None,
     ):
         """Instantiates a `Knapsack` environment.
 
         Args:
             num_items: the number of items in the environment. Defaults to 50.
             total_budget: the capacity of the knapsack. Defaults to 12.5.
+            generator: `Generator` used to generate problem instances on reset. Implemented
+                options are [`RandomGenerator`, `InstanceBankGenerator`]. Defaults to
+                `RandomGenerator` built from `num_items` and `total_budget`, which are ignored if
+                a generator is given and read from the generator instead.
             reward_fn: `RewardFn` whose `__call__` method computes the reward of an environment
                 transition. The function must compute the reward based on the current state,
                 the chosen action, the next state and whether the action is valid.
                 Implemented options are [`DenseReward`, `SparseReward`]. Defaults to `DenseReward`.
             viewer: `Viewer` used for rendering. Defaults to `KnapsackViewer` with "human" render
                 mode.
+            min_num_items: minimum number of items of the instances generated by the default
+                `RandomGenerator`, which are padded to `num_items` items so that instances of
+                different sizes share the same compiled programs. Defaults to `max_num_items`.
+            max_num_items: maximum number of items of the instances generated by the default
+                `RandomGenerator`. Defaults to `num_items`.
         """
 
-        self.num_items = num_items
-        self.total_budget = total_budget
+        self.generator = generator or RandomGenerator(
+            num_items=num_items,
+            total_budget=total_budget,
+            min_num_items=min_num_items,
+            max_num_items=max_num_items,
+        )
+        self.num_items = self.generator.num_items
+        self.total_budget = self.generator.total_budget
         self.reward_fn = reward_fn or DenseReward()
         self._viewer = viewer or KnapsackViewer(
             name="Knapsack",
             render_mode="human",
-            total_budget=total_budget,
+            total_budget=self.total_budget,
         )
 
     def __repr__(self) -> str:
@@ -120,23 +146,13 @@ class Knapsack(Environment[State]):
         """Resets the environment.
 
         Args:
-            key: used to randomly generate the weights and values of the items.
+            key: used by the generator to randomly generate the weights and values of the items.
 
         Returns:
             state: the new state of the environment.
             timestep: the first timestep returned by the environment.
         """
-        key, sample_key = jax.random.split(key)
-        weights, values = jax.random.uniform(
-            sample_key, (2, self.num_items), minval=0, maxval=1
-        )
-        state = State(
-            weights=weights,
-            values=values,
-            packed_items=jnp.zeros(self.num_items, dtype=bool),
-            remaining_budget=jnp.array(self.total_budget, float),
-            key=key,
-        )
+        state = self.generator(key)
         timestep = restart(observation=self._state_to_observation(state))
         return state, timestep
 
@@ -0,0 +1,164 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import abc
+from typing import Mapping, Optional, Union
+
+import chex
+import jax
+import jax.numpy as jnp
+
+from jumanji.environments.commons.instance_bank import (
+    IndexedGenerator,
+    InstanceBankSource,
+    load_instance_bank,
+    select_from_instance_bank,
+)
+from jumanji.environments.packing.knapsack.types import State
+
+
+class Generator(abc.ABC):
+    """Defines the abstract `Generator` base class. A `Generator` is responsible
+    for generating an instance when the environment is reset.
+    """
+
+    def __init__(self, num_items: int, total_budget: float):
+        """Abstract class implementing the attributes `num_items` and `total_budget`.
+
+        Args:
+            num_items: the number of items in the problem instance.
+            total_budget: the capacity of the knapsack.
+        """
+        self.num_items = num_items
+        self.total_budget = total_budget
+
+    @abc.abstractmethod
+    def __call__(self, key: chex.PRNGKey) -> State:
+        """Generate a new instance.
+
+        Args:
+            key: random key used for any stochasticity in the instance generation process.
+
+        Returns:
+            A `Knapsack` state.
+        """
+
+    def _make_state(
+        self,
+        weights: chex.Array,
+        values: chex.Array,
+        key: chex.PRNGKey,
+        num_items: Optional[chex.Numeric] = None,
+    ) -> State:
+        """Return the initial state of an episode on the given items, with an empty knapsack. If
+        `num_items` is given, only the first `num_items` items belong to the instance, the other
+        ones are padding: their weights and values are zeroed and they are marked as packed.
+        """
+        if num_items is None:
+            num_items = self.num_items
+        is_padding = jnp.arange(self.num_items) >= num_items
+        return State(
+            weights=jnp.where(is_padding, 0, weights),
+            values=jnp.where(is_padding, 0, values),
+            packed_items=is_padding,
+            remaining_budget=jnp.array(self.total_budget, float),
+            key=key,
+        )
+
+
+class RandomGenerator(Generator):
+    """Instance generator that samples the weights and values of the items uniformly at random
+    in [0, 1]. Instances can have fewer items than `num_items`, in which case the number of items
+    is sampled uniformly in [`min_num_items`, `max_num_items`] and the instance is padded to
+    `num_items` items.
+    """
+
+    def __init__(
+        self,
+        num_items: int,
+        total_budget: float,
+        min_num_items: Optional[int] = None,
+        max_num_items: Optional[int] = None,
+    ):
+        """Instantiates a `RandomGenerator`.
+
+        Args:
+            num_items: the number of items of the arrays of an instance, padding included.
+            total_budget: the capacity of the knapsack.
+            min_num_items: the minimum number of items of an instance. Defaults to
+                `max_num_items`.
+            max_num_items: the maximum number of items of an instance. Defaults to `num_items`.
+        """
+        super().__init__(num_items=num_items, total_budget=total_budget)
+        self.max_num_items = max_num_items or num_items
+        self.min_num_items = min_num_items or self.max_num_items
+        if not 1 <= self.min_num_items <= self.max_num_items <= num_items:
+            raise ValueError(
+                "Expected 1 <= min_num_items <= max_num_items <= num_items, got "
+                f"{self.min_num_items}, {self.max_num_items} and {num_items}."
+            )
+
+    def __call__(self, key: chex.PRNGKey) -> State:
+        key, sample_key = jax.random.split(key)
+        weights, values = jax.random.uniform(
+            sample_key, (2, self.num_items), minval=0, maxval=1
+        )
+        if self.min_num_items == self.max_num_items:
+            num_items = self.max_num_items
+        else:
+            key, size_key = jax.random.split(key)
+            num_items = jax.random.randint(
+                size_key, (), self.min_num_items, self.max_num_items + 1
+            )
+        return self._make_state(weights, values, key, num_items)
+
+
+class InstanceBankGenerator(IndexedGenerator[State], Generator):
+    """Instance generator that samples instances from a fixed bank (e.g. a benchmark set). The bank
+    is transferred to the device once at construction, so that resetting the environment is a
+    single gather rather than a host-to-device copy.
+    """
+
+    def __init__(
+        self, source: Union[InstanceBankSource, chex.ArrayNumpy], total_budget: float
+    ):
+        """Instantiates an `InstanceBankGenerator`.
+
+        Args:
+            source: either an array or a path to a `.npy` file of shape (num_instances, 2,
+                num_items) holding the weights and values of each instance, or a mapping/path to
+                a `.npz` archive with "weights" and "values" arrays of shape
+                (num_instances, num_items). Weights and values are expected in [0, 1]. The
+                archive may also hold a "num_items" array of shape (num_instances,) for banks of
+                instances of different sizes padded to `num_items` items, see
+                `jumanji.environments.commons.instance_bank.pad_instances`.
+            total_budget: the capacity of the knapsack.
+        """
+        if isinstance(source, str) and source.endswith(".npy"):
+            source = load_instance_bank(source, fields=["items"])["items"]
+        if not isinstance(source, (str, Mapping)):
+            source = {"weights": source[:, 0], "values": source[:, 1]}
+        self.bank = load_instance_bank(
+            source, fields=["weights", "values"], optional_fields=["num_items"]
+        )
+        self.num_instances, num_items = self.bank["weights"].shape
+        super().__init__(num_items=num_items, total_budget=total_budget)
+
+    def generate_instance(self, index: chex.Numeric, key: chex.PRNGKey) -> State:
+        """See `IndexedGenerator.generate_instance`."""
+        instance = select_from_instance_bank(index, self.bank)
+        return self._make_state(
+            instance["weights"], instance["values"], key, instance.get("num_items")
+        )
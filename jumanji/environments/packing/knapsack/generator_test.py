@@ -0,0 +1,108 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import chex
+import jax
+import jax.numpy as jnp
+import numpy as np
+import py
+import pytest
+
+from jumanji.environments.packing.knapsack.env import Knapsack
+from jumanji.environments.packing.knapsack.generator import (
+    InstanceBankGenerator,
+    RandomGenerator,
+)
+from jumanji.testing.env_not_smoke import check_env_does_not_smoke
+from jumanji.testing.pytrees import assert_trees_are_different
+
+
+@pytest.fixture
+def items_bank() -> np.ndarray:
+    return np.random.RandomState(0).uniform(size=(3, 2, 10)).astype(np.float32)
+
+
+def test_random_generator__call() -> None:
+    """Validate that the random generator creates different instances for different keys."""
+    generator = RandomGenerator(num_items=10, total_budget=2.5)
+    chex.clear_trace_counter()
+    call_fn = jax.jit(chex.assert_max_traces(generator.__call__, n=1))
+    state1 = call_fn(jax.random.PRNGKey(1))
+    state2 = call_fn(jax.random.PRNGKey(2))
+    assert state1.weights.shape == (10,)
+    assert state1.remaining_budget == 2.5
+    assert_trees_are_different(state1, state2)
+
+
+def test_random_generator__padded_instances() -> None:
+    """Validate that instances of sampled sizes are padded with packed items of zero weight and
+    value, which the agent can never select.
+    """
+    env = Knapsack(num_items=10, total_budget=2.5, min_num_items=3, max_num_items=6)
+    states, timesteps = jax.jit(jax.vmap(env.reset))(
+        jax.random.split(jax.random.PRNGKey(0), 50)
+    )
+    num_items = jnp.sum(~states.packed_items, axis=-1)
+    assert jnp.all((3 <= num_items) & (num_items <= 6))
+    assert len(jnp.unique(num_items)) > 1
+    assert jnp.all(jnp.where(states.packed_items, states.weights, 0) == 0)
+    assert jnp.all(jnp.where(states.packed_items, states.values, 0) == 0)
+    assert not jnp.any(timesteps.observation.action_mask & states.packed_items)
+    check_env_does_not_smoke(env)
+
+
+def test_instance_bank_generator__call(items_bank: np.ndarray) -> None:
+    """Validate that the instance bank generator only samples instances from the bank."""
+    generator = InstanceBankGenerator(items_bank, total_budget=2.5)
+    assert generator.num_items == 10 and generator.num_instances == 3
+    call_fn = jax.jit(generator.__call__)
+    for key in jax.random.split(jax.random.PRNGKey(0), 10):
+        state = call_fn(key)
+        items = jnp.stack([state.weights, state.values])
+        assert jnp.any(jnp.all(items == items_bank, axis=(1, 2)))
+
+
+def test_instance_bank_generator__generate_instance(items_bank: np.ndarray) -> None:
+    """Validate that every instance of the bank can be selected by its index with a single
+    compiled program.
+    """
+    generator = InstanceBankGenerator(items_bank, total_budget=2.5)
+    chex.clear_trace_counter()
+    generate_fn = jax.jit(chex.assert_max_traces(generator.generate_instance, n=1))
+    for index in range(generator.num_instances):
+        state = generate_fn(index, jax.random.PRNGKey(index))
+        assert jnp.array_equal(state.weights, items_bank[index, 0])
+        assert jnp.array_equal(state.values, items_bank[index, 1])
+
+
+def test_instance_bank_generator__from_file(
+    items_bank: np.ndarray, tmpdir: py.path.local
+) -> None:
+    """Validate that the bank can be memory-mapped from a `.npy` file or read from a `.npz`."""
+    npy_path = str(tmpdir.join("bank.npy"))
+    np.save(npy_path, items_bank)
+    npz_path = str(tmpdir.join("bank.npz"))
+    np.savez(npz_path, weights=items_bank[:, 0], values=items_bank[:, 1])
+    for path in [npy_path, npz_path]:
+        generator = InstanceBankGenerator(path, total_budget=2.5)
+        assert jnp.array_equal(generator.bank["weights"], items_bank[:, 0])
+        assert jnp.array_equal(generator.bank["values"], items_bank[:, 1])
+
+
+def test_knapsack__instance_bank_generator(items_bank: np.ndarray) -> None:
+    """Validate that the environment takes its size from the generator."""
+    env = Knapsack(generator=InstanceBankGenerator(items_bank, total_budget=2.5))
+    assert env.num_items == 10 and env.total_budget == 2.5
+    check_env_does_not_smoke(env)
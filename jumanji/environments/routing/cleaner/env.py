@@ -43,6 +43,7 @@ class Cleaner(Environment[State]):
             indicates for each agent if each of the four actions (up, right, down, left) is allowed.
         - step_count: (int32)
             the number of step since the beginning of the episode.
+        If `compact_observation` is True, the grid is a jax array (uint8) instead.
 
     - action: jax array (int32) of shape (num_agents,)
         the action for each agent: (0: up, 1: right, 2: down, 3: left)
@@ -86,6 +87,7 @@ class Cleaner(Environment[State]):
         time_limit: Optional[int] = None,
         penalty_per_timestep: float = 0.5,
         viewer: Optional[Viewer[State]] = None,
+        compact_observation: bool = False,
     ) -> None:
         """Instantiates a `Cleaner` environment.
 
@@ -98,6 +100,8 @@ class Cleaner(Environment[State]):
             viewer: `Viewer` used for rendering. Defaults to `CleanerViewer` with "human" render
                 mode.
             penalty_per_timestep: the penalty returned at each timestep in the reward.
+            compact_observation: whether to emit the observation grid as uint8 instead of int32,
+                which makes it 4 times smaller. Defaults to False.
         """
         self.generator = generator or RandomGenerator(
             num_rows=10, num_cols=10, num_agents=3
@@ -108,6 +112,7 @@ class Cleaner(Environment[State]):
         self.grid_shape = (self.num_rows, self.num_cols)
         self.time_limit = time_limit or (self.num_rows * self.num_cols)
         self.penalty_per_timestep = penalty_per_timestep
+        self.compact_observation = compact_observation
 
         # Create viewer used for rendering
         self._viewer = viewer or CleanerViewer("Cleaner", render_mode="human")
@@ -127,15 +132,16 @@ class Cleaner(Environment[State]):
 
         Returns:
             Spec for the `Observation`, consisting of the fields:
-                - grid: BoundedArray (int32) of shape (num_rows, num_cols). Values
-                    are between 0 and 2 (inclusive).
+                - grid: BoundedArray (int32, or uint8 if `compact_observation` is True) of
+                    shape (num_rows, num_cols). Values are between 0 and 2 (inclusive).
                 - agent_locations_spec: BoundedArray (int32) of shape (num_agents, 2).
                     Maximum value for the first column is num_rows, and maximum value
                     for the second is num_cols.
                 - action_mask: BoundedArray (bool) of shape (num_agent, 4).
                 - step_count: BoundedArray (int32) of shape ().
         """
-        grid = specs.BoundedArray(self.grid_shape, jnp.int32, 0, 2, "grid")
+        grid_dtype = jnp.uint8 if self.compact_observation else jnp.int32
+        grid = specs.BoundedArray(self.grid_shape, grid_dtype, 0, 2, "grid")
         agents_locations = specs.BoundedArray(
             (self.num_agents, 2), jnp.int32, [0, 0], self.grid_shape, "agents_locations"
         )
@@ -328,8 +334,9 @@ class Cleaner(Environment[State]):
 
     def _observation_from_state(self, state: State) -> Observation:
         """Create an observation from the state of the environment."""
+        grid = state.grid.astype(jnp.uint8) if self.compact_observation else state.grid
         return Observation(
-            grid=state.grid,
+            grid=grid,
             agents_locations=state.agents_locations,
             action_mask=state.action_mask,
             step_count=state.step_count,
@@ -201,3 +201,11 @@ class TestCleaner:
             grid != WALL
         )
         assert extras["num_dirty_tiles"] == jnp.sum(grid == DIRTY)
+
+    def test_cleaner__compact_observation(self, key: chex.PRNGKey) -> None:
+        """Validates that the compact observation contains the same grid as uint8."""
+        cleaner = Cleaner(generator=DummyGenerator(), compact_observation=True)
+        state, timestep = cleaner.reset(key)
+        cleaner.observation_spec().validate(timestep.observation)
+        assert timestep.observation.grid.dtype == jnp.uint8
+        assert jnp.array_equal(timestep.observation.grid, state.grid)
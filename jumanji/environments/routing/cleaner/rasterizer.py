@@ -0,0 +1,44 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import chex
+import jax.numpy as jnp
+
+from jumanji.environments.commons.rasterizer import (
+    NO_MARKER,
+    make_palette,
+    rasterize_grid,
+)
+from jumanji.environments.routing.cleaner.constants import CLEAN, DIRTY, WALL
+from jumanji.environments.routing.cleaner.types import State
+
+# Palette indexed by the tile values of the grid, followed by the agents' color.
+AGENT = 3
+PALETTE = make_palette(
+    [{DIRTY: "lime", CLEAN: "white", WALL: "black"}[tile] for tile in range(3)]
+    + ["red"]
+)
+
+
+def rasterize(state: State, cell_size: int = 8) -> chex.Array:
+    """Jittable rendering of a Cleaner state as a uint8 RGB frame of shape
+    (num_rows * cell_size, num_cols * cell_size, 3), use `jax.vmap` for a batch of states.
+    Agents are drawn as squares on top of their tile.
+    """
+    markers = (
+        jnp.full_like(state.grid, NO_MARKER)
+        .at[state.agents_locations[:, 0], state.agents_locations[:, 1]]
+        .set(AGENT)
+    )
+    return rasterize_grid(state.grid, PALETTE, cell_size, markers=markers)
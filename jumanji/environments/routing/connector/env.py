@@ -70,6 +70,7 @@ class Connector(Environment[State]):
 
               This would just be agent 0's view, the numbers would be flipped for agent 1's view.
               So the full observation would be of shape (2, 3, 3).
+            - if `compact_observation` is True, the grid is a jax array (uint8) instead.
 
     - action: jax array (int32) of shape (num_agents,):
         - can take the values [0,1,2,3,4] which correspond to [No Op, Up, Right, Down, Left].
@@ -106,6 +107,7 @@ class Connector(Environment[State]):
         reward_fn: Optional[RewardFn] = None,
         time_limit: int = 50,
         viewer: Optional[Viewer[State]] = None,
+        compact_observation: bool = False,
     ) -> None:
         """Create the `Connector` environment.
 
@@ -118,6 +120,9 @@ class Connector(Environment[State]):
             time_limit: the number of steps allowed before an episode terminates. Defaults to 50.
             viewer: `Viewer` used for rendering. Defaults to `ConnectorViewer` with "human" render
                 mode.
+            compact_observation: whether to emit the observation grid as uint8 instead of int32,
+                which makes it 4 times smaller. Requires `num_agents * 3 + 1 <= 255`.
+                Defaults to False.
         """
         self._generator = generator or UniformRandomGenerator(
             grid_size=10, num_agents=5
@@ -126,6 +131,12 @@ class Connector(Environment[State]):
         self.time_limit = time_limit
         self.num_agents = self._generator.num_agents
         self.grid_size = self._generator.grid_size
+        self.compact_observation = compact_observation
+        if compact_observation and self.num_agents * 3 + AGENT_INITIAL_VALUE > 255:
+            raise ValueError(
+                "A compact observation requires num_agents * 3 + 1 <= 255, "
+                f"got num_agents={self.num_agents}."
+            )
         self._agent_ids = jnp.arange(self.num_agents)
         self._viewer = viewer or ConnectorViewer(
             "Connector", self.num_agents, render_mode="human"
@@ -222,31 +233,36 @@ class Connector(Environment[State]):
         """
         agent_ids = jnp.arange(self.num_agents)
         # Step all agents at the same time (separately) and return all of the grids
-        agents, grids = jax.vmap(self._step_agent, in_axes=(0, None, 0))(
-            state.agents, state.grid, action
-        )
+        with jax.named_scope("move_agents"):
+            agents, grids = jax.vmap(self._step_agent, in_axes=(0, None, 0))(
+                state.agents, state.grid, action
+            )
 
         # Get grids with only values related to a single agent.
         # For example: remove all other agents from agent 1's grid. Do this for all agents.
-        agent_grids = jax.vmap(get_agent_grid)(agent_ids, grids)
-        joined_grid = jnp.max(agent_grids, 0)  # join the grids
-
-        # Create a correction mask for possible collisions (see the docs of `get_correction_mask`)
-        correction_fn = jax.vmap(get_correction_mask, in_axes=(None, None, 0))
-        correction_masks, collided_agents = correction_fn(
-            state.grid, joined_grid, agent_ids
-        )
-        correction_mask = jnp.sum(correction_masks, 0)
-
-        # Correct state.agents
-        # Get the correct agents, either old agents (if collision) or new agents if no collision
-        agents = jax.vmap(
-            lambda collided, old_agent, new_agent: jax.lax.cond(
-                collided,
-                lambda: old_agent,
-                lambda: new_agent,
+        with jax.named_scope("join_grids"):
+            agent_grids = jax.vmap(get_agent_grid)(agent_ids, grids)
+            joined_grid = jnp.max(agent_grids, 0)  # join the grids
+
+        with jax.named_scope("correct_collisions"):
+            # Create a correction mask for possible collisions (see the docs of
+            # `get_correction_mask`)
+            correction_fn = jax.vmap(get_correction_mask, in_axes=(None, None, 0))
+            correction_masks, collided_agents = correction_fn(
+                state.grid, joined_grid, agent_ids
             )
-        )(collided_agents, state.agents, agents)
+            correction_mask = jnp.sum(correction_masks, 0)
+
+            # Correct state.agents
+            # Get the correct agents, either old agents (if collision) or new agents if no
+            # collision
+            agents = jax.vmap(
+                lambda collided, old_agent, new_agent: jax.lax.cond(
+                    collided,
+                    lambda: old_agent,
+                    lambda: new_agent,
+                )
+            )(collided_agents, state.agents, agents)
         # Create the new grid by fixing old one with correction mask and adding the obstacles
         return agents, joined_grid + correction_mask
 
@@ -273,9 +289,10 @@ class Connector(Environment[State]):
 
     def _obs_from_grid(self, grid: chex.Array) -> chex.Array:
         """Gets the observation vector for all agents."""
-        return jax.vmap(switch_perspective, (None, 0, None))(
+        grids = jax.vmap(switch_perspective, (None, 0, None))(
             grid, self._agent_ids, self.num_agents
         )
+        return grids.astype(jnp.uint8) if self.compact_observation else grids
 
     def _get_action_mask(self, agent: Agent, grid: chex.Array) -> chex.Array:
         """Gets an agent's action mask."""
@@ -344,13 +361,14 @@ class Connector(Environment[State]):
 
         Returns:
             Spec for the `Observation` whose fields are:
-            - grid: BoundedArray (int32) of shape (num_agents, grid_size, grid_size).
+            - grid: BoundedArray (int32, or uint8 if `compact_observation` is True) of shape
+                (num_agents, grid_size, grid_size).
             - action_mask: BoundedArray (bool) of shape (num_agents, 5).
             - step_count: BoundedArray (int32) of shape ().
         """
         grid = specs.BoundedArray(
             shape=(self.num_agents, self.grid_size, self.grid_size),
-            dtype=jnp.int32,
+            dtype=jnp.uint8 if self.compact_observation else jnp.int32,
             name="grid",
             minimum=0,
             maximum=self.num_agents * 3 + AGENT_INITIAL_VALUE,
@@ -295,3 +295,13 @@ def test_connector__get_extras(state: State, connector: Connector) -> None:
     no_op_action = jnp.full(connector.num_agents, 0, jnp.int32)
     _, timestep = connector.step(state, no_op_action)
     assert timestep.extras == extras
+
+
+def test_connector__compact_observation(key: chex.PRNGKey) -> None:
+    """Validates that the compact observation contains the same grids as uint8."""
+    connector = Connector(compact_observation=True)
+    state, timestep = connector.reset(key)
+    connector.observation_spec().validate(timestep.observation)
+    grid = timestep.observation.grid
+    assert grid.dtype == jnp.uint8
+    assert jnp.array_equal(grid, Connector()._obs_from_grid(state.grid))
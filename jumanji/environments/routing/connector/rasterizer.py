@@ -0,0 +1,62 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import chex
+import jax.numpy as jnp
+import matplotlib.cm
+import numpy as np
+
+from jumanji.environments.commons.rasterizer import (
+    NO_MARKER,
+    make_palette,
+    rasterize_grid,
+)
+from jumanji.environments.routing.connector.constants import (
+    EMPTY,
+    PATH,
+    POSITION,
+    TARGET,
+)
+from jumanji.environments.routing.connector.types import State
+
+
+def make_connector_palette(num_agents: int) -> np.ndarray:
+    """White and black, followed by the agents' colors and their paths' colors (25% opaque on
+    white), as in the matplotlib viewer.
+    """
+    colormap = matplotlib.cm.get_cmap("hsv", num_agents + 1)
+    colors = np.array([colormap(i)[:3] for i in np.arange(0, 1, 1 / num_agents)])
+    path_colors = 0.25 * colors + 0.75
+    return make_palette(["white", "black", *colors, *path_colors])
+
+
+def rasterize(state: State, cell_size: int = 8) -> chex.Array:
+    """Jittable rendering of a Connector state as a uint8 RGB frame of shape
+    (grid_size * cell_size, grid_size * cell_size, 3), use `jax.vmap` for a batch of states.
+    Positions fill their cell with the agent's color, paths with a lighter one, and targets are
+    drawn as squares of the agent's color.
+    """
+    num_agents = state.agents.id.shape[-1]
+    palette = make_connector_palette(num_agents)
+    agent_color = 2 + (state.grid - 1) // 3
+    cell_type = (state.grid - 1) % 3 + 1
+    cells = jnp.select(
+        [state.grid == EMPTY, cell_type == POSITION, cell_type == PATH],
+        [0, agent_color, agent_color + num_agents],
+        default=0,
+    )
+    markers = jnp.where(
+        (state.grid != EMPTY) & (cell_type == TARGET), agent_color, NO_MARKER
+    )
+    return rasterize_grid(cells, palette, cell_size, markers=markers, grid_color=1)
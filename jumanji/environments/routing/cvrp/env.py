@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Optional, Sequence, Tuple
+from typing import Dict, Optional, Sequence, Tuple
 
 import chex
 import jax
@@ -22,7 +22,13 @@ import matplotlib
 from jumanji import specs
 from jumanji.env import Environment
 from jumanji.environments.routing.cvrp.constants import DEPOT_IDX
-from jumanji.environments.routing.cvrp.reward import DenseReward, RewardFn
+from jumanji.environments.routing.cvrp.generator import Generator, RandomGenerator
+from jumanji.environments.routing.cvrp.reward import (
+    DenseReward,
+    RewardFn,
+    compute_distance_matrix,
+    distance_between_two_cities,
+)
 from jumanji.environments.routing.cvrp.types import Observation, State
 from jumanji.environments.routing.cvrp.viewer import CVRPViewer
 from jumanji.types import TimeStep, restart, termination, transition
@@ -79,6 +85,12 @@ class CVRP(Environment[State]):
             identifiers of the nodes that have been visited (set to DEPOT_IDX if not filled yet).
         - num_visits: int32
             number of actions that have been taken (i.e., unique visits).
+        - tour_length: jax array (float) of shape ()
+            length of the route travelled so far, including the way back to the depot once all
+            nodes have been visited. Both reward functions and the `tour_length` extras are
+            derived from it.
+        - distances: optional jax array (float) of shape (num_nodes + 1, num_nodes + 1)
+            pairwise distances between nodes, only set if `precompute_distances` is True.
 
     [1] Toth P., Vigo D. (2014). "Vehicle routing: problems, methods, and applications".
 
@@ -94,13 +106,17 @@ class CVRP(Environment[State]):
     ```
     """
 
+    static_observation_fields = ("coordinates", "demands")
+
     def __init__(
         self,
         num_nodes: int = 20,
         max_capacity: int = 30,
         max_demand: int = 10,
+        generator: Optional[Generator] = None,
         reward_fn: Optional[RewardFn] = None,
         viewer: Optional[Viewer[State]] = None,
+        precompute_distances: bool = False,
     ):
         """Instantiates a `CVRP` environment.
 
@@ -108,27 +124,34 @@ class CVRP(Environment[State]):
             num_nodes: number of city nodes in the environment. Defaults to 20.
             max_capacity: maximum capacity of the vehicle. Defaults to 30.
             max_demand: maximum demand of each node. Defaults to 10.
+            generator: `Generator` used to generate problem instances on reset. Implemented
+                options are [`RandomGenerator`, `InstanceBankGenerator`]. Defaults to
+                `RandomGenerator` built from `num_nodes`, `max_capacity` and `max_demand`, which
+                are ignored if a generator is given and read from the generator instead.
             reward_fn: `RewardFn` whose `__call__` method computes the reward of an environment
                 transition. The function must compute the reward based on the current state,
                 the chosen action, the next state and whether the action is valid.
                 Implemented options are [`DenseReward`, `SparseReward`]. Defaults to `DenseReward`.
             viewer: `Viewer` used for rendering. Defaults to `CVRPViewer` with "human" render mode.
+            precompute_distances: whether to compute the matrix of pairwise distances between
+                nodes at reset and store it in the state, so that the distances needed at each
+                step are lookups. It costs `(num_nodes + 1)**2` floats per state, hence it is only
+                worth it for small numbers of nodes. Defaults to False.
         """
 
-        if max_capacity < max_demand:
-            raise ValueError(
-                f"The demand associated with each node must be lower than the maximum capacity, "
-                f"hence the maximum capacity must be >= {max_demand}."
-            )
-        self.num_nodes = num_nodes
-        self.max_capacity = max_capacity
-        self.max_demand = max_demand
+        self.generator = generator or RandomGenerator(
+            num_nodes=num_nodes, max_capacity=max_capacity, max_demand=max_demand
+        )
+        self.num_nodes = self.generator.num_nodes
+        self.max_capacity = self.generator.max_capacity
+        self.max_demand = self.generator.max_demand
         self.reward_fn = reward_fn or DenseReward()
         self._viewer = viewer or CVRPViewer(
             name="CVRP",
             num_cities=self.num_nodes,
             render_mode="human",
         )
+        self.precompute_distances = precompute_distances
 
     def __repr__(self) -> str:
         return (
@@ -140,33 +163,20 @@ class CVRP(Environment[State]):
         """Resets the environment.
 
         Args:
-            key: used to randomly generate the coordinates.
+            key: used by the generator to randomly generate the coordinates and demands.
 
         Returns:
              state: `State` object corresponding to the new state of the environment.
              timestep: `TimeStep` object corresponding to the first timestep returned by the
                 environment.
         """
-        key, coordinates_key, demands_key = jax.random.split(key, 3)
-        coordinates = jax.random.uniform(
-            coordinates_key, (self.num_nodes + 1, 2), minval=0, maxval=1
-        )
-        demands = jax.random.randint(
-            demands_key, (self.num_nodes + 1,), minval=1, maxval=self.max_demand
+        state = self.generator(key)
+        if self.precompute_distances:
+            state.distances = compute_distance_matrix(state.coordinates)
+        timestep = restart(
+            observation=self._state_to_observation(state),
+            extras=self._compute_extras(state),
         )
-        demands = demands.at[DEPOT_IDX].set(0)
-        visited_mask = jnp.zeros(self.num_nodes + 1, dtype=bool).at[DEPOT_IDX].set(True)
-        state = State(
-            coordinates=coordinates,
-            demands=demands,
-            position=jnp.array(DEPOT_IDX, jnp.int32),
-            capacity=jnp.array(self.max_capacity, jnp.int32),
-            visited_mask=visited_mask,
-            trajectory=jnp.full(2 * self.num_nodes, DEPOT_IDX, jnp.int32),
-            num_total_visits=jnp.array(1, jnp.int32),
-            key=key,
-        )
-        timestep = restart(observation=self._state_to_observation(state))
         return state, timestep
 
     def step(
@@ -199,12 +209,22 @@ class CVRP(Environment[State]):
         # Terminate if all nodes have been visited or the action is invalid.
         is_done = next_state.visited_mask.all() | ~is_valid
 
+        extras = self._compute_extras(next_state)
         timestep = jax.lax.cond(
             is_done,
-            termination,
-            transition,
+            lambda reward, observation, extras: termination(
+                reward=reward,
+                observation=observation,
+                extras=extras,
+            ),
+            lambda reward, observation, extras: transition(
+                reward=reward,
+                observation=observation,
+                extras=extras,
+            ),
             reward,
             observation,
+            extras,
         )
         return next_state, timestep
 
@@ -340,17 +360,54 @@ class CVRP(Environment[State]):
         # Set depot to False (valid to visit) since it can be visited multiple times
         visited_mask = state.visited_mask.at[DEPOT_IDX].set(False)
 
+        visited_mask = visited_mask.at[action].set(True)
+
+        # The tour is closed by going back to the depot once all nodes are visited.
+        closing_length = jax.lax.select(
+            visited_mask.all(),
+            self._distance(state, action, DEPOT_IDX),
+            jnp.array(0, float),
+        )
+        tour_length = (
+            state.tour_length
+            + self._distance(state, state.position, action)
+            + closing_length
+        )
+
         return State(
             coordinates=state.coordinates,
             demands=state.demands,
             position=action,
             capacity=capacity,
-            visited_mask=visited_mask.at[action].set(True),
+            visited_mask=visited_mask,
             trajectory=state.trajectory.at[state.num_total_visits].set(action),
             num_total_visits=state.num_total_visits + 1,
+            tour_length=tour_length,
             key=state.key,
+            distances=state.distances,
+        )
+
+    def _distance(
+        self, state: State, node_one: chex.Numeric, node_two: chex.Numeric
+    ) -> chex.Numeric:
+        """Distance between two nodes, looked up if the distance matrix was precomputed."""
+        if state.distances is not None:
+            return state.distances[node_one, node_two]
+        return distance_between_two_cities(
+            state.coordinates[node_one], state.coordinates[node_two]
         )
 
+    def _compute_extras(self, state: State) -> Dict:
+        """Computes the metrics returned in the extras of a timestep.
+
+        Args:
+            state: `State` object containing the dynamics of the environment.
+
+        Returns:
+            dictionary with the length of the tour travelled so far.
+        """
+        return {"tour_length": state.tour_length}
+
     def _state_to_observation(self, state: State) -> Observation:
         """Converts a state into an observation.
 
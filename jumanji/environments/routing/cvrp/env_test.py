@@ -18,6 +18,7 @@ from jax import numpy as jnp
 
 from jumanji.environments.routing.cvrp.constants import DEPOT_IDX
 from jumanji.environments.routing.cvrp.env import CVRP
+from jumanji.environments.routing.cvrp.reward import compute_tour_length
 from jumanji.environments.routing.cvrp.types import State
 from jumanji.testing.env_not_smoke import check_env_does_not_smoke
 from jumanji.testing.pytrees import assert_is_jax_array_tree
@@ -388,3 +389,24 @@ def test_cvrp__equivalence_dense_sparse_reward(
     assert (
         return_sparse == return_dense > -2 * cvrp_dense_reward.num_nodes * jnp.sqrt(2)
     )
+
+
+def test_cvrp__tour_length() -> None:
+    """Validate that the incremental tour length matches the full tour length at the end of the
+    episode, with and without precomputed distances.
+    """
+    for precompute_distances in [False, True]:
+        env = CVRP(num_nodes=4, precompute_distances=precompute_distances)
+        state, timestep = jax.jit(env.reset)(jax.random.PRNGKey(0))
+        assert timestep.extras["tour_length"] == 0
+        step_fn = jax.jit(env.step)
+        while not timestep.last():
+            action = jnp.argmax(timestep.observation.action_mask[1:]) + 1
+            action = jax.lax.select(
+                timestep.observation.action_mask[action], action, DEPOT_IDX
+            )
+            state, timestep = step_fn(state, action)
+        assert state.visited_mask.all()
+        expected_tour_length = compute_tour_length(state.coordinates, state.trajectory)
+        assert jnp.isclose(state.tour_length, expected_tour_length)
+        assert jnp.isclose(timestep.extras["tour_length"], expected_tour_length)
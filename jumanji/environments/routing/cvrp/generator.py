@@ -0,0 +1,131 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import abc
+
+import chex
+import jax
+import jax.numpy as jnp
+
+from jumanji.environments.commons.instance_bank import (
+    IndexedGenerator,
+    InstanceBankSource,
+    load_instance_bank,
+    select_from_instance_bank,
+)
+from jumanji.environments.routing.cvrp.constants import DEPOT_IDX
+from jumanji.environments.routing.cvrp.types import State
+
+
+class Generator(abc.ABC):
+    """Defines the abstract `Generator` base class. A `Generator` is responsible
+    for generating an instance when the environment is reset.
+    """
+
+    def __init__(self, num_nodes: int, max_capacity: int, max_demand: int):
+        """Abstract class implementing the attributes `num_nodes`, `max_capacity` and `max_demand`.
+
+        Args:
+            num_nodes: number of city nodes in the problem instance, the depot excluded.
+            max_capacity: maximum capacity of the vehicle.
+            max_demand: maximum demand of each node.
+        """
+        if max_capacity < max_demand:
+            raise ValueError(
+                f"The demand associated with each node must be lower than the maximum capacity, "
+                f"hence the maximum capacity must be >= {max_demand}."
+            )
+        self.num_nodes = num_nodes
+        self.max_capacity = max_capacity
+        self.max_demand = max_demand
+
+    @abc.abstractmethod
+    def __call__(self, key: chex.PRNGKey) -> State:
+        """Generate a new instance.
+
+        Args:
+            key: random key used for any stochasticity in the instance generation process.
+
+        Returns:
+            A `CVRP` state.
+        """
+
+    def _make_state(
+        self, coordinates: chex.Array, demands: chex.Array, key: chex.PRNGKey
+    ) -> State:
+        """Return the initial state of an episode on the given nodes, the vehicle being at the
+        depot with full capacity.
+        """
+        visited_mask = jnp.zeros(self.num_nodes + 1, dtype=bool).at[DEPOT_IDX].set(True)
+        return State(
+            coordinates=coordinates,
+            demands=demands,
+            position=jnp.array(DEPOT_IDX, jnp.int32),
+            capacity=jnp.array(self.max_capacity, jnp.int32),
+            visited_mask=visited_mask,
+            trajectory=jnp.full(2 * self.num_nodes, DEPOT_IDX, jnp.int32),
+            num_total_visits=jnp.array(1, jnp.int32),
+            tour_length=jnp.array(0, float),
+            key=key,
+        )
+
+
+class RandomGenerator(Generator):
+    """Instance generator that samples the coordinates of the nodes uniformly at random in the unit
+    square and their demands uniformly in [1, max_demand). The depot has no demand.
+    """
+
+    def __call__(self, key: chex.PRNGKey) -> State:
+        key, coordinates_key, demands_key = jax.random.split(key, 3)
+        coordinates = jax.random.uniform(
+            coordinates_key, (self.num_nodes + 1, 2), minval=0, maxval=1
+        )
+        demands = jax.random.randint(
+            demands_key, (self.num_nodes + 1,), minval=1, maxval=self.max_demand
+        )
+        demands = demands.at[DEPOT_IDX].set(0)
+        return self._make_state(coordinates, demands, key)
+
+
+class InstanceBankGenerator(IndexedGenerator[State], Generator):
+    """Instance generator that samples instances from a fixed bank (e.g. a benchmark set). The bank
+    is transferred to the device once at construction, so that resetting the environment is a
+    single gather rather than a host-to-device copy.
+    """
+
+    def __init__(self, source: InstanceBankSource, max_capacity: int):
+        """Instantiates an `InstanceBankGenerator`.
+
+        Args:
+            source: mapping or path to a `.npz` archive with a "coordinates" array of shape
+                (num_instances, num_nodes + 1, 2) and an integer "demands" array of shape
+                (num_instances, num_nodes + 1). The depot is the node at index `DEPOT_IDX` and its
+                demand must be 0.
+            max_capacity: capacity of the vehicle, must be at least the largest demand in the
+                bank.
+        """
+        self.bank = load_instance_bank(source, fields=["coordinates", "demands"])
+        self.bank["demands"] = self.bank["demands"].astype(jnp.int32)
+        self.num_instances, num_nodes_with_depot, _ = self.bank["coordinates"].shape
+        super().__init__(
+            num_nodes=num_nodes_with_depot - 1,
+            max_capacity=max_capacity,
+            max_demand=int(self.bank["demands"].max()),
+        )
+
+    def generate_instance(self, index: chex.Numeric, key: chex.PRNGKey) -> State:
+        """See `IndexedGenerator.generate_instance`."""
+        instance = select_from_instance_bank(index, self.bank)
+        return self._make_state(instance["coordinates"], instance["demands"], key)
@@ -0,0 +1,95 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import chex
+import jax
+import jax.numpy as jnp
+import numpy as np
+import pytest
+
+from jumanji.environments.routing.cvrp.constants import DEPOT_IDX
+from jumanji.environments.routing.cvrp.env import CVRP
+from jumanji.environments.routing.cvrp.generator import (
+    InstanceBankGenerator,
+    RandomGenerator,
+)
+from jumanji.testing.env_not_smoke import check_env_does_not_smoke
+from jumanji.testing.pytrees import assert_trees_are_different
+
+
+@pytest.fixture
+def instance_bank() -> dict:
+    random_state = np.random.RandomState(0)
+    demands = random_state.randint(1, 5, size=(3, 6))
+    demands[:, DEPOT_IDX] = 0
+    return {
+        "coordinates": random_state.uniform(size=(3, 6, 2)).astype(np.float32),
+        "demands": demands,
+    }
+
+
+def test_random_generator__call() -> None:
+    """Validate that the random generator creates different instances for different keys and
+    that the depot has no demand.
+    """
+    generator = RandomGenerator(num_nodes=5, max_capacity=10, max_demand=5)
+    chex.clear_trace_counter()
+    call_fn = jax.jit(chex.assert_max_traces(generator.__call__, n=1))
+    state1 = call_fn(jax.random.PRNGKey(1))
+    state2 = call_fn(jax.random.PRNGKey(2))
+    assert state1.coordinates.shape == (6, 2)
+    assert state1.demands[DEPOT_IDX] == 0
+    assert_trees_are_different(state1, state2)
+
+
+def test_random_generator__invalid_capacity() -> None:
+    with pytest.raises(ValueError):
+        RandomGenerator(num_nodes=5, max_capacity=3, max_demand=5)
+
+
+def test_instance_bank_generator__call(instance_bank: dict) -> None:
+    """Validate that the instance bank generator only samples instances from the bank."""
+    generator = InstanceBankGenerator(instance_bank, max_capacity=10)
+    assert generator.num_nodes == 5
+    assert generator.max_demand == instance_bank["demands"].max()
+    call_fn = jax.jit(generator.__call__)
+    for key in jax.random.split(jax.random.PRNGKey(0), 10):
+        state = call_fn(key)
+        index = jnp.argmax(
+            jnp.all(state.coordinates == instance_bank["coordinates"], axis=(1, 2))
+        )
+        assert jnp.array_equal(state.coordinates, instance_bank["coordinates"][index])
+        assert jnp.array_equal(state.demands, instance_bank["demands"][index])
+        assert state.capacity == 10
+
+
+def test_instance_bank_generator__generate_instance(instance_bank: dict) -> None:
+    """Validate that every instance of the bank can be selected by its index with a single
+    compiled program.
+    """
+    generator = InstanceBankGenerator(instance_bank, max_capacity=10)
+    chex.clear_trace_counter()
+    generate_fn = jax.jit(chex.assert_max_traces(generator.generate_instance, n=1))
+    for index in range(generator.num_instances):
+        state = generate_fn(index, jax.random.PRNGKey(index))
+        assert jnp.array_equal(state.coordinates, instance_bank["coordinates"][index])
+        assert jnp.array_equal(state.demands, instance_bank["demands"][index])
+
+
+def test_cvrp__instance_bank_generator(instance_bank: dict) -> None:
+    """Validate that the environment takes its size from the generator."""
+    env = CVRP(generator=InstanceBankGenerator(instance_bank, max_capacity=10))
+    assert env.num_nodes == 5 and env.max_capacity == 10
+    check_env_does_not_smoke(env)
@@ -18,7 +18,6 @@ import chex
 import jax
 import jax.numpy as jnp
 
-from jumanji.environments.routing.cvrp.constants import DEPOT_IDX
 from jumanji.environments.routing.cvrp.types import State
 
 
@@ -51,17 +50,14 @@ class SparseReward(RewardFn):
         next_state: State,
         is_valid: bool,
     ) -> chex.Numeric:
-        compute_sparse_reward = lambda: jax.lax.select(
+        # The tour length is tracked incrementally in the state, hence reading it is free.
+        sparse_reward = jax.lax.select(
             is_valid,
-            -compute_tour_length(next_state.coordinates, next_state.trajectory),
+            -next_state.tour_length,
             jnp.array(-len(state.trajectory) * jnp.sqrt(2), float),
         )
         is_done = next_state.visited_mask.all() | ~is_valid
-        reward = jax.lax.cond(
-            is_done,
-            compute_sparse_reward,
-            lambda: jnp.array(0, float),
-        )
+        reward = jax.lax.select(is_done, sparse_reward, jnp.array(0, float))
         return reward
 
 
@@ -78,21 +74,13 @@ class DenseReward(RewardFn):
         next_state: State,
         is_valid: bool,
     ) -> chex.Numeric:
-        previous_city = state.coordinates[state.position]
-        next_city = state.coordinates[next_state.position]
-        # By default, returns the negative distance between the previous and new node.
+        # The increase of the tour length is the distance between the previous and new node, plus
+        # the distance back to the depot once the tour is finished.
         reward = jax.lax.select(
             is_valid,
-            -distance_between_two_cities(previous_city, next_city),
+            state.tour_length - next_state.tour_length,
             jnp.array(-len(state.trajectory) * jnp.sqrt(2), float),
         )
-        # Adds the distance between the last node and the depot if the tour is finished.
-        depot = state.coordinates[DEPOT_IDX]
-        reward = jax.lax.select(
-            jnp.all(next_state.visited_mask),
-            reward - distance_between_two_cities(next_city, depot),
-            reward,
-        )
         return reward
 
 
@@ -111,3 +99,8 @@ def distance_between_two_cities(
 ) -> chex.Numeric:
     """Calculate the distance between two neighboring cities."""
     return jnp.linalg.norm(city_one_coordinates - city_two_coordinates)
+
+
+def compute_distance_matrix(coordinates: chex.Array) -> chex.Array:
+    """Calculate the distances between all pairs of nodes."""
+    return jnp.linalg.norm(coordinates[:, None] - coordinates[None, :], axis=-1)
@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import TYPE_CHECKING, NamedTuple
+from typing import TYPE_CHECKING, NamedTuple, Optional
 
 import chex
 
@@ -32,7 +32,10 @@ class State:
     visited_mask: binary mask (False/True <--> unvisited/visited).
     trajectory: array of node indices denoting route (set to DEPOT_IDX if not filled yet).
     num_total_visits: number of performed visits (it can count depot multiple times).
+    tour_length: length of the route travelled so far, including the way back to the depot once
+        all nodes have been visited.
     key: random key used for auto-reset.
+    distances: optional matrix of the pairwise distances between nodes, precomputed at reset.
     """
 
     coordinates: chex.Array  # (num_nodes + 1, 2)
@@ -42,7 +45,9 @@ class State:
     visited_mask: chex.Array  # (num_nodes + 1,)
     trajectory: chex.Array  # (2 * num_nodes,)
     num_total_visits: chex.Numeric  # ()
+    tour_length: chex.Numeric  # ()
     key: chex.PRNGKey  # (2,)
+    distances: Optional[chex.Array] = None  # (num_nodes + 1, num_nodes + 1)
 
 
 class Observation(NamedTuple):
@@ -43,6 +43,8 @@ class Maze(Environment[State]):
             defining the available actions in the current position.
         - step_count: jax array (int32) of shape ()
             step number of the episode.
+        If `compact_observation` is True, walls is instead a jax array (uint8) of shape
+        (ceil(num_rows * num_cols / 8),) containing the flattened walls packed into bits.
 
     - action: jax array (int32) of shape () specifying which action to take: [0,1,2,3] correspond to
         [Up, Right, Down, Left]. If an invalid action is taken, i.e. there is a wall blocking the
@@ -85,6 +87,7 @@ class Maze(Environment[State]):
         generator: Optional[Generator] = None,
         time_limit: Optional[int] = None,
         viewer: Optional[Viewer[State]] = None,
+        compact_observation: bool = False,
     ) -> None:
         """Instantiates a `Maze` environment.
 
@@ -96,12 +99,15 @@ class Maze(Environment[State]):
                 before the episode terminates. By default, `time_limit = num_rows * num_cols`.
             viewer: `Viewer` used for rendering. Defaults to `MazeEnvViewer` with "human" render
                 mode.
+            compact_observation: whether to pack the walls of the observation into bits, which
+                makes them 8 times smaller. Defaults to False.
         """
         self.generator = generator or RandomGenerator(num_rows=10, num_cols=10)
         self.num_rows = self.generator.num_rows
         self.num_cols = self.generator.num_cols
         self.shape = (self.num_rows, self.num_cols)
         self.time_limit = time_limit or self.num_rows * self.num_cols
+        self.compact_observation = compact_observation
 
         # Create viewer used for rendering
         self._viewer = viewer or MazeEnvViewer("Maze", render_mode="human")
@@ -124,7 +130,8 @@ class Maze(Environment[State]):
             Spec for the `Observation` whose fields are:
             - agent_position: tree of BoundedArray (int32) of shape ().
             - target_position: tree of BoundedArray (int32) of shape ().
-            - walls: BoundedArray (bool) of shape (num_rows, num_cols).
+            - walls: BoundedArray (bool) of shape (num_rows, num_cols), or BoundedArray (uint8)
+                of shape (ceil(num_rows * num_cols / 8),) if `compact_observation` is True.
             - step_count: Array (int32) of shape ().
             - action_mask: BoundedArray (bool) of shape (4,).
         """
@@ -138,13 +145,22 @@ class Maze(Environment[State]):
                 (), jnp.int32, 0, self.num_cols - 1, "col_coordinate"
             ),
         )
-        walls = specs.BoundedArray(
-            shape=(self.num_rows, self.num_cols),
-            dtype=bool,
-            minimum=False,
-            maximum=True,
-            name="walls",
-        )
+        if self.compact_observation:
+            walls = specs.BoundedArray(
+                shape=(-(-self.num_rows * self.num_cols // 8),),
+                dtype=jnp.uint8,
+                minimum=0,
+                maximum=255,
+                name="walls",
+            )
+        else:
+            walls = specs.BoundedArray(
+                shape=(self.num_rows, self.num_cols),
+                dtype=bool,
+                minimum=False,
+                maximum=True,
+                name="walls",
+            )
         step_count = specs.Array((), jnp.int32, "step_count")
         action_mask = specs.BoundedArray(
             shape=(4,), dtype=bool, minimum=False, maximum=True, name="action_mask"
@@ -312,10 +328,14 @@ class Maze(Environment[State]):
 
     def _observation_from_state(self, state: State) -> Observation:
         """Create an observation from the state of the environment."""
+        if self.compact_observation:
+            walls = jnp.packbits(state.walls.flatten())
+        else:
+            walls = state.walls
         return Observation(
             agent_position=state.agent_position,
             target_position=state.target_position,
-            walls=state.walls,
+            walls=walls,
             step_count=state.step_count,
             action_mask=state.action_mask,
         )
@@ -227,3 +227,15 @@ class TestMazeEnvironment:
 
     def test_maze__does_not_smoke(self, maze: Maze) -> None:
         check_env_does_not_smoke(maze)
+
+    def test_maze__compact_observation(self) -> None:
+        """Validates that the compact observation packs the walls into bits."""
+        generator = RandomGenerator(num_rows=5, num_cols=5)
+        maze = Maze(generator=generator, compact_observation=True)
+        state, timestep = maze.reset(jax.random.PRNGKey(0))
+        walls = timestep.observation.walls
+        maze.observation_spec().validate(timestep.observation)
+        assert walls.dtype == jnp.uint8 and walls.shape == (4,)
+        unpacked_walls = jnp.unpackbits(walls, count=25).reshape(5, 5)
+        assert jnp.array_equal(unpacked_walls, state.walls)
+        check_env_does_not_smoke(maze)
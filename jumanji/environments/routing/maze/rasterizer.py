@@ -0,0 +1,37 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import chex
+import jax.numpy as jnp
+
+from jumanji.environments.commons.rasterizer import make_palette, rasterize_grid
+from jumanji.environments.routing.maze.types import State
+
+# Same colors as the matplotlib viewer.
+EMPTY, WALL, AGENT, TARGET = 0, 1, 2, 3
+PALETTE = make_palette(["white", "black", "lime", "red"])
+
+
+def rasterize(state: State, cell_size: int = 8) -> chex.Array:
+    """Jittable rendering of a Maze state as a uint8 RGB frame of shape
+    (num_rows * cell_size, num_cols * cell_size, 3), use `jax.vmap` for a batch of states.
+    """
+    cells = (
+        jnp.where(state.walls, WALL, EMPTY)
+        .at[tuple(state.target_position)]
+        .set(TARGET)
+        .at[tuple(state.agent_position)]
+        .set(AGENT)
+    )
+    return rasterize_grid(cells, PALETTE, cell_size)
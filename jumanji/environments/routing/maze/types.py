@@ -57,13 +57,14 @@ class Observation(NamedTuple):
 
     agent_position: current 2D Position of agent.
     target_position: 2D Position of target cell.
-    walls: array (bool) whose values are `True` where walls are and `False` for empty cells.
+    walls: array (bool) whose values are `True` where walls are and `False` for empty cells, or
+        the flattened walls packed into bits (uint8) if the observation is compact.
     action_mask: array specifying which directions the agent can move in from its current position.
     step_count: (int32) step number of the episode.
     """
 
     agent_position: Position  # Position(row, col) each of shape ()
     target_position: Position  # Position(row, col) each of shape ()
-    walls: chex.Array  # (num_rows, num_cols)
+    walls: chex.Array  # (num_rows, num_cols) or (ceil(num_rows * num_cols / 8),) if compact
     action_mask: chex.Array  # (4,)
     step_count: jnp.int32  # ()
@@ -48,6 +48,10 @@ class Snake(Environment[State]):
             current number of steps in the episode.
         - action_mask: jax array (bool) of shape (4,)
             array specifying which directions the snake can move in from its current position.
+        If `compact_observation` is True, the grid is instead a jax array (uint8) of shape
+        (num_rows, num_cols, 2):
+            - flags: bit-packed body, head, tail and fruit maps (bits 0 to 3 respectively).
+            - norm_body_state: norm_body_state quantized to integers between 0 and 255.
 
     - action: jax array (int32) of shape()
         [0,1,2,3] -> [Up, Right, Down, Left].
@@ -96,7 +100,13 @@ class Snake(Environment[State]):
     FIGURE_SIZE = (6.0, 6.0)
     MOVES = jnp.array([[-1, 0], [0, 1], [1, 0], [0, -1]], jnp.int32)
 
-    def __init__(self, num_rows: int = 12, num_cols: int = 12, time_limit: int = 4000):
+    def __init__(
+        self,
+        num_rows: int = 12,
+        num_cols: int = 12,
+        time_limit: int = 4000,
+        compact_observation: bool = False,
+    ):
         """Instantiates a `Snake` environment.
 
         Args:
@@ -104,12 +114,16 @@ class Snake(Environment[State]):
             num_cols: number of columns of the 2D grid. Defaults to 12.
             time_limit: time_limit of an episode, i.e. number of environment steps before
                 the episode ends. Defaults to 4000.
+            compact_observation: whether to encode the observation grid as 2 uint8 planes
+                instead of 5 float planes, which makes the observation 10 times smaller.
+                Defaults to False.
         """
         super().__init__()
         self.num_rows = num_rows
         self.num_cols = num_cols
         self.board_shape = (num_rows, num_cols)
         self.time_limit = time_limit
+        self.compact_observation = compact_observation
 
         # You must store the created Animation in a variable that lives as long as the animation
         # should run. Otherwise, the animation will get garbage-collected.
@@ -122,6 +136,7 @@ class Snake(Environment[State]):
                 f" - num_rows: {self.num_rows}",
                 f" - num_cols: {self.num_cols}",
                 f" - time_limit: {self.time_limit}",
+                f" - compact_observation: {self.compact_observation}",
             ]
         )
 
@@ -240,17 +255,27 @@ class Snake(Environment[State]):
 
         Returns:
             Spec for the `Observation` whose fields are:
-            - grid: BoundedArray (float) of shape (num_rows, num_cols, 5).
+            - grid: BoundedArray (float) of shape (num_rows, num_cols, 5), or BoundedArray
+                (uint8) of shape (num_rows, num_cols, 2) if `compact_observation` is True.
             - step_count: DiscreteArray (num_values = time_limit) of shape ().
             - action_mask: BoundedArray (bool) of shape (4,).
         """
-        grid = specs.BoundedArray(
-            shape=(self.num_rows, self.num_cols, 5),
-            minimum=0.0,
-            maximum=1.0,
-            dtype=float,
-            name="grid",
-        )
+        if self.compact_observation:
+            grid = specs.BoundedArray(
+                shape=(self.num_rows, self.num_cols, 2),
+                minimum=0,
+                maximum=255,
+                dtype=jnp.uint8,
+                name="grid",
+            )
+        else:
+            grid = specs.BoundedArray(
+                shape=(self.num_rows, self.num_cols, 5),
+                minimum=0.0,
+                maximum=1.0,
+                dtype=float,
+                name="grid",
+            )
         step_count = specs.DiscreteArray(
             self.time_limit, dtype=jnp.int32, name="step_count"
         )
@@ -291,13 +316,19 @@ class Snake(Environment[State]):
         tail = state.tail
         fruit = jnp.zeros_like(body).at[tuple(state.fruit_position)].set(True)
         norm_body_state = state.body_state / jnp.maximum(1, state.body_state.max())
-        grid = jnp.concatenate(
-            jax.tree_util.tree_map(
-                lambda x: x[..., None], [body, head, tail, fruit, norm_body_state]
-            ),
-            axis=-1,
-            dtype=float,
-        )
+        if self.compact_observation:
+            planes = jnp.stack([body, head, tail, fruit], axis=-1).astype(jnp.uint8)
+            flags = jnp.sum(planes << jnp.arange(4, dtype=jnp.uint8), axis=-1)
+            quantized_body_state = jnp.round(255 * norm_body_state)
+            grid = jnp.stack([flags, quantized_body_state], axis=-1).astype(jnp.uint8)
+        else:
+            grid = jnp.concatenate(
+                jax.tree_util.tree_map(
+                    lambda x: x[..., None], [body, head, tail, fruit, norm_body_state]
+                ),
+                axis=-1,
+                dtype=float,
+            )
 
         return Observation(
             grid=grid,
@@ -159,3 +159,24 @@ def test_snake__animation(snake: Snake, tmpdir: py.path.local) -> None:
 
     path = str(tmpdir.join("/anim.gif"))
     animation.save(path, writer=matplotlib.animation.PillowWriter(fps=10), dpi=60)
+
+
+def test_snake__compact_observation() -> None:
+    """Validates that the compact observation encodes the same information as the default one
+    and conforms to its spec.
+    """
+    snake = Snake(6, 6)
+    compact_snake = Snake(6, 6, compact_observation=True)
+    state, timestep = snake.reset(jax.random.PRNGKey(0))
+    for action in [0, 1, 2]:
+        state, timestep = snake.step(state, action)
+        grid = timestep.observation.grid
+        compact_observation = compact_snake._state_to_observation(state)
+        compact_snake.observation_spec().validate(compact_observation)
+        compact_grid = compact_observation.grid
+        assert compact_grid.dtype == jnp.uint8
+        assert compact_grid.nbytes * 10 == grid.nbytes
+        planes = (compact_grid[..., :1] >> jnp.arange(4, dtype=jnp.uint8)) & 1
+        assert jnp.array_equal(planes, grid[..., :4])
+        assert jnp.allclose(compact_grid[..., 1] / 255, grid[..., 4], atol=1 / 255)
+    check_env_does_not_smoke(compact_snake)
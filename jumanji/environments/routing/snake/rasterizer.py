@@ -0,0 +1,54 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import chex
+import jax.numpy as jnp
+import matplotlib.colors
+import numpy as np
+
+from jumanji.environments.commons.rasterizer import (
+    NO_MARKER,
+    make_palette,
+    rasterize_grid,
+)
+from jumanji.environments.routing.snake.types import State
+
+# The body is colored from its head to its tail with the gradient of the matplotlib viewer.
+NUM_BODY_SHADES = 8
+_BODY_CMAP = matplotlib.colors.LinearSegmentedColormap.from_list(
+    "", ["yellowgreen", "forestgreen"]
+)
+EMPTY, HEAD, FRUIT, BODY = 0, 1, 2, 3
+PALETTE = make_palette(
+    ["white", _BODY_CMAP(0.0), "lightcoral"]
+    + [_BODY_CMAP(x) for x in np.linspace(0, 1, NUM_BODY_SHADES)]
+)
+
+
+def rasterize(state: State, cell_size: int = 8) -> chex.Array:
+    """Jittable rendering of a Snake state as a uint8 RGB frame of shape
+    (num_rows * cell_size, num_cols * cell_size, 3), use `jax.vmap` for a batch of states.
+    """
+    shade = jnp.round(
+        (NUM_BODY_SHADES - 1) * state.body_state / jnp.maximum(state.length, 1)
+    ).astype(int)
+    cells = jnp.where(state.body_state > 0, BODY + shade, EMPTY)
+    markers = (
+        jnp.full_like(cells, NO_MARKER)
+        .at[tuple(state.fruit_position)]
+        .set(FRUIT)
+        .at[tuple(state.head_position)]
+        .set(HEAD)
+    )
+    return rasterize_grid(cells, PALETTE, cell_size, markers=markers)
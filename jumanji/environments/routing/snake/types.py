@@ -77,6 +77,6 @@ class Observation(NamedTuple):
     action_mask: array specifying which directions the snake can move in from its current position.
     """
 
-    grid: chex.Array  # (num_rows, num_cols, 5)
+    grid: chex.Array  # (num_rows, num_cols, 5) or (num_rows, num_cols, 2) if compact
     step_count: chex.Numeric  # Shape ()
     action_mask: chex.Array  # (4,)
@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Optional, Sequence, Tuple
+from typing import Dict, Optional, Sequence, Tuple
 
 import chex
 import jax
@@ -23,7 +23,13 @@ from numpy.typing import NDArray
 
 from jumanji import specs
 from jumanji.env import Environment
-from jumanji.environments.routing.tsp.reward import DenseReward, RewardFn
+from jumanji.environments.routing.tsp.generator import Generator, RandomGenerator
+from jumanji.environments.routing.tsp.reward import (
+    DenseReward,
+    RewardFn,
+    compute_distance_matrix,
+    distance_between_two_cities,
+)
 from jumanji.environments.routing.tsp.types import Observation, State
 from jumanji.environments.routing.tsp.viewer import TSPViewer
 from jumanji.types import TimeStep, restart, termination, transition
@@ -72,6 +78,16 @@ class TSP(Environment[State]):
             visited yet at that time in the sequence).
         - num_visited: int32
             number of cities that have been visited.
+        - num_cities: int32
+            number of cities of the instance. Instances smaller than the environment are padded
+            with cities that are marked as visited from the start, hence excluded by the
+            action mask, and that are zeroed in the coordinates.
+        - tour_length: jax array (float) of shape ()
+            length of the route travelled so far, including the way back to the first city once
+            all cities have been visited. Both reward functions and the `tour_length` extras are
+            derived from it.
+        - distances: optional jax array (float) of shape (num_cities, num_cities)
+            pairwise distances between cities, only set if `precompute_distances` is True.
 
     [1] Kwon Y., Choo J., Kim B., Yoon I., Min S., Gwon Y. (2020). "POMO: Policy Optimization
         with Multiple Optima for Reinforcement Learning".
@@ -88,26 +104,51 @@ class TSP(Environment[State]):
     ```
     """
 
+    static_observation_fields = ("coordinates",)
+
     def __init__(
         self,
         num_cities: int = 20,
+        generator: Optional[Generator] = None,
         reward_fn: Optional[RewardFn] = None,
         viewer: Optional[Viewer[State]] = None,
+        precompute_distances: bool = False,
+        min_num_cities: Optional[int] = None,
+        max_num_cities: Optional[int] = None,
     ):
         """Instantiates a `TSP` environment.
 
         Args:
-            num_cities: number of cities to visit. Defaults to 20.
+            num_cities: number of cities to visit. Defaults to 20. Ignored if a `generator` is
+                given, in which case the number of cities is read from the generator.
+            generator: `Generator` used to generate problem instances on reset. Implemented
+                options are [`RandomGenerator`, `InstanceBankGenerator`]. Defaults to
+                `RandomGenerator` with `num_cities` cities.
             reward_fn: RewardFn whose `__call__` method computes the reward of an environment
                 transition. The function must compute the reward based on the current state,
                 the chosen action and the next state.
                 Implemented options are [`DenseReward`, `SparseReward`]. Defaults to `DenseReward`.
             viewer: `Viewer` used for rendering. Defaults to `TSPViewer` with "human" render mode.
+            precompute_distances: whether to compute the matrix of pairwise distances between
+                cities at reset and store it in the state, so that the distances needed at each
+                step are lookups. It costs `num_cities**2` floats per state, hence it is only
+                worth it for small numbers of cities. Defaults to False.
+            min_num_cities: minimum number of cities of the instances generated by the default
+                `RandomGenerator`, which are padded to `num_cities` cities so that instances of
+                different sizes share the same compiled programs. Defaults to `max_num_cities`.
+            max_num_cities: maximum number of cities of the instances generated by the default
+                `RandomGenerator`. Defaults to `num_cities`.
         """
 
-        self.num_cities = num_cities
+        self.generator = generator or RandomGenerator(
+            num_cities=num_cities,
+            min_num_cities=min_num_cities,
+            max_num_cities=max_num_cities,
+        )
+        self.num_cities = self.generator.num_cities
         self.reward_fn = reward_fn or DenseReward()
         self._viewer = viewer or TSPViewer(name="TSP", render_mode="human")
+        self.precompute_distances = precompute_distances
 
     def __repr__(self) -> str:
         return f"TSP environment with {self.num_cities} cities."
@@ -116,26 +157,20 @@ class TSP(Environment[State]):
         """Resets the environment.
 
         Args:
-            key: used to randomly generate the coordinates.
+            key: used by the generator to randomly generate the coordinates.
 
         Returns:
             state: State object corresponding to the new state of the environment.
             timestep: TimeStep object corresponding to the first timestep returned
                 by the environment.
         """
-        key, sample_key = jax.random.split(key)
-        coordinates = jax.random.uniform(
-            sample_key, (self.num_cities, 2), minval=0, maxval=1
-        )
-        state = State(
-            coordinates=coordinates,
-            position=jnp.array(-1, jnp.int32),
-            visited_mask=jnp.zeros(self.num_cities, dtype=bool),
-            trajectory=jnp.full(self.num_cities, -1, jnp.int32),
-            num_visited=jnp.array(0, jnp.int32),
-            key=key,
+        state = self.generator(key)
+        if self.precompute_distances:
+            state.distances = compute_distance_matrix(state.coordinates)
+        timestep = restart(
+            observation=self._state_to_observation(state),
+            extras=self._compute_extras(state),
         )
-        timestep = restart(observation=self._state_to_observation(state))
         return state, timestep
 
     def step(
@@ -164,13 +199,23 @@ class TSP(Environment[State]):
         observation = self._state_to_observation(next_state)
 
         # Terminate if all cities have been visited or the action is invalid
-        is_done = (next_state.num_visited == self.num_cities) | ~is_valid
+        is_done = (next_state.num_visited == next_state.num_cities) | ~is_valid
+        extras = self._compute_extras(next_state)
         timestep = jax.lax.cond(
             is_done,
-            termination,
-            transition,
+            lambda reward, observation, extras: termination(
+                reward=reward,
+                observation=observation,
+                extras=extras,
+            ),
+            lambda reward, observation, extras: transition(
+                reward=reward,
+                observation=observation,
+                extras=extras,
+            ),
             reward,
             observation,
+            extras,
         )
         return next_state, timestep
 
@@ -275,15 +320,51 @@ class TSP(Environment[State]):
         Returns:
             state: State object corresponding to the new state of the environment.
         """
+        # The first city has no predecessor, and the tour is closed once all cities are visited.
+        first_city = jax.lax.select(state.num_visited == 0, action, state.trajectory[0])
+        step_length = jax.lax.select(
+            state.num_visited == 0,
+            jnp.array(0, float),
+            self._distance(state, state.position, action),
+        )
+        closing_length = jax.lax.select(
+            state.num_visited + 1 == state.num_cities,
+            self._distance(state, action, first_city),
+            jnp.array(0, float),
+        )
         return State(
             coordinates=state.coordinates,
             position=action,
             visited_mask=state.visited_mask.at[action].set(True),
             trajectory=state.trajectory.at[state.num_visited].set(action),
             num_visited=state.num_visited + 1,
+            num_cities=state.num_cities,
+            tour_length=state.tour_length + step_length + closing_length,
             key=state.key,
+            distances=state.distances,
+        )
+
+    def _distance(
+        self, state: State, city_one: chex.Numeric, city_two: chex.Numeric
+    ) -> chex.Numeric:
+        """Distance between two cities, looked up if the distance matrix was precomputed."""
+        if state.distances is not None:
+            return state.distances[city_one, city_two]
+        return distance_between_two_cities(
+            state.coordinates[city_one], state.coordinates[city_two]
         )
 
+    def _compute_extras(self, state: State) -> Dict:
+        """Computes the metrics returned in the extras of a timestep.
+
+        Args:
+            state: `State` object containing the dynamics of the environment.
+
+        Returns:
+            dictionary with the length of the tour travelled so far.
+        """
+        return {"tour_length": state.tour_length}
+
     def _state_to_observation(self, state: State) -> Observation:
         """Converts a state into an observation.
 
@@ -18,6 +18,7 @@ import jax.numpy as jnp
 import pytest
 
 from jumanji.environments.routing.tsp.env import TSP
+from jumanji.environments.routing.tsp.reward import compute_tour_length
 from jumanji.environments.routing.tsp.types import State
 from jumanji.testing.env_not_smoke import check_env_does_not_smoke
 from jumanji.testing.pytrees import assert_is_jax_array_tree
@@ -272,3 +273,21 @@ def test_tsp__equivalence_dense_sparse_reward(
 
     # Check that both returns are the same and not the invalid action penalty
     assert return_sparse == return_dense > -tsp_dense_reward.num_cities * jnp.sqrt(2)
+
+
+def test_tsp__tour_length(tsp_sparse_reward: TSP) -> None:
+    """Validate that the incremental tour length matches the full tour length at the end of the
+    episode, with and without precomputed distances.
+    """
+    env_with_distances = TSP(num_cities=5, precompute_distances=True)
+    for env in [tsp_sparse_reward, env_with_distances]:
+        state, timestep = jax.jit(env.reset)(jax.random.PRNGKey(0))
+        assert timestep.extras["tour_length"] == 0
+        step_fn = jax.jit(env.step)
+        for action in [3, 1, 4, 0, 2]:
+            state, timestep = step_fn(state, action)
+        assert timestep.last()
+        expected_tour_length = compute_tour_length(state.coordinates, state.trajectory)
+        assert jnp.isclose(state.tour_length, expected_tour_length)
+        assert jnp.isclose(timestep.extras["tour_length"], expected_tour_length)
+    assert env_with_distances.reset(jax.random.PRNGKey(0))[0].distances.shape == (5, 5)
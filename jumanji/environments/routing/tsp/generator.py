@@ -0,0 +1,156 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import abc
+from typing import Mapping, Optional, Union
+
+import chex
+import jax
+import jax.numpy as jnp
+
+from jumanji.environments.commons.instance_bank import (
+    IndexedGenerator,
+    InstanceBankSource,
+    load_instance_bank,
+    select_from_instance_bank,
+)
+from jumanji.environments.routing.tsp.types import State
+
+
+class Generator(abc.ABC):
+    """Defines the abstract `Generator` base class. A `Generator` is responsible
+    for generating an instance when the environment is reset.
+    """
+
+    def __init__(self, num_cities: int):
+        """Abstract class implementing the attribute `num_cities`.
+
+        Args:
+            num_cities: the number of cities in the problem instance.
+        """
+        self.num_cities = num_cities
+
+    @abc.abstractmethod
+    def __call__(self, key: chex.PRNGKey) -> State:
+        """Generate a new instance.
+
+        Args:
+            key: random key used for any stochasticity in the instance generation process.
+
+        Returns:
+            A `TSP` state.
+        """
+
+    def _make_state(
+        self,
+        coordinates: chex.Array,
+        key: chex.PRNGKey,
+        num_cities: Optional[chex.Numeric] = None,
+    ) -> State:
+        """Return the initial state of an episode on the cities given by `coordinates`. If
+        `num_cities` is given, only the first `num_cities` cities belong to the instance, the
+        other ones are padding: their coordinates are zeroed and they are marked as visited.
+        """
+        if num_cities is None:
+            num_cities = self.num_cities
+        is_padding = jnp.arange(self.num_cities) >= num_cities
+        return State(
+            coordinates=jnp.where(is_padding[:, None], 0, coordinates),
+            position=jnp.array(-1, jnp.int32),
+            visited_mask=is_padding,
+            trajectory=jnp.full(self.num_cities, -1, jnp.int32),
+            num_visited=jnp.array(0, jnp.int32),
+            num_cities=jnp.asarray(num_cities, jnp.int32),
+            tour_length=jnp.array(0, float),
+            key=key,
+        )
+
+
+class RandomGenerator(Generator):
+    """Instance generator that samples the coordinates of the cities uniformly at random in the
+    unit square. Instances can have fewer cities than `num_cities`, in which case the number of
+    cities is sampled uniformly in [`min_num_cities`, `max_num_cities`] and the instance is padded
+    to `num_cities` cities.
+    """
+
+    def __init__(
+        self,
+        num_cities: int,
+        min_num_cities: Optional[int] = None,
+        max_num_cities: Optional[int] = None,
+    ):
+        """Instantiates a `RandomGenerator`.
+
+        Args:
+            num_cities: the number of cities of the arrays of an instance, padding included.
+            min_num_cities: the minimum number of cities of an instance. Defaults to
+                `max_num_cities`.
+            max_num_cities: the maximum number of cities of an instance. Defaults to `num_cities`.
+        """
+        super().__init__(num_cities)
+        self.max_num_cities = max_num_cities or num_cities
+        self.min_num_cities = min_num_cities or self.max_num_cities
+        if not 1 <= self.min_num_cities <= self.max_num_cities <= num_cities:
+            raise ValueError(
+                "Expected 1 <= min_num_cities <= max_num_cities <= num_cities, got "
+                f"{self.min_num_cities}, {self.max_num_cities} and {num_cities}."
+            )
+
+    def __call__(self, key: chex.PRNGKey) -> State:
+        key, sample_key = jax.random.split(key)
+        coordinates = jax.random.uniform(
+            sample_key, (self.num_cities, 2), minval=0, maxval=1
+        )
+        if self.min_num_cities == self.max_num_cities:
+            num_cities = self.max_num_cities
+        else:
+            key, size_key = jax.random.split(key)
+            num_cities = jax.random.randint(
+                size_key, (), self.min_num_cities, self.max_num_cities + 1
+            )
+        return self._make_state(coordinates, key, num_cities)
+
+
+class InstanceBankGenerator(IndexedGenerator[State], Generator):
+    """Instance generator that samples instances from a fixed bank (e.g. a benchmark set). The bank
+    is transferred to the device once at construction, so that resetting the environment is a
+    single gather rather than a host-to-device copy.
+    """
+
+    def __init__(self, source: Union[InstanceBankSource, chex.ArrayNumpy]):
+        """Instantiates an `InstanceBankGenerator`.
+
+        Args:
+            source: either an array or a path to a `.npy` file of shape
+                (num_instances, num_cities, 2) holding the coordinates of each instance, or a
+                mapping/path to a `.npz` archive with a "coordinates" array of that shape. The
+                archive may also hold a "num_cities" array of shape (num_instances,) for banks of
+                instances of different sizes padded to `num_cities` cities, see
+                `jumanji.environments.commons.instance_bank.pad_instances`.
+        """
+        if not isinstance(source, (str, Mapping)):
+            source = {"coordinates": source}
+        self.bank = load_instance_bank(
+            source, fields=["coordinates"], optional_fields=["num_cities"]
+        )
+        self.num_instances, num_cities, _ = self.bank["coordinates"].shape
+        super().__init__(num_cities)
+
+    def generate_instance(self, index: chex.Numeric, key: chex.PRNGKey) -> State:
+        """See `IndexedGenerator.generate_instance`."""
+        instance = select_from_instance_bank(index, self.bank)
+        return self._make_state(
+            instance["coordinates"], key, instance.get("num_cities")
+        )
@@ -0,0 +1,153 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import chex
+import jax
+import jax.numpy as jnp
+import numpy as np
+import py
+import pytest
+
+from jumanji.environments.commons.instance_bank import pad_instances
+from jumanji.environments.routing.tsp.env import TSP
+from jumanji.environments.routing.tsp.generator import (
+    InstanceBankGenerator,
+    RandomGenerator,
+)
+from jumanji.environments.routing.tsp.types import State
+from jumanji.testing.env_not_smoke import check_env_does_not_smoke
+from jumanji.testing.pytrees import assert_trees_are_different
+
+
+@pytest.fixture
+def coordinates_bank() -> np.ndarray:
+    return np.random.RandomState(0).uniform(size=(3, 5, 2)).astype(np.float32)
+
+
+def test_random_generator__call() -> None:
+    """Validate that the random generator creates different instances for different keys and
+    that it is jittable and compiles only once.
+    """
+    generator = RandomGenerator(num_cities=5)
+    chex.clear_trace_counter()
+    call_fn = jax.jit(chex.assert_max_traces(generator.__call__, n=1))
+    state1 = call_fn(jax.random.PRNGKey(1))
+    state2 = call_fn(jax.random.PRNGKey(2))
+    assert isinstance(state1, State)
+    assert state1.coordinates.shape == (5, 2)
+    assert_trees_are_different(state1, state2)
+
+
+def test_random_generator__padded_instances() -> None:
+    """Validate that instances of sampled sizes are padded with visited cities at the origin."""
+    generator = RandomGenerator(num_cities=8, min_num_cities=3, max_num_cities=6)
+    states = jax.jit(jax.vmap(generator))(jax.random.split(jax.random.PRNGKey(0), 50))
+    assert states.coordinates.shape == (50, 8, 2)
+    assert jnp.all((3 <= states.num_cities) & (states.num_cities <= 6))
+    assert len(jnp.unique(states.num_cities)) > 1
+    is_padding = jnp.arange(8) >= states.num_cities[:, None]
+    assert jnp.array_equal(states.visited_mask, is_padding)
+    assert jnp.all(jnp.where(is_padding[..., None], states.coordinates, 0) == 0)
+    with pytest.raises(ValueError):
+        RandomGenerator(num_cities=8, max_num_cities=9)
+
+
+def test_instance_bank_generator__call(coordinates_bank: np.ndarray) -> None:
+    """Validate that the instance bank generator only samples instances from the bank."""
+    generator = InstanceBankGenerator(coordinates_bank)
+    assert generator.num_cities == 5 and generator.num_instances == 3
+    chex.clear_trace_counter()
+    call_fn = jax.jit(chex.assert_max_traces(generator.__call__, n=1))
+    for key in jax.random.split(jax.random.PRNGKey(0), 10):
+        state = call_fn(key)
+        assert jnp.any(jnp.all(state.coordinates == coordinates_bank, axis=(1, 2)))
+        assert state.num_visited == 0
+
+
+def test_instance_bank_generator__generate_instance(
+    coordinates_bank: np.ndarray,
+) -> None:
+    """Validate that every instance of the bank can be selected by its index with a single
+    compiled program.
+    """
+    generator = InstanceBankGenerator(coordinates_bank)
+    chex.clear_trace_counter()
+    generate_fn = jax.jit(chex.assert_max_traces(generator.generate_instance, n=1))
+    for index in range(generator.num_instances):
+        state = generate_fn(index, jax.random.PRNGKey(index))
+        assert jnp.array_equal(state.coordinates, coordinates_bank[index])
+        assert state.num_visited == 0
+    states = jax.vmap(generator.generate_instance)(
+        jnp.arange(3), jax.random.split(jax.random.PRNGKey(0), 3)
+    )
+    assert jnp.array_equal(states.coordinates, coordinates_bank)
+
+
+def test_instance_bank_generator__from_file(
+    coordinates_bank: np.ndarray, tmpdir: py.path.local
+) -> None:
+    """Validate that the bank can be memory-mapped from a `.npy` file or read from a `.npz`."""
+    npy_path = str(tmpdir.join("bank.npy"))
+    np.save(npy_path, coordinates_bank)
+    npz_path = str(tmpdir.join("bank.npz"))
+    np.savez(npz_path, coordinates=coordinates_bank)
+    for path in [npy_path, npz_path]:
+        generator = InstanceBankGenerator(path)
+        assert jnp.array_equal(generator.bank["coordinates"], coordinates_bank)
+
+
+def test_tsp__instance_bank_generator(coordinates_bank: np.ndarray) -> None:
+    """Validate that the environment takes its size from the generator."""
+    env = TSP(generator=InstanceBankGenerator(coordinates_bank))
+    assert env.num_cities == 5
+    check_env_does_not_smoke(env)
+
+
+def test_tsp__padded_instance_bank(coordinates_bank: np.ndarray) -> None:
+    """Validate that an instance padded in a bank has the same episode as the unpadded one and
+    that instances of different sizes share the same compiled step.
+    """
+    bank = pad_instances(
+        [
+            {"coordinates": coordinates_bank[0, :3]},
+            {"coordinates": coordinates_bank[1]},
+        ],
+        size_field="num_cities",
+        num_elements=8,
+    )
+    assert bank["coordinates"].shape == (2, 8, 2)
+    assert list(bank["num_cities"]) == [3, 5]
+    env = TSP(generator=InstanceBankGenerator(bank))
+    unpadded_env = TSP(generator=InstanceBankGenerator(coordinates_bank[:1, :3]))
+    chex.clear_trace_counter()
+    step_fn = jax.jit(chex.assert_max_traces(env.step, n=1))
+    num_cities_seen = set()
+    for key in jax.random.split(jax.random.PRNGKey(0), 6):
+        state, timestep = env.reset(key)
+        num_cities = int(state.num_cities)
+        num_cities_seen.add(num_cities)
+        assert not jnp.any(timestep.observation.action_mask[num_cities:])
+        for action in range(num_cities):
+            state, timestep = step_fn(state, action)
+        assert timestep.last()
+        if num_cities == 3:
+            unpadded_state, _ = unpadded_env.reset(key)
+            for action in range(3):
+                unpadded_state, unpadded_timestep = unpadded_env.step(
+                    unpadded_state, action
+                )
+            assert jnp.isclose(state.tour_length, unpadded_state.tour_length)
+            assert jnp.isclose(timestep.reward, unpadded_timestep.reward)
+    assert num_cities_seen == {3, 5}
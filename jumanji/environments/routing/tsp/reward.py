@@ -51,17 +51,14 @@ class SparseReward(RewardFn):
         is_valid: bool,
     ) -> chex.Numeric:
         num_cities = len(state.visited_mask)
-        compute_sparse_reward = lambda: jax.lax.select(
+        # The tour length is tracked incrementally in the state, hence reading it is free.
+        sparse_reward = jax.lax.select(
             is_valid,
-            -compute_tour_length(next_state.coordinates, next_state.trajectory),
+            -next_state.tour_length,
             jnp.array(-num_cities * jnp.sqrt(2), float),
         )
-        is_done = (next_state.num_visited == num_cities) | ~is_valid
-        reward = jax.lax.cond(
-            is_done,
-            compute_sparse_reward,
-            lambda: jnp.array(0, float),
-        )
+        is_done = (next_state.num_visited == next_state.num_cities) | ~is_valid
+        reward = jax.lax.select(is_done, sparse_reward, jnp.array(0, float))
         return reward
 
 
@@ -76,27 +73,13 @@ class DenseReward(RewardFn):
         self, state: State, action: chex.Array, next_state: State, is_valid: bool
     ) -> chex.Numeric:
         num_cities = len(state.visited_mask)
-        previous_city = state.coordinates[state.position]
-        next_city = next_state.coordinates[next_state.position]
-        # By default, returns the negative distance between the previous and new city.
+        # The increase of the tour length is the distance between the previous and new city, plus
+        # the distance back to the initial city once the tour is finished.
         reward = jax.lax.select(
             is_valid,
-            -distance_between_two_cities(previous_city, next_city),
+            state.tour_length - next_state.tour_length,
             jnp.array(-num_cities * jnp.sqrt(2), float),
         )
-        # Returns 0 for the first city selected.
-        reward = jax.lax.select(
-            state.num_visited == 0,
-            jnp.array(0, float),
-            reward,
-        )
-        # Adds the distance between the last city and the first city if the tour is finished.
-        initial_city = state.coordinates[state.trajectory[0]]
-        reward = jax.lax.select(
-            jnp.all(next_state.visited_mask),
-            reward - distance_between_two_cities(next_city, initial_city),
-            reward,
-        )
         return reward
 
 
@@ -114,3 +97,8 @@ def distance_between_two_cities(
 ) -> chex.Numeric:
     """Calculate the Euclidean distance between two neighboring cities."""
     return jnp.linalg.norm(city_one_coordinates - city_two_coordinates)
+
+
+def compute_distance_matrix(coordinates: chex.Array) -> chex.Array:
+    """Calculate the Euclidean distances between all pairs of cities."""
+    return jnp.linalg.norm(coordinates[:, None] - coordinates[None, :], axis=-1)
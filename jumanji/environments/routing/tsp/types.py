@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import TYPE_CHECKING, NamedTuple
+from typing import TYPE_CHECKING, NamedTuple, Optional
 
 import chex
 
@@ -30,7 +30,11 @@ class State:
     visited_mask: binary mask (False/True <--> unvisited/visited).
     trajectory: array of city indices defining the route (-1 --> not filled yet).
     num_visited: how many cities have been visited.
+    num_cities: number of cities of the instance, the following ones are padding.
+    tour_length: length of the route travelled so far, including the way back to the first city
+        once all cities have been visited.
     key: random key used for auto-reset.
+    distances: optional matrix of the pairwise distances between cities, precomputed at reset.
     """
 
     coordinates: chex.Array  # (num_cities, 2)
@@ -38,7 +42,10 @@ class State:
     visited_mask: chex.Array  # (num_cities,)
     trajectory: chex.Array  # (num_cities,)
     num_visited: chex.Numeric  # ()
+    num_cities: chex.Numeric  # ()
+    tour_length: chex.Numeric  # ()
     key: chex.PRNGKey  # (2,)
+    distances: Optional[chex.Array] = None  # (num_cities, num_cities)
 
 
 class Observation(NamedTuple):
@@ -139,9 +139,9 @@ class TSPViewer(Viewer):
 
     def _add_tour(self, ax: plt.Axes, state: State) -> None:
         """Add all the cities and the current tour between the visited cities to the plot."""
-        x_coords, y_coords = state.coordinates.T
+        x_coords, y_coords = state.coordinates[: state.num_cities].T
 
-        # Draw the cities as nodes
+        # Draw the cities as nodes, leaving out the padding ones
         ax.scatter(x_coords, y_coords, s=self.NODE_SIZE, color=self.NODE_COLOUR)
 
         # Draw the arrows between cities
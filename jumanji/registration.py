@@ -12,10 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import bisect
 import importlib
+import inspect
 import re
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, Set, Tuple, Type
+from typing import Any, Callable, Dict, Optional, Sequence, Set, Tuple, Type
 
 from jumanji.env import Environment
 
@@ -76,6 +78,10 @@ class EnvSpec:
     # Environment arguments
     kwargs: dict = field(default_factory=dict)
 
+    # Constructor argument setting the instance size, e.g. "num_cities", for environments that
+    # support instances padded to a larger size through `min_<size_kwarg>` and `max_<size_kwarg>`.
+    size_kwarg: Optional[str] = None
+
     # Environment specs
     name: str = field(init=False)
     version: int = field(init=False)
@@ -106,6 +112,7 @@ def _check_registration_is_allowed(spec: EnvSpec) -> None:
 def register(
     id: str,
     entry_point: str,
+    size_kwarg: Optional[str] = None,
     **kwargs: Dict,
 ) -> None:
     """Register an environment.
@@ -113,6 +120,9 @@ def register(
     Args:
         id: environment ID, formatted as `<env-name>-v<version>`.
         entry_point: module and class constructor for the environment.
+        size_kwarg: optional constructor argument setting the instance size, to support
+            `bucket_sizes` in `make`. The constructor must also accept `min_<size_kwarg>` and
+            `max_<size_kwarg>` to bound the sizes of the instances padded to `<size_kwarg>`.
         **kwargs: extra arguments that will be passed to the environment constructor at
             instantiation.
     """
@@ -126,6 +136,7 @@ def register(
     spec = EnvSpec(
         id=env_id,
         entry_point=entry_point,
+        size_kwarg=size_kwarg,
         **kwargs,
     )
 
@@ -150,7 +161,12 @@ def load(name: str) -> Type[Environment]:
     return env_constructor
 
 
-def make(id: str, *args: Any, **kwargs: Any) -> Environment:
+def spec(id: str) -> EnvSpec:
+    """Returns the spec of a registered environment.
+
+    Raises:
+        ValueError: if the environment is not registered.
+    """
     env_name, version = parse_env_id(id)
     env_id = get_env_id(env_name, version)
 
@@ -161,7 +177,30 @@ def make(id: str, *args: Any, **kwargs: Any) -> Environment:
             f"Please select from the registered environments: \n{registered_envs}."
         )
 
-    env_spec = _REGISTRY[env_id]
+    return _REGISTRY[env_id]
+
+
+def make(
+    id: str,
+    *args: Any,
+    bucket_sizes: Optional[Sequence[int]] = None,
+    **kwargs: Any,
+) -> Environment:
+    """Instantiates a registered environment.
+
+    Args:
+        id: environment ID, formatted as `<env-name>-v<version>`.
+        *args: positional arguments passed to the environment constructor.
+        bucket_sizes: optional instance sizes to compile for, only supported by environments
+            registered with a `size_kwarg`. The requested size is rounded up to the smallest
+            bucket that fits it and the instances are padded to that size, so that all sizes
+            of a bucket share the same array shapes, hence the same compiled programs.
+        **kwargs: keyword arguments overwriting the registered constructor arguments.
+
+    Returns:
+        the environment instance.
+    """
+    env_spec = spec(id)
 
     # Overwrite the constructor arguments
     env_fn_kwargs = env_spec.kwargs.copy()
@@ -169,8 +208,61 @@ def make(id: str, *args: Any, **kwargs: Any) -> Environment:
 
     env_fn: Callable[..., Environment] = load(env_spec.entry_point)
 
+    if bucket_sizes is not None:
+        env_fn_kwargs = _bucket_kwargs(env_spec, env_fn, bucket_sizes, env_fn_kwargs)
+
     return env_fn(*args, **env_fn_kwargs)
 
 
+def bucket_size(size: int, bucket_sizes: Sequence[int]) -> int:
+    """Returns the smallest bucket size that fits `size`.
+
+    Raises:
+        ValueError: if `bucket_sizes` is empty or not positive, or if `size` is larger than all
+            the bucket sizes.
+    """
+    _check_bucket_sizes(bucket_sizes)
+    bucket_sizes = sorted(bucket_sizes)
+    index = bisect.bisect_left(bucket_sizes, size)
+    if index == len(bucket_sizes):
+        raise ValueError(
+            f"Size {size} is larger than the largest bucket size {bucket_sizes[-1]}."
+        )
+    return bucket_sizes[index]
+
+
+def _check_bucket_sizes(bucket_sizes: Sequence[int]) -> None:
+    if not bucket_sizes or min(bucket_sizes) <= 0:
+        raise ValueError(
+            f"Expected a non-empty sequence of positive bucket sizes, got {list(bucket_sizes)}."
+        )
+
+
+def _bucket_kwargs(
+    env_spec: EnvSpec,
+    env_fn: Callable[..., Environment],
+    bucket_sizes: Sequence[int],
+    kwargs: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Rounds the size argument up to its bucket. The maximum instance size defaults to the
+    requested size, and the minimum one to the maximum one.
+    """
+    _check_bucket_sizes(bucket_sizes)
+    size_kwarg = env_spec.size_kwarg
+    if size_kwarg is None:
+        raise ValueError(
+            f"The environment {env_spec.id} does not support bucketed instance sizes."
+        )
+    size = kwargs.get(size_kwarg)
+    if size is None:
+        size = inspect.signature(env_fn).parameters[size_kwarg].default
+    max_size = kwargs.get(f"max_{size_kwarg}") or size
+    return {
+        **kwargs,
+        f"max_{size_kwarg}": max_size,
+        size_kwarg: bucket_size(max_size, bucket_sizes),
+    }
+
+
 def registered_environments() -> Set[str]:
     return set(_REGISTRY.keys())
@@ -109,3 +109,33 @@ def test_registration__make() -> None:
 
         env_class = registration.load(env_spec.entry_point)
         assert isinstance(env, env_class)
+
+
+def test_bucket_size() -> None:
+    assert registration.bucket_size(20, [64, 32]) == 32
+    assert registration.bucket_size(32, [32, 64]) == 32
+    assert registration.bucket_size(33, [32, 64]) == 64
+    with pytest.raises(ValueError, match="larger than the largest bucket size"):
+        registration.bucket_size(65, [32, 64])
+    for bucket_sizes in [[], [0, 32], [-32]]:
+        with pytest.raises(ValueError, match="non-empty sequence of positive"):
+            registration.bucket_size(20, bucket_sizes)
+
+
+def test_make__bucket_sizes() -> None:
+    """Check that the size is rounded up to its bucket and bounds the instance sizes."""
+    env = jumanji.make("TSP-v1", num_cities=37, bucket_sizes=(32, 64))
+    assert env.num_cities == 64
+    assert env.generator.min_num_cities == env.generator.max_num_cities == 37
+    env = jumanji.make(
+        "TSP-v1", num_cities=50, min_num_cities=33, bucket_sizes=(32, 64)
+    )
+    assert env.num_cities == 64
+    assert (env.generator.min_num_cities, env.generator.max_num_cities) == (33, 50)
+    # The registered size is used if none is given.
+    env = jumanji.make("Knapsack-v1", bucket_sizes=(64,))
+    assert env.num_items == 64 and env.generator.max_num_items == 50
+    with pytest.raises(ValueError, match="does not support bucketed instance sizes"):
+        jumanji.make("Snake-v1", bucket_sizes=(32,))
+    with pytest.raises(ValueError, match="non-empty sequence of positive"):
+        jumanji.make("TSP-v1", num_cities=37, bucket_sizes=[])
@@ -0,0 +1,150 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Generic, List, NamedTuple, Optional, Sequence
+
+import chex
+import jax
+import jax.numpy as jnp
+import numpy as np
+
+from jumanji.env import Environment, State
+from jumanji.tree_utils import tree_add_element, tree_slice
+
+
+class EpisodeLog(NamedTuple):
+    """Compact record of an episode, from which its states can be regenerated since
+    environments are deterministic given their reset key and actions.
+
+    - key: random key the environment was reset with.
+    - actions: array of shape (T, ...) of the actions taken during the episode.
+    """
+
+    key: chex.PRNGKey
+    actions: chex.Array
+
+    @property
+    def num_steps(self) -> int:
+        return int(self.actions.shape[0])
+
+
+class EpisodeReplayer(Generic[State]):
+    """Regenerates the states of logged episodes with a jitted `jax.lax.scan` over their
+    actions, so that episodes can be stored as an `EpisodeLog` (O(T) memory) rather than as
+    a sequence of states (O(T * |state|) memory), e.g. to animate them:
+
+    ```python
+    replayer = EpisodeReplayer(env)
+    env.animate(replayer.replay_states(episode_log))
+    ```
+
+    The scan runs over all the actions of the log, and the environment is not stepped after the
+    last requested step. One program is compiled per episode length unless `max_steps` is given,
+    in which case the actions are padded to `max_steps` and episodes of any length share the same
+    program. The requested steps are padded to the next power of 2, so that only a logarithmic
+    number of programs is compiled for different numbers of requested steps.
+    """
+
+    def __init__(self, env: Environment[State], max_steps: Optional[int] = None):
+        """
+        Args:
+            env: environment the episodes were played in, without auto-reset wrappers.
+            max_steps: maximum number of actions of the replayed episodes, e.g. the time limit
+                of the environment. If None, the actions are not padded.
+        """
+        self.env = env
+        self.max_steps = max_steps
+        self._replay = jax.jit(self._replay_fn)
+
+    def replay(
+        self, episode_log: EpisodeLog, steps: Optional[Sequence[int]] = None
+    ) -> State:
+        """Regenerates the states of an episode, stacked along a leading axis.
+
+        Args:
+            episode_log: reset key and actions of the episode.
+            steps: steps to return the states of, in [0, T], where step t is the state after t
+                actions, i.e. step 0 is the reset state. Duplicates are dropped and states are
+                returned in increasing step order. Defaults to all T + 1 steps.
+
+        Returns:
+            states of shape (len(steps), ...). Only the requested states are kept in memory
+            while replaying.
+        """
+        num_steps = episode_log.num_steps
+        if self.max_steps is not None and num_steps > self.max_steps:
+            raise ValueError(
+                f"Expected episodes of at most max_steps={self.max_steps} steps, got "
+                f"{num_steps}."
+            )
+        if steps is None:
+            steps = np.arange(num_steps + 1)
+        steps = np.unique(np.asarray(steps, int))
+        if steps.size == 0 or steps[0] < 0 or steps[-1] > num_steps:
+            raise ValueError(
+                f"Expected non-empty steps in [0, {num_steps}], got {steps}."
+            )
+        actions = episode_log.actions
+        if self.max_steps is not None:
+            padding = [(0, self.max_steps - num_steps)] + [(0, 0)] * (actions.ndim - 1)
+            actions = jnp.pad(actions, padding)
+        # Repeating the last step leaves the extra slots unwritten, they are dropped below.
+        num_slots = 1 << (len(steps) - 1).bit_length()
+        padded_steps = np.pad(steps, (0, num_slots - len(steps)), mode="edge")
+        states = self._replay(
+            episode_log._replace(actions=actions), jnp.asarray(padded_steps)
+        )
+        return jax.tree_util.tree_map(lambda x: x[: len(steps)], states)
+
+    def replay_states(
+        self, episode_log: EpisodeLog, steps: Optional[Sequence[int]] = None
+    ) -> List[State]:
+        """Same as `replay` but returns a list of states, e.g. for `env.animate`."""
+        states = self.replay(episode_log, steps)
+        num_states = jax.tree_util.tree_leaves(states)[0].shape[0]
+        return [tree_slice(states, i) for i in range(num_states)]
+
+    def _replay_fn(self, episode_log: EpisodeLog, steps: chex.Array) -> State:
+        def record(states: State, state: State, step: chex.Array) -> State:
+            # Overwrite the slot of `step` if requested, else rewrite the slot unchanged.
+            slot = jnp.minimum(jnp.searchsorted(steps, step), len(steps) - 1)
+            requested = steps[slot] == step
+            value = jax.tree_util.tree_map(
+                lambda x, xs: jnp.where(requested, x, xs[slot]), state, states
+            )
+            return tree_add_element(states, slot, value)
+
+        state, _ = self.env.reset(episode_log.key)
+        states = jax.tree_util.tree_map(
+            lambda x: jnp.zeros((len(steps), *x.shape), x.dtype), state
+        )
+        states = record(states, state, jnp.asarray(0))
+
+        def step_fn(carry: chex.ArrayTree, xs: chex.ArrayTree) -> chex.ArrayTree:
+            state, states = carry
+            step, action = xs
+            # The actions after the last requested step, e.g. padding, are not replayed.
+            state = jax.lax.cond(
+                step <= steps[-1],
+                lambda: self.env.step(state, action)[0],
+                lambda: state,
+            )
+            return (state, record(states, state, step)), None
+
+        (_, states), _ = jax.lax.scan(
+            step_fn,
+            (state, states),
+            (jnp.arange(1, episode_log.num_steps + 1), episode_log.actions),
+        )
+        return states
@@ -0,0 +1,103 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import List, Tuple
+
+import jax
+import jax.numpy as jnp
+import pytest
+
+from jumanji.environments.packing.knapsack import Knapsack, State
+from jumanji.environments.packing.knapsack.generator import RandomGenerator
+from jumanji.replay import EpisodeLog, EpisodeReplayer
+from jumanji.testing.pytrees import assert_trees_are_equal
+from jumanji.tree_utils import tree_slice
+
+
+@pytest.fixture
+def knapsack() -> Knapsack:
+    return Knapsack(generator=RandomGenerator(num_items=6, total_budget=2.0))
+
+
+@pytest.fixture
+def played_episode(knapsack: Knapsack) -> Tuple[EpisodeLog, List[State]]:
+    """Plays an episode with the first valid action at each step and keeps all its states."""
+    key = jax.random.PRNGKey(0)
+    state, timestep = knapsack.reset(key)
+    states, actions = [state], []
+    while not timestep.last():
+        action = jnp.argmax(timestep.observation.action_mask)
+        state, timestep = knapsack.step(state, action)
+        states.append(state)
+        actions.append(action)
+    return EpisodeLog(key=key, actions=jnp.stack(actions)), states
+
+
+def test_episode_replayer__replay_all_steps(
+    knapsack: Knapsack, played_episode: Tuple[EpisodeLog, List[State]]
+) -> None:
+    """Validates that replaying an episode log regenerates all the played states."""
+    episode_log, states = played_episode
+    replayed_states = EpisodeReplayer(knapsack).replay_states(episode_log)
+    assert len(replayed_states) == episode_log.num_steps + 1 == len(states)
+    for replayed_state, state in zip(replayed_states, states):
+        assert_trees_are_equal(replayed_state, state)
+
+
+def test_episode_replayer__replay_subset(
+    knapsack: Knapsack, played_episode: Tuple[EpisodeLog, List[State]]
+) -> None:
+    """Validates that only the requested steps are returned, sorted and without duplicates."""
+    episode_log, states = played_episode
+    steps = [2, 0, 2, 1]
+    replayed_states = EpisodeReplayer(knapsack).replay(episode_log, steps)
+    assert jax.tree_util.tree_leaves(replayed_states)[0].shape[0] == 3
+    for i, step in enumerate([0, 1, 2]):
+        assert_trees_are_equal(tree_slice(replayed_states, i), states[step])
+
+
+def test_episode_replayer__max_steps(
+    knapsack: Knapsack, played_episode: Tuple[EpisodeLog, List[State]]
+) -> None:
+    """Validates that with `max_steps`, logs of different lengths and different numbers of
+    requested steps (within the same power of 2) are replayed by the same compiled program.
+    """
+    episode_log, states = played_episode
+    short_log = episode_log._replace(actions=episode_log.actions[:-1])
+    replayer = EpisodeReplayer(knapsack, max_steps=knapsack.num_items)
+    replayed_states = replayer.replay_states(episode_log, [0, 1, 2])
+    short_replayed_states = replayer.replay_states(
+        short_log, [0, 1, 2, short_log.num_steps]
+    )
+    assert replayer._replay._cache_size() == 1
+    assert len(replayed_states) == 3 and len(short_replayed_states) == 4
+    for replayed_state, step in zip(
+        short_replayed_states, [0, 1, 2, short_log.num_steps]
+    ):
+        assert_trees_are_equal(replayed_state, states[step])
+    for replayed_state, state in zip(replayed_states, states):
+        assert_trees_are_equal(replayed_state, state)
+    with pytest.raises(ValueError):
+        EpisodeReplayer(knapsack, max_steps=1).replay(episode_log)
+
+
+@pytest.mark.parametrize("steps", [[], [-1], [100]])
+def test_episode_replayer__invalid_steps(
+    knapsack: Knapsack,
+    played_episode: Tuple[EpisodeLog, List[State]],
+    steps: List[int],
+) -> None:
+    episode_log, _ = played_episode
+    with pytest.raises(ValueError):
+        EpisodeReplayer(knapsack).replay(episode_log, steps)
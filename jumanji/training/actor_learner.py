@@ -0,0 +1,296 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Asynchronous actor-learner pipeline. Several actor threads each step their own batch of
+environments with the latest published (hence slightly stale) parameters and push trajectories
+into a bounded queue. A learner thread consumes them, updates the parameters and publishes them
+back. Environment stepping thus overlaps with gradient computation.
+"""
+
+import abc
+import functools
+import queue
+import threading
+import time
+from types import TracebackType
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+import chex
+import jax
+import jax.numpy as jnp
+
+from jumanji.env import Environment
+from jumanji.training.agents.a2c import A2CAgent
+from jumanji.training.recorder import TrajectoryRecorder
+from jumanji.training.types import ActingState, ParamsState, TrainingState
+from jumanji.training.utils import mean_epoch_metrics
+
+# Time in seconds after which blocking queue operations check whether to stop.
+_POLL_INTERVAL = 0.1
+
+
+class ParamsBroadcast:
+    """Publishes the learner's parameters to the actors without locking: jax arrays are
+    immutable and rebinding an attribute is atomic, so readers always see a consistent
+    (version, params_state) pair.
+    """
+
+    def __init__(self, params_state: ParamsState):
+        self._published: Tuple[int, ParamsState] = (0, params_state)
+
+    def publish(self, version: int, params_state: ParamsState) -> None:
+        self._published = (version, params_state)
+
+    def get(self) -> Tuple[int, ParamsState]:
+        return self._published
+
+
+class _Worker(threading.Thread, abc.ABC):
+    """Thread that records the exception that stopped it, to be re-raised by the main thread."""
+
+    def __init__(self, name: str, stop_event: threading.Event):
+        super().__init__(name=name, daemon=True)
+        self.stop_event = stop_event
+        self.error: Optional[BaseException] = None
+
+    def run(self) -> None:
+        try:
+            while not self.stop_event.is_set():
+                self.step()
+        except BaseException as error:  # noqa: B902
+            self.error = error
+            self.stop_event.set()
+
+    @abc.abstractmethod
+    def step(self) -> None:
+        """Does one unit of work, called in a loop until the stop event is set."""
+
+
+class Actor(_Worker):
+    """Steps a batch of `agent.total_batch_size` environments with the last published policy and
+    pushes (params version, trajectory) pairs of shape (n_steps, batch_size, ...) to the queue.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        agent: A2CAgent,
+        env: Environment,
+        broadcast: ParamsBroadcast,
+        trajectories: queue.Queue,
+        key: chex.PRNGKey,
+        stop_event: threading.Event,
+    ):
+        super().__init__(name=name, stop_event=stop_event)
+        self.broadcast = broadcast
+        self.trajectories = trajectories
+        # The static observation fields are regenerated by the learner rather than queued.
+        self.rollout = jax.jit(
+            functools.partial(agent.rollout, split_static_observation=True)
+        )
+        self.num_steps_per_rollout = agent.n_steps * agent.total_batch_size
+        self.num_env_steps = 0
+        reset_key, acting_key = jax.random.split(key)
+        state, timestep = jax.jit(env.reset)(
+            jax.random.split(reset_key, agent.batch_size)
+        )
+        self.acting_state = ActingState(
+            state=state,
+            timestep=timestep,
+            key=acting_key,
+            episode_count=jnp.zeros((), float),
+            env_step_count=jnp.zeros((), float),
+        )
+
+    def step(self) -> None:
+        version, params_state = self.broadcast.get()
+        self.acting_state, data = self.rollout(
+            params_state.params.actor, self.acting_state
+        )
+        # Wait for the rollout here rather than in the learner, so that the actors' time is
+        # spent in this thread and the step count below is accurate.
+        data = jax.block_until_ready(data)
+        self.num_env_steps += self.num_steps_per_rollout
+        while not self.stop_event.is_set():
+            try:
+                self.trajectories.put((version, data), timeout=_POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+
+
+class Learner(_Worker):
+    """Consumes trajectories, updates the parameters, publishes them and pushes the metrics of
+    each update to an unbounded queue read by the main thread. The consumed trajectories are
+    also passed to the recorder, if any, with their static observation fields.
+    """
+
+    def __init__(
+        self,
+        agent: A2CAgent,
+        params_state: ParamsState,
+        broadcast: ParamsBroadcast,
+        trajectories: queue.Queue,
+        key: chex.PRNGKey,
+        stop_event: threading.Event,
+        recorder: Optional[TrajectoryRecorder] = None,
+    ):
+        super().__init__(name="learner", stop_event=stop_event)
+        self.params_state = params_state
+        self.broadcast = broadcast
+        self.trajectories = trajectories
+        self.metrics: queue.Queue = queue.Queue()
+        self.update = jax.jit(agent.update_from_transitions)
+        self.recorder = recorder
+        self.with_static_observation = jax.jit(agent.with_static_observation)
+        self.key = key
+        self.version = 0
+
+    def step(self) -> None:
+        try:
+            actor_version, data = self.trajectories.get(timeout=_POLL_INTERVAL)
+        except queue.Empty:
+            return
+        if self.recorder is not None:
+            self.recorder.record(self.with_static_observation(data))
+        self.key, update_key = jax.random.split(self.key)
+        self.params_state, metrics = self.update(self.params_state, data, update_key)
+        self.version += 1
+        self.broadcast.publish(self.version, self.params_state)
+        # Number of updates between the params used to act and the ones being updated.
+        metrics.update(params_staleness=self.version - 1 - actor_version)
+        self.metrics.put(metrics)
+
+
+class ActorLearner:
+    """Runs `num_actors` actor threads and one learner thread. Use it as a context manager to
+    start and stop the threads, and call `run_epoch` from the main thread to wait for updates.
+
+    Only the A2C agent is supported, jitted on a single device (see `jumanji.training.sharding`).
+    Each learner step consumes one trajectory of `n_steps * total_batch_size` environment steps,
+    which is also written to `recorder` if given. The recorder is started and stopped with the
+    threads.
+    """
+
+    def __init__(
+        self,
+        env: Environment,
+        agent: A2CAgent,
+        key: chex.PRNGKey,
+        num_actors: int,
+        queue_size: int,
+        recorder: Optional[TrajectoryRecorder] = None,
+    ):
+        if agent.axis_name is not None or agent.batch_size != agent.total_batch_size:
+            raise ValueError(
+                "Expected an agent jitted on a single-device mesh, e.g. "
+                "A2CAgent(..., mesh=jumanji.training.sharding.make_mesh(1))."
+            )
+        params_key, learner_key, *actor_keys = jax.random.split(key, 2 + num_actors)
+        params_state = agent.init_params(params_key)
+        self.broadcast = ParamsBroadcast(params_state)
+        self.trajectories: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.stop_event = threading.Event()
+        self.actors = [
+            Actor(
+                name=f"actor_{i}",
+                agent=agent,
+                env=env,
+                broadcast=self.broadcast,
+                trajectories=self.trajectories,
+                key=actor_key,
+                stop_event=self.stop_event,
+            )
+            for i, actor_key in enumerate(actor_keys)
+        ]
+        self.learner = Learner(
+            agent=agent,
+            params_state=params_state,
+            broadcast=self.broadcast,
+            trajectories=self.trajectories,
+            key=learner_key,
+            stop_event=self.stop_event,
+            recorder=recorder,
+        )
+        self.recorder = recorder
+        self._last_time = time.perf_counter()
+        self._last_num_env_steps = 0
+
+    @property
+    def training_state(self) -> TrainingState:
+        """Last published parameters and the acting state of the first actor."""
+        _, params_state = self.broadcast.get()
+        return TrainingState(
+            params_state=params_state, acting_state=self.actors[0].acting_state
+        )
+
+    def __enter__(self) -> "ActorLearner":
+        if self.recorder is not None:
+            self.recorder.__enter__()
+        for worker in [self.learner, *self.actors]:
+            worker.start()
+        self._last_time = time.perf_counter()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        self.stop_event.set()
+        for worker in [self.learner, *self.actors]:
+            worker.join()
+        if self.recorder is not None:
+            self.recorder.__exit__(exc_type, exc_val, exc_tb)
+
+    def run_epoch(self, num_learner_steps: int) -> Tuple[TrainingState, Dict]:
+        """Waits for the next `num_learner_steps` updates of the learner.
+
+        Returns:
+            training state with the last published parameters, and the metrics averaged over
+            the updates along with the actors' and learner's throughputs.
+        """
+        metrics: List[Dict] = []
+        while len(metrics) < num_learner_steps:
+            self._check_workers()
+            try:
+                metrics.append(self.learner.metrics.get(timeout=_POLL_INTERVAL))
+            except queue.Empty:
+                continue
+        current_time = time.perf_counter()
+        elapsed_time = current_time - self._last_time
+        num_env_steps = sum(actor.num_env_steps for actor in self.actors)
+        mean_metrics: Dict[str, Any] = mean_epoch_metrics(
+            jax.tree_util.tree_map(lambda *x: jnp.stack(x), *metrics)
+        )
+        mean_metrics.update(
+            actor_steps_per_second=int(
+                (num_env_steps - self._last_num_env_steps) / elapsed_time
+            ),
+            learner_steps_per_second=num_learner_steps / elapsed_time,
+            queue_size=self.trajectories.qsize(),
+        )
+        self._last_time = current_time
+        self._last_num_env_steps = num_env_steps
+        return self.training_state, mean_metrics
+
+    def _check_workers(self) -> None:
+        for worker in [self.learner, *self.actors]:
+            if worker.error is not None:
+                raise RuntimeError(
+                    f"The {worker.name} thread failed."
+                ) from worker.error
+        if self.stop_event.is_set():
+            raise RuntimeError("The actor-learner pipeline was stopped.")
@@ -13,7 +13,7 @@
 # limitations under the License.
 
 import functools
-from typing import Any, Callable, Dict, Tuple
+from typing import Any, Callable, Dict, Optional, Tuple
 
 import chex
 import haiku as hk
@@ -21,10 +21,13 @@ import jax
 import jax.numpy as jnp
 import optax
 import rlax
+from jax.sharding import Mesh
 
 from jumanji.env import Environment
+from jumanji.training import sharding
 from jumanji.training.agents.base import Agent
 from jumanji.training.networks.actor_critic import ActorCriticNetworks
+from jumanji.training.recorder import TrajectoryRecorder
 from jumanji.training.types import (
     ActingState,
     ActorCriticParams,
@@ -32,9 +35,14 @@ from jumanji.training.types import (
     TrainingState,
     Transition,
 )
+from jumanji.wrappers import StaticObservationState
 
 
 class A2CAgent(Agent):
+    # Whether the rollout stores the log-probabilities of the behaviour policy. A2C recomputes
+    # them with the current parameters, so storing them would only grow the rollout's output.
+    store_log_prob = False
+
     def __init__(
         self,
         env: Environment,
@@ -48,8 +56,17 @@ class A2CAgent(Agent):
         l_pg: float,
         l_td: float,
         l_en: float,
+        mesh: Optional[Mesh] = None,
+        remat: bool = False,
+        num_micro_batches: int = 1,
+        recorder: Optional[TrajectoryRecorder] = None,
     ) -> None:
-        super().__init__(total_batch_size=total_batch_size)
+        super().__init__(total_batch_size=total_batch_size, mesh=mesh)
+        if self.batch_size_per_device % num_micro_batches != 0:
+            raise ValueError(
+                "Expected the batch size per device to be a multiple of num_micro_batches, "
+                f"got {self.batch_size_per_device} and {num_micro_batches}."
+            )
         self.env = env
         self.observation_spec = env.observation_spec()
         self.n_steps = n_steps
@@ -61,6 +78,10 @@ class A2CAgent(Agent):
         self.l_pg = l_pg
         self.l_td = l_td
         self.l_en = l_en
+        self.remat = remat
+        self.num_micro_batches = num_micro_batches
+        # Recorder the rollouts' transitions are sent to, if any, see `rollout`.
+        self.recorder = recorder
 
     def init_params(self, key: chex.PRNGKey) -> ParamsState:
         actor_key, critic_key = jax.random.split(key)
@@ -85,39 +106,209 @@ class A2CAgent(Agent):
                 "Expected params_state to be of type ParamsState, got "
                 f"type {type(training_state.params_state)}."
             )
-        grad, (acting_state, metrics) = jax.grad(self.a2c_loss, has_aux=True)(
-            training_state.params_state.params,
-            training_state.acting_state,
-        )
-        grad, metrics = jax.lax.pmean((grad, metrics), "devices")
-        updates, opt_state = self.optimizer.update(
-            grad, training_state.params_state.opt_state
+        # Acting is not differentiated: the log-probabilities are recomputed from the stored
+        # observations in a single batched forward pass, so that no residuals of the rollout's
+        # scan (policy activations, environment states) are kept for the backward pass.
+        with jax.named_scope("rollout"):
+            acting_state, data = self.rollout(
+                policy_params=training_state.params_state.params.actor,
+                acting_state=training_state.acting_state,
+            )  # data.shape == (T, B, ...)
+        params_state, metrics = self.update_from_transitions(
+            training_state.params_state, data, acting_state.key
         )
-        params = optax.apply_updates(training_state.params_state.params, updates)
         training_state = TrainingState(
-            params_state=ParamsState(
-                params=params,
-                opt_state=opt_state,
-                update_count=training_state.params_state.update_count + 1,
-            ),
+            params_state=params_state,
             acting_state=acting_state,
         )
         return training_state, metrics
 
+    def update_from_transitions(
+        self, params_state: ParamsState, data: Transition, key: chex.PRNGKey
+    ) -> Tuple[ParamsState, Dict]:
+        """Gradient step on transitions of shape (T, B, ...), collected by the current policy or
+        by a possibly stale one, e.g. by the actors of `jumanji.training.actor_learner`. The
+        logits and log-probabilities of the actions are recomputed with the current parameters
+        before computing the A2C loss.
+        """
+        hyperparams = params_state.hyperparams or {}
+        l_en = hyperparams.get("l_en", self.l_en)
+        with jax.named_scope("static_observation"):
+            data = self.with_static_observation(data)
+
+        def loss_fn(
+            params: ActorCriticParams,
+            data: Transition,
+            key: chex.PRNGKey,
+            batch_mask: chex.Array,
+        ) -> Tuple[float, Dict]:
+            with jax.named_scope("recompute_policy"):
+                transitions = self.recompute_policy_outputs(params.actor, data)
+            return self.a2c_loss(params, transitions, key, l_en, batch_mask)
+
+        with jax.named_scope("a2c_grad"):
+            if self.num_micro_batches == 1:
+                grad, metrics = jax.grad(loss_fn, has_aux=True)(
+                    params_state.params, data, key, self.batch_mask
+                )
+            else:
+                grad, metrics = self.accumulate_gradients(
+                    loss_fn, params_state.params, data, key
+                )
+        if data.extras:
+            metrics.update(self.extras_metrics(data.extras))
+        with jax.named_scope("pmean"):
+            grad, metrics = self.pmean((grad, metrics))
+        return self.apply_gradients(params_state, grad), metrics
+
+    def accumulate_gradients(
+        self,
+        loss_fn: Callable[..., Tuple[float, Dict]],
+        params: ActorCriticParams,
+        data: Transition,
+        key: chex.PRNGKey,
+    ) -> Tuple[ActorCriticParams, Dict]:
+        """Splits the environments of `data` (shape (T, B, ...)) into `num_micro_batches`
+        micro-batches and accumulates their gradients in a `jax.lax.scan`, so that only the
+        activations of one micro-batch are alive at once. Micro-batch k holds the environments
+        k, k + K, ..., hence stays evenly sharded over the devices. The gradients and metrics
+        are weighted by the number of (non-padding) environments of each micro-batch, which
+        gives the gradient of the whole batch, except that advantages are normalized within each
+        micro-batch.
+
+        Args:
+            loss_fn: function of (params, data, key, batch_mask) returning the loss and metrics.
+            params: parameters to differentiate.
+            data: transitions of shape (T, B, ...).
+            key: random key split into one key per micro-batch.
+
+        Returns:
+            accumulated gradient and metrics.
+        """
+        num_micro_batches = self.num_micro_batches
+
+        def split(x: chex.Array) -> chex.Array:
+            x = x.reshape(x.shape[0], -1, num_micro_batches, *x.shape[2:])
+            return jnp.moveaxis(x, 2, 0)  # (K, T, B // K, ...)
+
+        micro_batches = jax.tree_util.tree_map(split, data)
+        batch_masks = self.batch_mask.reshape(-1, num_micro_batches).T
+        weights = batch_masks.sum(axis=1) / batch_masks.sum()
+
+        def accumulate(
+            grad: ActorCriticParams,
+            xs: Tuple[Transition, chex.Array, float, chex.PRNGKey],
+        ) -> Tuple[ActorCriticParams, Dict]:
+            micro_batch, batch_mask, weight, key = xs
+            micro_batch_grad, metrics = jax.grad(loss_fn, has_aux=True)(
+                params, micro_batch, key, batch_mask
+            )
+            grad = jax.tree_util.tree_map(
+                lambda g, g_micro_batch: g + weight * g_micro_batch,
+                grad,
+                micro_batch_grad,
+            )
+            return grad, jax.tree_util.tree_map(lambda x: weight * x, metrics)
+
+        grad, metrics = jax.lax.scan(
+            accumulate,
+            jax.tree_util.tree_map(jnp.zeros_like, params),
+            (
+                micro_batches,
+                batch_masks,
+                weights,
+                jax.random.split(key, num_micro_batches),
+            ),
+        )
+        return grad, jax.tree_util.tree_map(lambda x: jnp.sum(x, axis=0), metrics)
+
+    def apply_gradients(
+        self, params_state: ParamsState, grad: chex.ArrayTree
+    ) -> ParamsState:
+        with jax.named_scope("optimizer_update"):
+            updates, opt_state = self.optimizer.update(grad, params_state.opt_state)
+            params = optax.apply_updates(params_state.params, updates)
+        return ParamsState(
+            params=params,
+            opt_state=opt_state,
+            update_count=params_state.update_count + 1,
+            hyperparams=params_state.hyperparams,
+        )
+
+    def with_static_observation(self, data: Transition) -> Transition:
+        """Regenerates the static fields of the observations of transitions collected with
+        `rollout(..., split_static_observation=True)` (shape (T, B, ...)), with one reset per
+        step. No-op for other transitions.
+        """
+        if data.episode_key is None:
+            return data
+        static_observation = self._static_observation(data.episode_key)
+        # The next observation of step t is the observation of step t+1, so only the static
+        # fields of the last next observation need to be regenerated.
+        last_static_observation = self._static_observation(data.next_episode_key[-1])
+        next_static_observation = jax.tree_util.tree_map(
+            lambda x, x_last: jnp.concatenate([x[1:], x_last[None]]),
+            static_observation,
+            last_static_observation,
+        )
+        return data._replace(
+            observation=self.env.merge_observation(
+                static_observation, data.observation
+            ),
+            next_observation=self.env.merge_observation(
+                next_static_observation, data.next_observation
+            ),
+            episode_key=None,
+            next_episode_key=None,
+        )
+
+    def _static_observation(self, episode_key: chex.PRNGKey) -> Dict:
+        batch_shape = episode_key.shape[:-1]
+        static_observation = jax.vmap(self.env.static_observation)(
+            episode_key.reshape(-1, episode_key.shape[-1])
+        )
+        return jax.tree_util.tree_map(
+            lambda x: x.reshape(*batch_shape, *x.shape[1:]), static_observation
+        )
+
+    def recompute_policy_outputs(
+        self, policy_params: hk.Params, data: Transition
+    ) -> Transition:
+        """Recomputes the logits and log-probabilities of the actions of `data` (shape (T, B, ...))
+        with `policy_params`.
+        """
+        parametric_action_distribution = (
+            self.actor_critic_networks.parametric_action_distribution
+        )
+        policy_apply = self.maybe_remat(self.actor_critic_networks.policy_network.apply)
+        logits = jax.vmap(policy_apply, (None, 0))(policy_params, data.observation)
+        log_prob = parametric_action_distribution.log_prob(
+            logits, parametric_action_distribution.inverse_postprocess(data.action)
+        )
+        return data._replace(logits=logits, log_prob=log_prob)
+
     def a2c_loss(
         self,
         params: ActorCriticParams,
-        acting_state: ActingState,
-    ) -> Tuple[float, Tuple[ActingState, Dict]]:
+        data: Transition,
+        key: chex.PRNGKey,
+        l_en: Optional[chex.Numeric] = None,
+        batch_mask: Optional[chex.Array] = None,
+    ) -> Tuple[float, Dict]:
+        """A2C loss of transitions of shape (T, B, ...), the policy gradient flows through
+        `data.log_prob` and `data.logits`. The padding environments are masked out with
+        `batch_mask` of shape (B,), which defaults to the agent's one.
+        """
+        if batch_mask is None:
+            batch_mask = self.batch_mask
+        batch_mean = functools.partial(
+            sharding.masked_mean, mask=batch_mask, batch_axis=1
+        )
         parametric_action_distribution = (
             self.actor_critic_networks.parametric_action_distribution
         )
-        value_apply = self.actor_critic_networks.value_network.apply
+        value_apply = self.maybe_remat(self.actor_critic_networks.value_network.apply)
 
-        acting_state, data = self.rollout(
-            policy_params=params.actor,
-            acting_state=acting_state,
-        )  # data.shape == (T, B, ...)
         last_observation = jax.tree_util.tree_map(
             lambda x: x[-1], data.next_observation
         )
@@ -127,43 +318,45 @@ class A2CAgent(Agent):
             last_observation,
         )
 
-        value = jax.vmap(value_apply, in_axes=(None, 0))(params.critic, observation)
-        discounts = jnp.asarray(self.discount_factor * data.discount, float)
-        value_tm1 = value[:-1]
-        value_t = value[1:]
-        advantage = jax.vmap(
-            functools.partial(
-                rlax.td_lambda,
-                lambda_=self.bootstrapping_factor,
-                stop_target_gradients=True,
-            ),
-            in_axes=1,
-            out_axes=1,
-        )(
-            value_tm1,
-            data.reward,
-            discounts,
-            value_t,
-        )
+        with jax.named_scope("critic"):
+            value = jax.vmap(value_apply, in_axes=(None, 0))(params.critic, observation)
+        with jax.named_scope("advantage"):
+            discounts = jnp.asarray(self.discount_factor * data.discount, float)
+            value_tm1 = value[:-1]
+            value_t = value[1:]
+            advantage = jax.vmap(
+                functools.partial(
+                    rlax.td_lambda,
+                    lambda_=self.bootstrapping_factor,
+                    stop_target_gradients=True,
+                ),
+                in_axes=1,
+                out_axes=1,
+            )(
+                value_tm1,
+                data.reward,
+                discounts,
+                value_t,
+            )
 
         # Compute the critic loss before potentially normalizing the advantages.
-        critic_loss = jnp.mean(advantage**2)
+        critic_loss = batch_mean(advantage**2)
 
         # Compute the policy loss with optional advantage normalization.
         metrics: Dict = {}
         if self.normalize_advantage:
-            metrics.update(unnormalized_advantage=jnp.mean(advantage))
-            advantage = jax.nn.standardize(advantage)
-        policy_loss = -jnp.mean(jax.lax.stop_gradient(advantage) * data.log_prob)
+            metrics.update(unnormalized_advantage=batch_mean(advantage))
+            advantage = jax.nn.standardize(advantage, where=batch_mask)
+        policy_loss = -batch_mean(jax.lax.stop_gradient(advantage) * data.log_prob)
 
         # Compute the entropy loss, i.e. negative of the entropy.
-        entropy = jnp.mean(
-            parametric_action_distribution.entropy(data.logits, acting_state.key)
-        )
+        entropy = batch_mean(parametric_action_distribution.entropy(data.logits, key))
         entropy_loss = -entropy
 
+        if l_en is None:
+            l_en = self.l_en
         total_loss = (
-            self.l_pg * policy_loss + self.l_td * critic_loss + self.l_en * entropy_loss
+            self.l_pg * policy_loss + self.l_td * critic_loss + l_en * entropy_loss
         )
         metrics.update(
             total_loss=total_loss,
@@ -171,12 +364,16 @@ class A2CAgent(Agent):
             critic_loss=critic_loss,
             entropy_loss=entropy_loss,
             entropy=entropy,
-            advantage=jnp.mean(advantage),
-            value=jnp.mean(value),
+            advantage=batch_mean(advantage),
+            value=batch_mean(value),
         )
-        if data.extras:
-            metrics.update(data.extras)
-        return total_loss, (acting_state, metrics)
+        return total_loss, metrics
+
+    def maybe_remat(self, fn: Callable) -> Callable:
+        """Wraps a network's apply function with `jax.checkpoint` if `remat` is True, so that its
+        activations are recomputed in the backward pass instead of being stored.
+        """
+        return jax.checkpoint(fn) if self.remat else fn
 
     def make_policy(
         self,
@@ -217,29 +414,43 @@ class A2CAgent(Agent):
         self,
         policy_params: hk.Params,
         acting_state: ActingState,
+        split_static_observation: bool = False,
     ) -> Tuple[ActingState, Transition]:
         """Rollout for training purposes.
+
+        With `split_static_observation` and a `StaticObservationWrapper`, only the dynamic part
+        of the observations and the episode keys are stored, e.g. for trajectories that leave the
+        program, see `with_static_observation`. Otherwise, the observations are stored whole:
+        regenerating their static fields within the program of the update would not lower its
+        peak memory but cost a reset per step.
+
+        If the agent has a `recorder`, the transitions of the non-padding environments are sent
+        to it with a host callback, rather than returned, so that a jitted loop over several
+        rollouts does not keep all of them on device.
+
         Returns:
-            shape (n_steps, batch_size_per_device, *)
+            shape (n_steps, batch_size, *)
         """
         policy = self.make_policy(policy_params=policy_params, stochastic=True)
 
         def run_one_step(
             acting_state: ActingState, key: chex.PRNGKey
         ) -> Tuple[ActingState, Transition]:
-            timestep = acting_state.timestep
-            action, (log_prob, logits) = policy(timestep.observation, key)
-            next_env_state, next_timestep = self.env.step(acting_state.state, action)
-
-            acting_state = ActingState(
-                state=next_env_state,
-                timestep=next_timestep,
-                key=key,
-                episode_count=acting_state.episode_count
-                + jax.lax.psum(next_timestep.last().sum(), "devices"),
-                env_step_count=acting_state.env_step_count
-                + jax.lax.psum(self.batch_size_per_device, "devices"),
-            )
+            env_state, timestep = acting_state.state, acting_state.timestep
+            with jax.named_scope("policy"):
+                action, (log_prob, _) = policy(timestep.observation, key)
+            with jax.named_scope("env_step"):
+                next_env_state, next_timestep = self.env.step(env_state, action)
+
+            with jax.named_scope("psum_counts"):
+                acting_state = ActingState(
+                    state=next_env_state,
+                    timestep=next_timestep,
+                    key=key,
+                    episode_count=acting_state.episode_count
+                    + self.count_episodes(next_timestep.last()),
+                    env_step_count=acting_state.env_step_count + self.total_batch_size,
+                )
 
             transition = Transition(
                 observation=timestep.observation,
@@ -247,10 +458,24 @@ class A2CAgent(Agent):
                 reward=next_timestep.reward,
                 discount=next_timestep.discount,
                 next_observation=next_timestep.observation,
-                log_prob=log_prob,
-                logits=logits,
                 extras=next_timestep.extras,
             )
+            if self.store_log_prob:
+                transition = transition._replace(log_prob=log_prob)
+            if split_static_observation and isinstance(
+                next_env_state, StaticObservationState
+            ):
+                # Only store the dynamic part of the observations and the episode keys.
+                _, observation = self.env.split_observation(timestep.observation)
+                _, next_observation = self.env.split_observation(
+                    next_timestep.observation
+                )
+                transition = transition._replace(
+                    observation=observation,
+                    next_observation=next_observation,
+                    episode_key=env_state.episode_key,
+                    next_episode_key=next_env_state.episode_key,
+                )
 
             return acting_state, transition
 
@@ -258,4 +483,11 @@ class A2CAgent(Agent):
             (self.n_steps, -1)
         )
         acting_state, data = jax.lax.scan(run_one_step, acting_state, acting_keys)
+        if self.recorder is not None:
+            # Padding environments are at the end of the batch, see `sharding.make_batch_mask`.
+            num_environments = int(self.batch_mask.sum())
+            jax.debug.callback(
+                self.recorder.record,
+                jax.tree_util.tree_map(lambda x: x[:, :num_environments], data),
+            )
         return acting_state, data
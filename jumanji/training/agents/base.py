@@ -18,21 +18,90 @@ from typing import Callable, Dict, Optional, Tuple
 import chex
 import haiku as hk
 import jax
+import jax.numpy as jnp
+from jax.sharding import Mesh
 
+from jumanji.training import sharding
 from jumanji.training.types import ParamsState, TrainingState
+from jumanji.training.utils import EPISODE_STATISTICS
 
 
 class Agent(abc.ABC):
     """Anakin agent."""
 
-    def __init__(self, total_batch_size: int):
+    def __init__(self, total_batch_size: int, mesh: Optional[Mesh] = None):
+        """
+        Args:
+            total_batch_size: number of environments to act on in parallel.
+            mesh: if None, the agent is meant to be pmapped over the local devices with axis name
+                "devices" and sees batches of `batch_size_per_device` environments. Otherwise, it
+                is meant to be jitted with its batch sharded over `mesh` and sees the whole batch,
+                padded to a multiple of the number of devices (see `jumanji.training.sharding`).
+        """
         self.total_batch_size = total_batch_size
-        num_devices = jax.local_device_count()
-        assert total_batch_size % num_devices == 0, (
-            "The total batch size must be a multiple of the number of devices, "
-            f"got total_batch_size={total_batch_size} and num_devices={num_devices}."
-        )
-        self.batch_size_per_device = total_batch_size // num_devices
+        self.mesh = mesh
+        if mesh is None:
+            num_devices = jax.local_device_count()
+            assert total_batch_size % num_devices == 0, (
+                "The total batch size must be a multiple of the number of devices, "
+                f"got total_batch_size={total_batch_size} and num_devices={num_devices}."
+            )
+            self.axis_name: Optional[str] = sharding.AXIS_NAME
+            self.batch_size_per_device = total_batch_size // num_devices
+            self.batch_mask = sharding.make_batch_mask(self.batch_size_per_device, 1)
+        else:
+            self.axis_name = None
+            self.batch_mask = sharding.make_batch_mask(total_batch_size, mesh.size)
+            self.batch_size_per_device = len(self.batch_mask) // mesh.size
+        # Number of environments in the batch seen by `run_epoch`, padding included.
+        self.batch_size = len(self.batch_mask)
+
+    def pmean(self, x: chex.ArrayTree) -> chex.ArrayTree:
+        """Averages over the devices when pmapped, a no-op when jitted over a mesh."""
+        if self.axis_name is None:
+            return x
+        return jax.lax.pmean(x, self.axis_name)
+
+    def batch_mean(self, x: chex.Array) -> chex.Array:
+        """Mean of an array of shape (T, B, ...), ignoring the padding environments."""
+        return sharding.masked_mean(x, self.batch_mask, batch_axis=1)
+
+    def count_episodes(self, done: chex.Array) -> chex.Array:
+        """Number of episodes ended in a batch of shape (B,), summed over all the devices."""
+        num_episodes = jnp.sum(done & self.batch_mask)
+        if self.axis_name is None:
+            return num_episodes
+        return jax.lax.psum(num_episodes, self.axis_name)
+
+    def extras_metrics(self, extras: Dict) -> Dict:
+        """Averages the extras of a rollout of shape (T, B, ...). The episode statistics added by
+        `EpisodeStatisticsWrapper` are averaged over the episodes completed during the rollout,
+        summed over all the devices, and are NaN if no episode was completed. Their number is
+        returned as `num_episodes` so that they can be weighted when averaged over several
+        rollouts, see `jumanji.training.utils.mean_epoch_metrics`.
+        """
+        extras = dict(extras)
+        done = extras.pop("episode_done", None)
+        episode_statistics = {}
+        if done is not None:
+            done = done & self.batch_mask
+            num_episodes = jnp.sum(done)
+            episode_statistics = {
+                name: jnp.sum(jnp.where(done, extras.pop(name), 0))
+                for name in EPISODE_STATISTICS
+            }
+            if self.axis_name is not None:
+                episode_statistics, num_episodes = jax.lax.psum(
+                    (episode_statistics, num_episodes), self.axis_name
+                )
+            episode_statistics = jax.tree_util.tree_map(
+                lambda x: jnp.where(num_episodes > 0, x / num_episodes, jnp.nan),
+                episode_statistics,
+            )
+            episode_statistics["num_episodes"] = num_episodes.astype(float)
+        metrics = jax.tree_util.tree_map(self.batch_mean, extras)
+        metrics.update(episode_statistics)
+        return metrics
 
     @abc.abstractmethod
     def init_params(self, key: chex.PRNGKey) -> Optional[ParamsState]:
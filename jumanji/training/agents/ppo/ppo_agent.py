@@ -0,0 +1,267 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import functools
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import chex
+import jax
+import jax.numpy as jnp
+import optax
+import rlax
+from jax.sharding import Mesh
+
+from jumanji.env import Environment
+from jumanji.training.agents.a2c import A2CAgent
+from jumanji.training.networks.actor_critic import ActorCriticNetworks
+from jumanji.training.recorder import TrajectoryRecorder
+from jumanji.training.types import (
+    ActorCriticParams,
+    ParamsState,
+    TrainingState,
+    Transition,
+)
+
+
+class Batch(NamedTuple):
+    """Rollout data flattened over time and batch, shape (n_steps * batch_size, ...)."""
+
+    observation: chex.ArrayTree
+    raw_action: chex.Array
+    log_prob: chex.Array
+    advantage: chex.Array
+    target_value: chex.Array
+    mask: chex.Array
+
+
+class PPOAgent(A2CAgent):
+    """Proximal Policy Optimization agent [Schulman et al., 2017]. Each rollout is reused for
+    `num_update_epochs` passes of shuffled minibatch updates with a clipped surrogate objective.
+    The rollout, the policy and the parameters are the same as for the A2C agent.
+    """
+
+    # The clipped surrogate objective needs the log-probabilities of the behaviour policy.
+    store_log_prob = True
+
+    def __init__(
+        self,
+        env: Environment,
+        n_steps: int,
+        total_batch_size: int,
+        actor_critic_networks: ActorCriticNetworks,
+        optimizer: optax.GradientTransformation,
+        normalize_advantage: bool,
+        discount_factor: float,
+        bootstrapping_factor: float,
+        l_pg: float,
+        l_td: float,
+        l_en: float,
+        clip_epsilon: float,
+        num_update_epochs: int,
+        num_minibatches: int,
+        mesh: Optional[Mesh] = None,
+        remat: bool = False,
+        recorder: Optional[TrajectoryRecorder] = None,
+    ) -> None:
+        super().__init__(
+            env=env,
+            n_steps=n_steps,
+            total_batch_size=total_batch_size,
+            actor_critic_networks=actor_critic_networks,
+            optimizer=optimizer,
+            normalize_advantage=normalize_advantage,
+            discount_factor=discount_factor,
+            bootstrapping_factor=bootstrapping_factor,
+            l_pg=l_pg,
+            l_td=l_td,
+            l_en=l_en,
+            mesh=mesh,
+            remat=remat,
+            recorder=recorder,
+        )
+        self.clip_epsilon = clip_epsilon
+        self.num_update_epochs = num_update_epochs
+        self.num_minibatches = num_minibatches
+        num_samples = n_steps * self.batch_size
+        if num_samples % num_minibatches != 0:
+            raise ValueError(
+                "Expected the number of samples per rollout (n_steps * batch_size) to be a "
+                f"multiple of num_minibatches, got {num_samples} and {num_minibatches}."
+            )
+
+    def run_epoch(self, training_state: TrainingState) -> Tuple[TrainingState, Dict]:
+        params_state = training_state.params_state
+        if not isinstance(params_state, ParamsState):
+            raise TypeError(
+                "Expected params_state to be of type ParamsState, got "
+                f"type {type(params_state)}."
+            )
+        hyperparams = params_state.hyperparams or {}
+        l_en = hyperparams.get("l_en", self.l_en)
+        acting_key, update_key = jax.random.split(training_state.acting_state.key)
+
+        with jax.named_scope("rollout"):
+            acting_state, data = self.rollout(
+                policy_params=params_state.params.actor,
+                acting_state=training_state.acting_state._replace(key=acting_key),
+            )  # data.shape == (T, B, ...)
+        with jax.named_scope("advantage"):
+            batch = self.make_batch(params_state.params.critic, data)
+
+        num_samples = batch.mask.shape[0]
+
+        def update_epoch(
+            params_state: ParamsState, key: chex.PRNGKey
+        ) -> Tuple[ParamsState, Dict]:
+            permutation_key, entropy_key = jax.random.split(key)
+            permutation = jax.random.permutation(permutation_key, num_samples)
+            minibatches = jax.tree_util.tree_map(
+                lambda x: x[permutation].reshape(
+                    self.num_minibatches, -1, *x.shape[1:]
+                ),
+                batch,
+            )
+            return jax.lax.scan(
+                functools.partial(
+                    self.update_minibatch, l_en=l_en, entropy_key=entropy_key
+                ),
+                params_state,
+                minibatches,
+            )
+
+        params_state, metrics = jax.lax.scan(
+            update_epoch,
+            params_state,
+            jax.random.split(update_key, self.num_update_epochs),
+        )
+        metrics = jax.tree_util.tree_map(jnp.mean, metrics)
+        if data.extras:
+            metrics.update(self.extras_metrics(data.extras))
+        training_state = TrainingState(
+            params_state=params_state,
+            acting_state=acting_state,
+        )
+        return training_state, metrics
+
+    def make_batch(self, critic_params: chex.ArrayTree, data: Transition) -> Batch:
+        """Computes the advantages and value targets of a rollout with the current critic and
+        flattens it over time and batch.
+        """
+        parametric_action_distribution = (
+            self.actor_critic_networks.parametric_action_distribution
+        )
+        value_apply = self.actor_critic_networks.value_network.apply
+        last_observation = jax.tree_util.tree_map(
+            lambda x: x[-1], data.next_observation
+        )
+        observation = jax.tree_util.tree_map(
+            lambda obs_0_tm1, obs_t: jnp.concatenate([obs_0_tm1, obs_t[None]], axis=0),
+            data.observation,
+            last_observation,
+        )
+        value = jax.vmap(value_apply, in_axes=(None, 0))(critic_params, observation)
+        discounts = jnp.asarray(self.discount_factor * data.discount, float)
+        value_tm1 = value[:-1]
+        advantage = jax.vmap(
+            functools.partial(
+                rlax.td_lambda,
+                lambda_=self.bootstrapping_factor,
+                stop_target_gradients=True,
+            ),
+            in_axes=1,
+            out_axes=1,
+        )(value_tm1, data.reward, discounts, value[1:])
+        mask = jnp.broadcast_to(self.batch_mask, advantage.shape)
+        batch = Batch(
+            observation=data.observation,
+            raw_action=parametric_action_distribution.inverse_postprocess(data.action),
+            log_prob=data.log_prob,
+            advantage=advantage,
+            target_value=value_tm1 + advantage,
+            mask=mask,
+        )
+        return jax.tree_util.tree_map(
+            lambda x: x.reshape(-1, *x.shape[2:]), jax.lax.stop_gradient(batch)
+        )
+
+    def update_minibatch(
+        self,
+        params_state: ParamsState,
+        minibatch: Batch,
+        l_en: chex.Numeric,
+        entropy_key: chex.PRNGKey,
+    ) -> Tuple[ParamsState, Dict]:
+        with jax.named_scope("ppo_grad"):
+            grad, metrics = jax.grad(self.ppo_loss, has_aux=True)(
+                params_state.params, minibatch, l_en, entropy_key
+            )
+        with jax.named_scope("pmean"):
+            grad, metrics = self.pmean((grad, metrics))
+        return self.apply_gradients(params_state, grad), metrics
+
+    def ppo_loss(
+        self,
+        params: ActorCriticParams,
+        minibatch: Batch,
+        l_en: chex.Numeric,
+        entropy_key: chex.PRNGKey,
+    ) -> Tuple[float, Dict]:
+        parametric_action_distribution = (
+            self.actor_critic_networks.parametric_action_distribution
+        )
+        policy_apply = self.maybe_remat(self.actor_critic_networks.policy_network.apply)
+        value_apply = self.maybe_remat(self.actor_critic_networks.value_network.apply)
+
+        def masked_mean(x: chex.Array) -> chex.Array:
+            return jnp.sum(x * minibatch.mask) / jnp.maximum(jnp.sum(minibatch.mask), 1)
+
+        logits = policy_apply(params.actor, minibatch.observation)
+        log_prob = parametric_action_distribution.log_prob(logits, minibatch.raw_action)
+        value = value_apply(params.critic, minibatch.observation)
+
+        advantage = minibatch.advantage
+        metrics: Dict = {}
+        if self.normalize_advantage:
+            metrics.update(unnormalized_advantage=masked_mean(advantage))
+            advantage = jax.nn.standardize(advantage, where=minibatch.mask)
+
+        # Clipped surrogate objective.
+        ratio = jnp.exp(log_prob - minibatch.log_prob)
+        clipped_ratio = jnp.clip(ratio, 1 - self.clip_epsilon, 1 + self.clip_epsilon)
+        policy_loss = -masked_mean(
+            jnp.minimum(ratio * advantage, clipped_ratio * advantage)
+        )
+        critic_loss = masked_mean((value - minibatch.target_value) ** 2)
+        entropy = masked_mean(
+            parametric_action_distribution.entropy(logits, entropy_key)
+        )
+        entropy_loss = -entropy
+
+        total_loss = (
+            self.l_pg * policy_loss + self.l_td * critic_loss + l_en * entropy_loss
+        )
+        metrics.update(
+            total_loss=total_loss,
+            policy_loss=policy_loss,
+            critic_loss=critic_loss,
+            entropy_loss=entropy_loss,
+            entropy=entropy,
+            advantage=masked_mean(advantage),
+            value=masked_mean(value),
+            approx_kl=masked_mean(minibatch.log_prob - log_prob),
+            clip_fraction=masked_mean(
+                (jnp.abs(ratio - 1) > self.clip_epsilon).astype(float)
+            ),
+        )
+        return total_loss, metrics
@@ -16,6 +16,7 @@ from typing import Any, Callable, Dict, Optional, Tuple
 
 import chex
 import jax
+from jax.sharding import Mesh
 
 from jumanji.env import Environment
 from jumanji.training.agents.base import Agent
@@ -30,8 +31,9 @@ class RandomAgent(Agent):
         n_steps: int,
         total_batch_size: int,
         random_policy: RandomPolicy,
+        mesh: Optional[Mesh] = None,
     ) -> None:
-        super().__init__(total_batch_size=total_batch_size)
+        super().__init__(total_batch_size=total_batch_size, mesh=mesh)
         self.env = env
         self.observation_spec = env.observation_spec()
         self.n_steps = n_steps
@@ -51,7 +53,7 @@ class RandomAgent(Agent):
         )
         metrics = {}
         if extras:
-            metrics.update(extras)
+            metrics.update(self.extras_metrics(extras))
         return training_state, metrics
 
     def make_policy(
@@ -68,7 +70,7 @@ class RandomAgent(Agent):
     ) -> Tuple[ActingState, Optional[Dict]]:
         """Rollout for training purposes.
         Returns:
-            shape (n_steps, batch_size_per_device, *)
+            shape (n_steps, batch_size, *)
         """
         random_policy = self.make_policy()
 
@@ -82,9 +84,8 @@ class RandomAgent(Agent):
                 timestep=next_timestep,
                 key=key,
                 episode_count=acting_state.episode_count
-                + jax.lax.psum(next_timestep.last().sum(), "devices"),
-                env_step_count=acting_state.env_step_count
-                + jax.lax.psum(self.batch_size_per_device, "devices"),
+                + self.count_episodes(next_timestep.last()),
+                env_step_count=acting_state.env_step_count + self.total_batch_size,
             )
             extras = next_timestep.extras
             return acting_state, extras
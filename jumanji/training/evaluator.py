@@ -13,56 +13,127 @@
 # limitations under the License.
 
 import functools
-from typing import Any, Dict, Optional, Tuple
+import queue
+import threading
+import time
+from types import TracebackType
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Optional, Tuple, Type
 
 import chex
 import haiku as hk
 import jax
 from jax import numpy as jnp
+from jax.sharding import Mesh
 
 from jumanji.env import Environment
+from jumanji.training import sharding
 from jumanji.training.agents.a2c import A2CAgent
 from jumanji.training.agents.base import Agent
 from jumanji.training.agents.random import RandomAgent
-from jumanji.training.types import ActingState, ParamsState
+from jumanji.training.recorder import TrajectoryRecorder
+from jumanji.training.types import ActingState, ParamsState, Transition
+
+# Time in seconds after which the evaluation thread checks whether to stop.
+_POLL_INTERVAL = 0.1
+
+# Whether each evaluated policy samples its actions (stochastic) or takes the greedy ones.
+EVALUATION_MODES = {"stochastic": True, "greedy": False}
 
 
 class Evaluator:
-    """Class to run evaluations."""
+    """Class to run evaluations. All the evaluated policies (stochastic and/or greedy) run in a
+    single compiled program on a shared batch of reset states: each policy is evaluated on the
+    first `total_batch_sizes[mode]` episodes of the batch.
+    """
 
     def __init__(
         self,
         eval_env: Environment,
         agent: Agent,
-        total_batch_size: int,
-        stochastic: bool,
+        total_batch_sizes: Mapping[str, int],
+        mesh: Optional[Mesh] = None,
+        population: bool = False,
+        recorders: Optional[Mapping[str, TrajectoryRecorder]] = None,
     ):
+        """
+        Args:
+            eval_env: environment to evaluate the agent on.
+            agent: agent whose policy is evaluated.
+            total_batch_sizes: number of episodes per evaluation of each policy, keyed by
+                evaluation mode, i.e. "stochastic" (sampled actions) and/or "greedy".
+            mesh: if None, the evaluation is pmapped over the local devices. Otherwise, it is
+                jitted with the episodes sharded over `mesh`, padding the batch to a multiple
+                of the number of devices.
+            population: whether the params have a population axis (after the device axis when
+                pmapped), in which case each member is evaluated on the same episodes and the
+                metrics have shape (population_size,).
+            recorders: recorders to write the transitions of the evaluated episodes to, keyed by
+                evaluation mode, e.g. to build offline datasets. Each one must record samples
+                with a single batch dimension and be started and stopped by the caller.
+        """
+        unknown_modes = set(total_batch_sizes) - set(EVALUATION_MODES)
+        if not total_batch_sizes or unknown_modes:
+            raise ValueError(
+                f"Expected evaluation modes among {list(EVALUATION_MODES)}, got "
+                f"{list(total_batch_sizes)}."
+            )
         self.eval_env = eval_env
         self.agent = agent
-        num_devices = jax.local_device_count()
-        self.num_devices = num_devices
-        if total_batch_size % num_devices != 0:
-            raise ValueError(
-                "Expected eval total_batch_size to be a multiple of num_devices, "
-                f"got {total_batch_size} and {num_devices}."
+        self.mesh = mesh
+        self.total_batch_sizes = dict(total_batch_sizes)
+        self.recorders = dict(recorders or {})
+        if mesh is None:
+            num_devices = jax.local_device_count()
+            for mode, total_batch_size in self.total_batch_sizes.items():
+                if total_batch_size % num_devices != 0:
+                    raise ValueError(
+                        f"Expected {mode} eval total_batch_size to be a multiple of "
+                        f"num_devices, got {total_batch_size} and {num_devices}."
+                    )
+            self.batch_masks = {
+                mode: sharding.make_batch_mask(total_batch_size // num_devices, 1)
+                for mode, total_batch_size in self.total_batch_sizes.items()
+            }
+            self.generate_evaluations = jax.pmap(
+                self._maybe_vmap_population(self._generate_evaluations, population),
+                axis_name=sharding.AXIS_NAME,
             )
-        self.total_batch_size = total_batch_size
-        self.batch_size_per_device = total_batch_size // num_devices
-        self.generate_evaluations = jax.pmap(
-            functools.partial(
-                self._generate_evaluations, eval_batch_size=self.batch_size_per_device
-            ),
-            axis_name="devices",
-        )
-        self.stochastic = stochastic
+        else:
+            num_devices = mesh.size
+            self.batch_masks = {
+                mode: sharding.make_batch_mask(total_batch_size, num_devices)
+                for mode, total_batch_size in self.total_batch_sizes.items()
+            }
+            self.generate_evaluations = jax.jit(
+                self._maybe_vmap_population(self._generate_evaluations, population),
+                out_shardings=sharding.replicated_sharding(mesh),
+            )
+        self.num_devices = num_devices
+        # Size of the shared batch of reset states, per device when pmapped.
+        self.eval_batch_size = max(len(mask) for mask in self.batch_masks.values())
 
-    def _eval_one_episode(
+    @staticmethod
+    def _maybe_vmap_population(
+        generate_evaluations: Callable, population: bool
+    ) -> Callable:
+        if population:
+            return jax.vmap(generate_evaluations, in_axes=(0, None))
+        return generate_evaluations
+
+    def _eval_episodes(
         self,
         policy_params: Optional[hk.Params],
-        key: chex.PRNGKey,
+        acting_state: ActingState,
+        stochastic: bool,
+        batch_mask: chex.Array,
+        recorder: Optional[TrajectoryRecorder] = None,
     ) -> Dict:
+        """Runs a batch of episodes until they are all over, the episodes that are over being
+        left unchanged. If a `recorder` is given, the transitions of the episodes that are not
+        over and not padding are sent to it at each step, with a host callback.
+        """
         policy = self.agent.make_policy(
-            policy_params=policy_params, stochastic=self.stochastic
+            policy_params=policy_params, stochastic=stochastic
         )
         if isinstance(self.agent, A2CAgent):
 
@@ -73,22 +144,17 @@ class Evaluator:
         else:
             acting_policy = policy
 
-        def cond_fun(carry: Tuple[ActingState, float]) -> jnp.bool_:
-            acting_state, _ = carry
-            return ~acting_state.timestep.last()
-
-        def body_fun(
-            carry: Tuple[ActingState, float],
-        ) -> Tuple[ActingState, float]:
-            acting_state, return_ = carry
+        def step(
+            acting_state: ActingState, return_: float
+        ) -> Tuple[ActingState, float, chex.Array]:
             key, action_key = jax.random.split(acting_state.key)
             observation = jax.tree_util.tree_map(
                 lambda x: x[None], acting_state.timestep.observation
             )
-            action = acting_policy(observation, action_key)
-            state, timestep = self.eval_env.step(
-                acting_state.state, jnp.squeeze(action)
-            )
+            with jax.named_scope("policy"):
+                action = jnp.squeeze(acting_policy(observation, action_key))
+            with jax.named_scope("env_step"):
+                state, timestep = self.eval_env.step(acting_state.state, action)
             return_ += timestep.reward
             acting_state = ActingState(
                 state=state,
@@ -97,18 +163,45 @@ class Evaluator:
                 episode_count=jnp.array(0, jnp.int32),
                 env_step_count=acting_state.env_step_count + 1,
             )
-            return acting_state, return_
-
-        reset_key, init_key = jax.random.split(key)
-        state, timestep = self.eval_env.reset(reset_key)
-        acting_state = ActingState(
-            state=state,
-            timestep=timestep,
-            key=init_key,
-            episode_count=jnp.array(0, jnp.int32),
-            env_step_count=jnp.array(0, jnp.int32),
-        )
-        return_ = jnp.array(0, float)
+            return acting_state, return_, action
+
+        def cond_fun(carry: Tuple[ActingState, chex.Array]) -> jnp.bool_:
+            acting_state, _ = carry
+            return jnp.any(~acting_state.timestep.last())
+
+        def body_fun(
+            carry: Tuple[ActingState, chex.Array],
+        ) -> Tuple[ActingState, chex.Array]:
+            acting_state, return_ = carry
+            running = ~acting_state.timestep.last()
+            next_acting_state, next_return, action = jax.vmap(step)(
+                acting_state, return_
+            )
+            if recorder is not None:
+                transition = Transition(
+                    observation=acting_state.timestep.observation,
+                    action=action,
+                    reward=next_acting_state.timestep.reward,
+                    discount=next_acting_state.timestep.discount,
+                    next_observation=next_acting_state.timestep.observation,
+                    extras=next_acting_state.timestep.extras,
+                )
+                # A debug callback, since IO callbacks are not supported in a vmapped while
+                # loop, e.g. when evaluating a population.
+                jax.debug.callback(
+                    functools.partial(_record_valid, recorder),
+                    transition,
+                    running & batch_mask,
+                )
+            return jax.tree_util.tree_map(
+                lambda x, y: jnp.where(
+                    running.reshape(-1, *(1,) * (jnp.ndim(x) - 1)), x, y
+                ),
+                (next_acting_state, next_return),
+                (acting_state, return_),
+            )
+
+        return_ = jnp.zeros(len(batch_mask), float)
         final_acting_state, return_ = jax.lax.while_loop(
             cond_fun,
             body_fun,
@@ -127,33 +220,176 @@ class Evaluator:
         self,
         params_state: ParamsState,
         key: chex.PRNGKey,
-        eval_batch_size: int,
-    ) -> Dict:
+    ) -> Dict[str, Dict]:
         if isinstance(self.agent, A2CAgent):
             policy_params = params_state.params.actor
         elif isinstance(self.agent, RandomAgent):
             policy_params = None
         else:
             raise ValueError
-        keys = jax.random.split(key, eval_batch_size)
-        eval_metrics = jax.vmap(self._eval_one_episode, in_axes=(None, 0))(
-            policy_params,
-            keys,
-        )
-        eval_metrics: Dict = jax.lax.pmean(
-            jax.tree_util.tree_map(jnp.mean, eval_metrics),
-            axis_name="devices",
-        )
+        reset_key, acting_key = jax.random.split(key)
+        reset_keys = jax.random.split(reset_key, self.eval_batch_size)
+        if self.mesh is not None:
+            reset_keys = jax.lax.with_sharding_constraint(
+                reset_keys, sharding.batch_sharding(self.mesh)
+            )
+        with jax.named_scope("env_reset"):
+            states, timesteps = jax.vmap(self.eval_env.reset)(reset_keys)
 
-        return eval_metrics
+        all_eval_metrics = {}
+        for i, (mode, batch_mask) in enumerate(self.batch_masks.items()):
+            eval_batch_size = len(batch_mask)
+            acting_state = ActingState(
+                state=jax.tree_util.tree_map(lambda x: x[:eval_batch_size], states),
+                timestep=jax.tree_util.tree_map(
+                    lambda x: x[:eval_batch_size], timesteps
+                ),
+                key=jax.random.split(
+                    jax.random.fold_in(acting_key, i), eval_batch_size
+                ),
+                episode_count=jnp.zeros(eval_batch_size, jnp.int32),
+                env_step_count=jnp.zeros(eval_batch_size, jnp.int32),
+            )
+            with jax.named_scope(f"eval_{mode}"):
+                eval_metrics = self._eval_episodes(
+                    policy_params,
+                    acting_state,
+                    stochastic=EVALUATION_MODES[mode],
+                    batch_mask=batch_mask,
+                    recorder=self.recorders.get(mode),
+                )
+            eval_metrics = jax.tree_util.tree_map(
+                lambda x: sharding.masked_mean(x, batch_mask), eval_metrics
+            )
+            if self.mesh is None:
+                eval_metrics = jax.lax.pmean(eval_metrics, axis_name=sharding.AXIS_NAME)
+            all_eval_metrics[mode] = eval_metrics
+
+        return all_eval_metrics
 
     def run_evaluation(
         self, params_state: Optional[ParamsState], eval_key: chex.PRNGKey
-    ) -> Dict:
-        """Run one batch of evaluations."""
-        eval_keys = jax.random.split(eval_key, self.num_devices)
-        eval_metrics: Dict = self.generate_evaluations(
-            params_state,
-            eval_keys,
+    ) -> Dict[str, Dict]:
+        """Run one batch of evaluations of every policy and wait for it to complete.
+
+        Returns:
+            metrics of each evaluation mode, e.g. {"stochastic": {...}, "greedy": {...}}. The
+                evaluations running in a single program, each mode's `time` is the time taken
+                by all of them.
+        """
+        if self.mesh is None:
+            eval_key = jax.random.split(eval_key, self.num_devices)
+        start_time = time.perf_counter()
+        eval_metrics: Dict[str, Dict] = jax.block_until_ready(
+            self.generate_evaluations(params_state, eval_key)
         )
+        elapsed_time = time.perf_counter() - start_time
+        for metrics in eval_metrics.values():
+            metrics.update(time=elapsed_time)
         return eval_metrics
+
+
+def _record_valid(
+    recorder: TrajectoryRecorder, data: chex.ArrayTree, valid: chex.ArrayNumpy
+) -> None:
+    """Records the samples of `data` (shape (B, ...)) for which `valid` is True, if any."""
+    if valid.any():
+        recorder.record(jax.tree_util.tree_map(lambda x: x[valid], data))
+
+
+class AsyncEvaluator:
+    """Runs the evaluations of an `Evaluator` in a background thread, so that training continues
+    while the parameters of a previous epoch are evaluated. Use it as a context manager to start
+    and stop the thread.
+
+    The submitted `params_state` is a snapshot: jax arrays are immutable and the training step
+    does not donate its inputs, so later updates do not affect evaluations in flight. At most
+    `max_pending` evaluations wait for the thread, `submit` blocks beyond that, i.e. training
+    only waits for evaluation when evaluating takes longer than training.
+    """
+
+    def __init__(self, evaluator: Evaluator, max_pending: int = 1):
+        self.evaluator = evaluator
+        self._requests: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._results: queue.Queue = queue.Queue()
+        self._num_pending = 0
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="evaluator", daemon=True)
+        self._error: Optional[BaseException] = None
+
+    def __enter__(self) -> "AsyncEvaluator":
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        self._stop_event.set()
+        self._thread.join()
+
+    def submit(
+        self,
+        tag: Hashable,
+        params_state: Optional[ParamsState],
+        eval_key: chex.PRNGKey,
+    ) -> None:
+        """Queues the evaluation of `params_state`, whose results are tagged with `tag`, e.g.
+        the epoch the parameters come from.
+        """
+        while True:
+            self._check_thread()
+            try:
+                self._requests.put(
+                    (tag, params_state, eval_key), timeout=_POLL_INTERVAL
+                )
+                break
+            except queue.Full:
+                continue
+        self._num_pending += 1
+
+    def results(self, wait: bool = False) -> List[Tuple[Hashable, Dict[str, Dict]]]:
+        """Returns the (tag, metrics) pairs of the evaluations completed since the last call,
+        in submission order.
+
+        Args:
+            wait: whether to wait for all submitted evaluations to complete.
+        """
+        results = []
+        while self._num_pending:
+            self._check_thread()
+            try:
+                results.append(
+                    self._results.get(
+                        block=wait, timeout=_POLL_INTERVAL if wait else None
+                    )
+                )
+            except queue.Empty:
+                if wait:
+                    continue
+                break
+            self._num_pending -= 1
+        return results
+
+    def _run(self) -> None:
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    tag, params_state, eval_key = self._requests.get(
+                        timeout=_POLL_INTERVAL
+                    )
+                except queue.Empty:
+                    continue
+                eval_metrics = self.evaluator.run_evaluation(params_state, eval_key)
+                self._results.put((tag, eval_metrics))
+        except BaseException as error:  # noqa: B902
+            self._error = error
+            self._stop_event.set()
+
+    def _check_thread(self) -> None:
+        if self._error is not None:
+            raise RuntimeError("The evaluation thread failed.") from self._error
+        if self._stop_event.is_set():
+            raise RuntimeError("The evaluation thread was stopped.")
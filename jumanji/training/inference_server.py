@@ -0,0 +1,349 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local inference service for trained policies. Concurrent requests are dynamically batched:
+the batching thread waits at most `max_latency_ms` after the first pending request, stacks up to
+`max_batch_size` observations, pads them to the next pre-compiled bucket size and runs a single
+greedy forward pass for the whole batch.
+"""
+
+import collections
+import dataclasses
+import json
+import logging
+import pickle
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import TracebackType
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple, Type
+
+import chex
+import haiku as hk
+import jax
+import numpy as np
+
+from jumanji.training.agents.a2c import A2CAgent
+from jumanji.training.types import TrainingState
+
+# Time in seconds after which the batching thread checks whether to stop.
+_POLL_INTERVAL = 0.1
+
+
+def load_policy_params(agent: A2CAgent, checkpoint_path: str) -> hk.Params:
+    """Loads the policy parameters of a training state pickled by the loggers. Checkpoints of
+    pmapped (or population) runs have leading device (and population) axes, the parameters of
+    the first device (and first member) are returned.
+    """
+    with open(checkpoint_path, "rb") as file_:
+        training_state = pickle.load(file_)
+    if not isinstance(training_state, TrainingState):
+        raise TypeError(
+            "Expected the checkpoint to contain a TrainingState, got "
+            f"type {type(training_state)}."
+        )
+    assert training_state.params_state is not None
+    reference = jax.eval_shape(agent.init_params, jax.random.PRNGKey(0))
+    return jax.tree_util.tree_map(
+        lambda x, ref: np.asarray(x).reshape(-1, *ref.shape)[0],
+        training_state.params_state.params.actor,
+        reference.params.actor,
+    )
+
+
+def default_bucket_sizes(max_batch_size: int) -> List[int]:
+    """Powers of 2 below `max_batch_size`, followed by `max_batch_size`."""
+    sizes = [1]
+    while sizes[-1] * 2 < max_batch_size:
+        sizes.append(sizes[-1] * 2)
+    if sizes[-1] != max_batch_size:
+        sizes.append(max_batch_size)
+    return sizes
+
+
+class _Request:
+    def __init__(self, observation: Any):
+        self.observation = observation
+        self.arrival_time = time.perf_counter()
+        self.future: Future = Future()
+
+
+class BatchedPolicyServer:
+    """Dynamically batches observations submitted from any thread and answers them with a greedy
+    policy. Use it as a context manager to start and stop the batching thread.
+
+    One program is compiled per bucket size at construction, so no compilation happens while
+    serving. Batches are padded with copies of their first observation up to the smallest bucket
+    that fits them.
+    """
+
+    def __init__(
+        self,
+        policy: Callable[[Any, chex.PRNGKey], Tuple[chex.Array, Any]],
+        observation_template: Any,
+        max_batch_size: int = 64,
+        max_latency_ms: float = 5.0,
+        bucket_sizes: Optional[Sequence[int]] = None,
+        latency_window: int = 10_000,
+    ):
+        """
+        Args:
+            policy: batched policy, e.g. `A2CAgent.make_policy(params, stochastic=False)`. Its
+                key is ignored by greedy policies.
+            observation_template: unbatched observation used to compile the forward pass and to
+                parse JSON observations, e.g. `env.observation_spec().generate_value()`.
+            max_batch_size: maximum number of observations per forward pass.
+            max_latency_ms: maximum time a request waits for other requests to batch with.
+            bucket_sizes: batch sizes to compile, defaults to powers of 2 up to max_batch_size.
+            latency_window: number of most recent requests the latency statistics are over.
+        """
+        self.observation_template = observation_template
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000
+        self.bucket_sizes = sorted(bucket_sizes or default_bucket_sizes(max_batch_size))
+        if self.bucket_sizes[-1] < max_batch_size:
+            raise ValueError(
+                f"Expected the largest bucket size to be at least max_batch_size "
+                f"({max_batch_size}), got {self.bucket_sizes[-1]}."
+            )
+
+        key = jax.random.PRNGKey(0)
+        forward = jax.jit(lambda observation: policy(observation, key)[0])
+        self._forward_fns = {
+            size: forward.lower(self._stack([observation_template] * size)).compile()
+            for size in self.bucket_sizes
+        }
+
+        self._requests: queue.Queue = queue.Queue()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="policy_server", daemon=True
+        )
+        self._latencies: Deque[float] = collections.deque(maxlen=latency_window)
+        self._num_requests = 0
+        self._num_batches = 0
+        self._start_time = time.perf_counter()
+
+    def __enter__(self) -> "BatchedPolicyServer":
+        self._start_time = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        self._stop_event.set()
+        self._thread.join()
+
+    def submit(self, observation: Any) -> Future:
+        """Queues an unbatched observation, the future resolves to its action.
+
+        Raises:
+            ValueError: if the observation does not have the structure and shapes of the
+                observation template, which would otherwise fail the whole batch it is part of.
+        """
+        _check_observation(self.observation_template, observation)
+        request = _Request(observation)
+        self._requests.put(request)
+        return request.future
+
+    def act(self, observation: Any, timeout: Optional[float] = None) -> np.ndarray:
+        """Blocks until the action of the (unbatched) observation is computed.
+
+        Raises:
+            concurrent.futures.TimeoutError: if the action is not computed within `timeout`
+                seconds, in which case the request is cancelled if not yet being processed.
+        """
+        future = self.submit(observation)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+
+    def parse_observation(self, value: Any) -> Any:
+        """Builds an observation from its JSON representation, i.e. nested dicts of lists
+        following the fields of the observation template.
+
+        Raises:
+            KeyError, TypeError or ValueError: if a field is missing or has the wrong type or
+                shape.
+        """
+        return _from_json(self.observation_template, value)
+
+    def stats(self) -> Dict[str, float]:
+        """Throughput since start, and latency percentiles over the most recent requests."""
+        elapsed_time = time.perf_counter() - self._start_time
+        latencies_ms = 1000 * np.asarray(list(self._latencies))
+        stats = {
+            "num_requests": self._num_requests,
+            "num_batches": self._num_batches,
+            "requests_per_second": self._num_requests / elapsed_time,
+            "mean_batch_size": self._num_requests / max(self._num_batches, 1),
+        }
+        if latencies_ms.size:
+            stats.update(
+                latency_p50_ms=float(np.percentile(latencies_ms, 50)),
+                latency_p99_ms=float(np.percentile(latencies_ms, 99)),
+            )
+        return stats
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                requests = [self._requests.get(timeout=_POLL_INTERVAL)]
+            except queue.Empty:
+                continue
+            deadline = requests[0].arrival_time + self.max_latency
+            while len(requests) < self.max_batch_size:
+                timeout = deadline - time.perf_counter()
+                try:
+                    if timeout > 0:
+                        requests.append(self._requests.get(timeout=timeout))
+                    else:
+                        requests.append(self._requests.get_nowait())
+                except queue.Empty:
+                    break
+            self._process(requests)
+
+    def _process(self, requests: List[_Request]) -> None:
+        # Drop the requests cancelled after timing out, the others can no longer be cancelled.
+        requests = [r for r in requests if r.future.set_running_or_notify_cancel()]
+        if not requests:
+            return
+        try:
+            batch_size = len(requests)
+            bucket_size = next(s for s in self.bucket_sizes if s >= batch_size)
+            observations = [request.observation for request in requests]
+            observations += [observations[0]] * (bucket_size - batch_size)
+            actions = np.asarray(
+                self._forward_fns[bucket_size](self._stack(observations))
+            )
+        except Exception as error:  # noqa: B902
+            for request in requests:
+                request.future.set_exception(error)
+            return
+        end_time = time.perf_counter()
+        for request, action in zip(requests, actions):
+            request.future.set_result(action)
+            self._latencies.append(end_time - request.arrival_time)
+        self._num_requests += batch_size
+        self._num_batches += 1
+
+    @staticmethod
+    def _stack(observations: List[Any]) -> Any:
+        return jax.tree_util.tree_map(lambda *x: np.stack(x), *observations)
+
+
+def _check_observation(template: Any, observation: Any) -> None:
+    """Raises a ValueError if `observation` does not match the structure and leaf shapes of
+    `template`.
+    """
+    template_leaves, template_treedef = jax.tree_util.tree_flatten_with_path(template)
+    leaves, treedef = jax.tree_util.tree_flatten(observation)
+    if treedef != template_treedef:
+        raise ValueError(
+            f"Expected an observation with structure {template_treedef}, got {treedef}."
+        )
+    for (path, template_leaf), leaf in zip(template_leaves, leaves):
+        if np.shape(leaf) != np.shape(template_leaf):
+            raise ValueError(
+                f"Expected observation{jax.tree_util.keystr(path)} to be of shape "
+                f"{np.shape(template_leaf)}, got {np.shape(leaf)}."
+            )
+
+
+def _from_json(template: Any, value: Any, path: str = "observation") -> Any:
+    if hasattr(template, "_fields") or dataclasses.is_dataclass(template):
+        fields = getattr(template, "_fields", None) or [
+            field.name for field in dataclasses.fields(template)
+        ]
+        if not isinstance(value, dict):
+            raise TypeError(f"Expected {path} to be an object, got {value!r}.")
+        return type(template)(
+            **{
+                field: _from_json(
+                    getattr(template, field), value[field], f"{path}.{field}"
+                )
+                for field in fields
+            }
+        )
+    array = np.asarray(value, dtype=np.asarray(template).dtype)
+    if array.shape != np.shape(template):
+        raise ValueError(
+            f"Expected {path} to be of shape {np.shape(template)}, got {array.shape}."
+        )
+    return array
+
+
+def make_http_server(
+    server: BatchedPolicyServer,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    request_timeout: float = 10.0,
+) -> ThreadingHTTPServer:
+    """HTTP front end of the policy server, each connection is handled in its own thread.
+
+    - `POST /act` with body `{"observation": {...}}` returns `{"action": [...]}`. Malformed
+        observations, e.g. with a wrong shape, are answered with 400. Requests that are not
+        answered within `request_timeout` seconds get a 503 and failed forward passes a 500.
+    - `GET /stats` returns the server's throughput and latency statistics.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:  # noqa: N802
+            if self.path != "/act":
+                self._reply(404, {"error": f"unknown path {self.path}"})
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                observation = server.parse_observation(body["observation"])
+            except (KeyError, TypeError, ValueError) as error:
+                self._reply(400, {"error": repr(error)})
+                return
+            try:
+                action = server.act(observation, timeout=request_timeout)
+            except FutureTimeoutError:
+                self._reply(503, {"error": "timed out waiting for the policy"})
+                return
+            except Exception as error:  # noqa: B902
+                logging.exception("Failed to compute an action.")
+                self._reply(500, {"error": repr(error)})
+                return
+            self._reply(200, {"action": action.tolist()})
+
+        def do_GET(self) -> None:  # noqa: N802
+            if self.path != "/stats":
+                self._reply(404, {"error": f"unknown path {self.path}"})
+                return
+            self._reply(200, server.stats())
+
+        def _reply(self, code: int, data: Dict) -> None:
+            body = json.dumps(data).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            logging.debug(format, *args)
+
+    return ThreadingHTTPServer((host, port), Handler)
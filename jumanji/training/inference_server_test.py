@@ -0,0 +1,201 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, Iterator, NamedTuple, Optional, Tuple
+
+import chex
+import jax.numpy as jnp
+import numpy as np
+import pytest
+
+from jumanji.training.inference_server import (
+    BatchedPolicyServer,
+    default_bucket_sizes,
+    make_http_server,
+)
+
+
+class Observation(NamedTuple):
+    values: chex.Array  # (4,)
+    action_mask: chex.Array  # (4,)
+
+
+def greedy_policy(
+    observation: Observation, key: chex.PRNGKey
+) -> Tuple[chex.Array, Any]:
+    """Picks the valid action of highest value."""
+    return (
+        jnp.argmax(
+            jnp.where(observation.action_mask, observation.values, -jnp.inf), -1
+        ),
+        None,
+    )
+
+
+def make_observation(action: int) -> Observation:
+    values = np.zeros(4, np.float32)
+    values[action] = 1.0
+    return Observation(values=values, action_mask=np.ones(4, bool))
+
+
+@pytest.fixture
+def policy_server() -> BatchedPolicyServer:
+    return BatchedPolicyServer(
+        greedy_policy,
+        make_observation(0),
+        max_batch_size=8,
+        max_latency_ms=50.0,
+    )
+
+
+def test_default_bucket_sizes() -> None:
+    assert default_bucket_sizes(1) == [1]
+    assert default_bucket_sizes(8) == [1, 2, 4, 8]
+    assert default_bucket_sizes(12) == [1, 2, 4, 8, 12]
+
+
+def test_batched_policy_server__batches_concurrent_requests(
+    policy_server: BatchedPolicyServer,
+) -> None:
+    """Validate that concurrent requests are answered with their own action and batched."""
+    actions = [i % 4 for i in range(32)]
+    with policy_server, ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(
+            executor.map(lambda a: policy_server.act(make_observation(a)), actions)
+        )
+    assert [int(result) for result in results] == actions
+    stats = policy_server.stats()
+    assert stats["num_requests"] == 32
+    assert stats["num_batches"] < 32
+    assert stats["latency_p99_ms"] >= stats["latency_p50_ms"]
+
+
+def test_batched_policy_server__rejects_invalid_shapes(
+    policy_server: BatchedPolicyServer,
+) -> None:
+    """Validate that an observation of the wrong shape is rejected on submission and does not
+    fail the requests batched with it.
+    """
+    with policy_server:
+        future = policy_server.submit(make_observation(2))
+        with pytest.raises(ValueError):
+            policy_server.submit(
+                Observation(values=np.zeros(5), action_mask=np.ones(4))
+            )
+        with pytest.raises(ValueError):
+            policy_server.submit(make_observation(1).values)
+        assert int(future.result(timeout=10)) == 2
+
+
+def test_batched_policy_server__parse_observation(
+    policy_server: BatchedPolicyServer,
+) -> None:
+    observation = policy_server.parse_observation(
+        {"values": [0, 0, 1, 0], "action_mask": [1, 1, 1, 0]}
+    )
+    assert isinstance(observation, Observation)
+    assert observation.values.dtype == np.float32
+    assert observation.action_mask.dtype == bool
+    with pytest.raises(ValueError):
+        policy_server.parse_observation({"values": [0, 1], "action_mask": [1, 1, 1, 0]})
+    with pytest.raises(KeyError):
+        policy_server.parse_observation({"values": [0, 0, 1, 0]})
+    with pytest.raises(TypeError):
+        policy_server.parse_observation([0, 0, 1, 0])
+
+
+def test_batched_policy_server__act_timeout(policy_server: BatchedPolicyServer) -> None:
+    """Validate that `act` times out when the batching thread is not running."""
+    with pytest.raises(FutureTimeoutError):
+        policy_server.act(make_observation(0), timeout=0.1)
+
+
+@pytest.fixture
+def http_server(policy_server: BatchedPolicyServer) -> Iterator[str]:
+    """Serves the policy server on a free port and yields its URL."""
+    server = make_http_server(policy_server, port=0, request_timeout=0.5)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def request(url: str, body: Optional[Dict] = None) -> Tuple[int, Dict]:
+    data = None if body is None else json.dumps(body).encode()
+    try:
+        with urllib.request.urlopen(url, data=data, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+def test_http_server__act(policy_server: BatchedPolicyServer, http_server: str) -> None:
+    observation = {"values": [0, 0, 0, 1], "action_mask": [1, 1, 1, 1]}
+    with policy_server:
+        code, response = request(f"{http_server}/act", {"observation": observation})
+        assert code == 200 and response["action"] == 3
+        code, response = request(f"{http_server}/stats")
+        assert code == 200 and response["num_requests"] == 1
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"observation": {"values": [0, 1], "action_mask": [1, 1, 1, 1]}},
+        {"observation": {"values": [0, 0, 0, 1]}},
+        {"observation": [0, 0, 0, 1]},
+        {"values": [0, 0, 0, 1], "action_mask": [1, 1, 1, 1]},
+    ],
+)
+def test_http_server__bad_request(
+    policy_server: BatchedPolicyServer, http_server: str, body: Dict
+) -> None:
+    with policy_server:
+        code, response = request(f"{http_server}/act", body)
+    assert code == 400 and "error" in response
+
+
+def test_http_server__unknown_path(http_server: str) -> None:
+    assert request(f"{http_server}/unknown")[0] == 404
+    assert request(f"{http_server}/unknown", {})[0] == 404
+
+
+def test_http_server__timeout(http_server: str) -> None:
+    """Validate that requests not answered in time get a 503, here because the batching thread
+    is not running.
+    """
+    observation = {"values": [0, 0, 0, 1], "action_mask": [1, 1, 1, 1]}
+    code, response = request(f"{http_server}/act", {"observation": observation})
+    assert code == 503 and "error" in response
+
+
+def test_http_server__policy_error(
+    policy_server: BatchedPolicyServer,
+    http_server: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def failing_act(observation: Any, timeout: Optional[float] = None) -> np.ndarray:
+        raise RuntimeError("forward pass failed")
+
+    monkeypatch.setattr(policy_server, "act", failing_act)
+    observation = {"values": [0, 0, 0, 1], "action_mask": [1, 1, 1, 1]}
+    code, response = request(f"{http_server}/act", {"observation": observation})
+    assert code == 500 and "forward pass failed" in response["error"]
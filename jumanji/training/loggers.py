@@ -118,6 +118,8 @@ class TerminalLogger(Logger):
             f"{key.replace('_', ' ').title()}: "
             f"{(f'{value:.3f}' if isinstance(value, (float, chex.Array)) else f'{value:,}')}"
             for key, value in sorted(data.items())
+            # Skip the episode statistics of epochs in which no episode was completed.
+            if not (isinstance(value, (float, chex.Array)) and np.isnan(value))
         )
 
     def write(
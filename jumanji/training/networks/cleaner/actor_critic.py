@@ -88,7 +88,7 @@ def process_obs_for_critic(observation: Observation) -> chex.Array:
             - Wall channel: 2D array with 1 for walls and 0 otherwise.
             - Agent channel: 2D array with the number of agents on each tile.
     """
-    grid = observation.grid
+    grid = observation.grid.astype(jnp.int32)
     dirty_channel = jnp.where(grid == DIRTY, 1, 0)
     wall_channel = jnp.where(grid == WALL, 1, 0)
     agents_channel = all_agents_channel(observation.agents_locations, grid)
@@ -144,7 +144,7 @@ def process_obs_for_actor(observation: Observation) -> chex.Array:
             - Agent channel: 2D array with 1 for the agent position and 0 otherwise.
             - Agents channel: 2D array with the number of agents on each tile.
     """
-    grid = observation.grid
+    grid = observation.grid.astype(jnp.int32)
     agents_locations = observation.agents_locations
 
     def create_channels_for_one_agent(agent_location: chex.Array) -> chex.Array:
@@ -79,7 +79,8 @@ def process_grid(grid: chex.Array) -> chex.Array:
         """Concatenates two feature maps: the info of the agent and the info about all other agents
         in an indiscernible way (to keep permutation equivariance).
         """
-        agent_grid = jnp.expand_dims(agent_grid, -1)
+        # Compact observations carry an uint8 grid, hence the cast to allow negative values.
+        agent_grid = jnp.expand_dims(agent_grid.astype(jnp.int32), -1)
         agent_mask = (
             (agent_grid == PATH) | (agent_grid == TARGET) | (agent_grid == POSITION)
         )
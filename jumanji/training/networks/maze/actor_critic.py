@@ -62,6 +62,14 @@ def make_actor_critic_networks_maze(
     )
 
 
+def decode_compact_walls(walls: chex.Array, num_rows: int, num_cols: int) -> chex.Array:
+    """Unpacks the bit-packed walls of a compact `Maze` observation into a boolean array of shape
+    (num_rows, num_cols).
+    """
+    walls = jnp.unpackbits(walls, count=num_rows * num_cols)
+    return walls.reshape(num_rows, num_cols).astype(bool)
+
+
 def process_observation(observation: Observation) -> chex.Array:
     """Add the agent and the target to the walls array."""
     agent = 2
@@ -94,6 +102,11 @@ def make_network_maze(
             ]
         )
 
+        if maze.compact_observation:
+            walls = jax.vmap(decode_compact_walls, in_axes=(0, None, None))(
+                observation.walls, maze.num_rows, maze.num_cols
+            )
+            observation = observation._replace(walls=walls)
         obs = jax.vmap(process_observation)(observation)  # (B, G, G, 1)
         embedding = torso(obs)  # (B, H)
         normalised_step_count = (
@@ -103,7 +103,8 @@ def make_network_cnn(
                 *[layer for conv_layer in conv_layers for layer in conv_layer],
             ]
         )
-        x = board_embedder(observation.board + 1)
+        # Compact observations carry an int8 board, hence the cast before embedding.
+        x = board_embedder(observation.board.astype(jnp.int32) + 1)
         num_mines_embedder = hk.Linear(num_mines_embed_dim)
         y = num_mines_embedder(
             observation.num_mines[:, None] / (board_num_rows * board_num_cols)
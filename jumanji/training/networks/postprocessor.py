@@ -79,7 +79,7 @@ class FactorisedActionSpaceReshapeBijector(Postprocessor):
             flat_action = (
                 self.action_spec_num_values[i] * flat_action + action_components[i]
             )
-        return flat_action
+        return jnp.squeeze(flat_action, axis=-1)
 
     def forward_log_det_jacobian(self, x: chex.Array) -> chex.Array:
         return jnp.zeros_like(x, x.dtype)
@@ -45,12 +45,14 @@ def make_actor_critic_networks_snake(
         mlp_units=policy_layers,
         conv_n_channels=num_channels,
         time_limit=snake.time_limit,
+        compact_observation=snake.compact_observation,
     )
     value_network = make_snake_cnn(
         num_outputs=1,
         mlp_units=value_layers,
         conv_n_channels=num_channels,
         time_limit=snake.time_limit,
+        compact_observation=snake.compact_observation,
     )
     return ActorCriticNetworks(
         policy_network=policy_network,
@@ -59,11 +61,22 @@ def make_actor_critic_networks_snake(
     )
 
 
+def decode_compact_grid(grid: chex.Array) -> chex.Array:
+    """Decodes a compact (uint8) `Snake` grid of shape (..., num_rows, num_cols, 2) back into the
+    5 float feature maps of shape (..., num_rows, num_cols, 5).
+    """
+    flags = grid[..., :1]
+    planes = (flags >> jnp.arange(4, dtype=jnp.uint8)) & 1
+    norm_body_state = grid[..., 1:] / 255
+    return jnp.concatenate([planes.astype(float), norm_body_state], axis=-1)
+
+
 def make_snake_cnn(
     num_outputs: int,
     mlp_units: Sequence[int],
     conv_n_channels: int,
     time_limit: int,
+    compact_observation: bool = False,
 ) -> FeedForwardNetwork:
     def network_fn(observation: Observation) -> chex.Array:
         torso = hk.Sequential(
@@ -75,7 +88,10 @@ def make_snake_cnn(
                 hk.Flatten(),
             ]
         )
-        embedding = torso(observation.grid)
+        grid = observation.grid
+        if compact_observation:
+            grid = decode_compact_grid(grid)
+        embedding = torso(grid)
         norm_step_count = jnp.expand_dims(observation.step_count / time_limit, axis=-1)
         embedding = jnp.concatenate([embedding, norm_step_count], axis=-1)
         head = hk.nets.MLP((*mlp_units, num_outputs), activate_final=False)
@@ -16,6 +16,8 @@ from typing import Optional, Sequence
 
 import chex
 import haiku as hk
+import jax.numpy as jnp
+import jmp
 
 
 class TransformerBlock(hk.Module):
@@ -86,11 +88,42 @@ class TransformerBlock(hk.Module):
             model_size=self.model_size,
         )
         h = mha(query, key, value, mask) + query
-        h = hk.LayerNorm(axis=-1, create_scale=True, create_offset=True)(h)
+        h = _layer_norm(h)
 
         # MLP and residual connection
         mlp = hk.nets.MLP((*self.mlp_units, self.model_size), activate_final=True)
         out = mlp(h) + h
-        out = hk.LayerNorm(axis=-1, create_scale=True, create_offset=True)(out)
+        out = _layer_norm(out)
 
         return out
+
+
+def _layer_norm(x: chex.Array) -> chex.Array:
+    # Normalization statistics are computed in float32 even under a bfloat16 policy. This is not
+    # a method as haiku would apply the block's policy to its output.
+    out = hk.LayerNorm(axis=-1, create_scale=True, create_offset=True)(
+        x.astype(jnp.float32)
+    )
+    return out.astype(x.dtype)
+
+
+def set_precision_policy(precision: str) -> None:
+    """Sets the precision of every `TransformerBlock`, and thus of the torsos built on them.
+
+    Args:
+        precision: either "float32" (default) or "bfloat16". With "bfloat16", params (hence the
+            optimizer state) are kept in float32 and cast to bfloat16 inside the blocks, whose
+            activations and matmuls are in bfloat16 and outputs cast back to float32. No loss
+            scaling is needed as bfloat16 has the same exponent range as float32.
+    """
+    if precision == "float32":
+        hk.mixed_precision.clear_policy(TransformerBlock)
+    elif precision == "bfloat16":
+        hk.mixed_precision.set_policy(
+            TransformerBlock,
+            jmp.get_policy("params=float32,compute=bfloat16,output=float32"),
+        )
+    else:
+        raise ValueError(
+            f"Expected precision to be in ['float32', 'bfloat16'], got {precision}."
+        )
@@ -0,0 +1,97 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Trains a population of A2C (or PPO) agents in a single jitted program. The training states
+of the members are stacked along a population axis placed right after the device axis, i.e.
+leaves have shape (num_devices, population_size, ...), and `run_epoch` is vmapped over it. Each
+member has its own seed, learning rate (via `optax.inject_hyperparams`) and entropy coefficient.
+"""
+
+from typing import Dict, List, Sequence
+
+import chex
+import jax
+import jax.numpy as jnp
+import numpy as np
+import optax
+
+from jumanji.env import Environment
+from jumanji.training.agents.a2c import A2CAgent
+from jumanji.training.setup_train import setup_training_state
+from jumanji.training.types import TrainingState
+
+
+def setup_population_training_state(
+    env: Environment,
+    agent: A2CAgent,
+    key: chex.PRNGKey,
+    learning_rates: Sequence[float],
+    l_ens: Sequence[float],
+) -> TrainingState:
+    """Initializes one training state per member, each from its own key, and stacks them.
+
+    Args:
+        env: training environment.
+        agent: A2C agent whose optimizer is wrapped with `optax.inject_hyperparams`.
+        key: random key split into one key per member.
+        learning_rates: learning rate of each member.
+        l_ens: entropy loss coefficient of each member.
+
+    Returns:
+        training state whose leaves have shape (num_devices, population_size, ...).
+    """
+    if len(learning_rates) != len(l_ens):
+        raise ValueError(
+            "Expected as many learning rates as entropy coefficients, got "
+            f"{len(learning_rates)} and {len(l_ens)}."
+        )
+    keys = jax.random.split(key, len(learning_rates))
+    training_states = [setup_training_state(env, agent, key) for key in keys]
+    training_state: TrainingState = jax.tree_util.tree_map(
+        lambda *x: jnp.stack(x, axis=1), *training_states
+    )
+
+    params_state = training_state.params_state
+    assert params_state is not None
+    opt_state = params_state.opt_state
+    if not isinstance(opt_state, optax.InjectHyperparamsState):
+        raise TypeError(
+            "Expected the agent's optimizer to be wrapped with optax.inject_hyperparams, got "
+            f"an optimizer state of type {type(opt_state)}."
+        )
+
+    def per_member(values: Sequence[float]) -> chex.Array:
+        values = jnp.asarray(values, float)
+        return jnp.broadcast_to(values, (jax.local_device_count(), *values.shape))
+
+    opt_state = opt_state._replace(
+        hyperparams={
+            **opt_state.hyperparams,
+            "learning_rate": per_member(learning_rates),
+        }
+    )
+    params_state = params_state._replace(
+        opt_state=opt_state, hyperparams={"l_en": per_member(l_ens)}
+    )
+    return training_state._replace(params_state=params_state)
+
+
+def unstack_metrics(metrics: Dict, population_size: int) -> List[Dict]:
+    """Splits metrics of shape (population_size,) into one dictionary per member. Scalar entries,
+    e.g. timings, are shared by all members.
+    """
+    return [
+        jax.tree_util.tree_map(lambda x: x[i] if np.ndim(x) else x, metrics)
+        for i in range(population_size)
+    ]
@@ -0,0 +1,80 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import contextlib
+import logging
+from types import TracebackType
+from typing import Iterator, Optional, Type
+
+import jax
+
+
+class Profiler:
+    def __init__(
+        self, trace_dir: Optional[str], start_epoch: int = 0, end_epoch: int = 0
+    ):
+        """Captures a `jax.profiler` trace of the epochs `start_epoch` to `end_epoch` (included)
+        that can be opened in TensorBoard or Perfetto. Each epoch is annotated as a step of the
+        trace so that trace viewers break it down epoch by epoch. Used as a context manager, the
+        trace is stopped when leaving, even if training ends early or raises.
+
+        Args:
+            trace_dir: directory to write the trace to. No trace is captured if None.
+            start_epoch: index of the first epoch to trace.
+            end_epoch: index of the last epoch to trace.
+        """
+        if end_epoch < start_epoch:
+            raise ValueError(
+                f"Expected end_epoch >= start_epoch, got {end_epoch} and {start_epoch}."
+            )
+        self.trace_dir = trace_dir
+        self.start_epoch = start_epoch
+        self.end_epoch = end_epoch
+        self._tracing = False
+
+    @contextlib.contextmanager
+    def epoch(self, epoch: int) -> Iterator[None]:
+        """Context manager wrapping a whole epoch, it starts and stops the trace when needed."""
+        if self.trace_dir is not None and epoch == self.start_epoch:
+            logging.info(f"Starting profiler trace in {self.trace_dir}.")
+            jax.profiler.start_trace(self.trace_dir)
+            self._tracing = True
+        try:
+            with jax.profiler.StepTraceAnnotation("epoch", step_num=epoch):
+                yield
+        except BaseException:  # noqa: B902
+            # Write the trace captured so far rather than leaving the profiler running.
+            self.stop()
+            raise
+        if epoch == self.end_epoch:
+            self.stop()
+
+    def __enter__(self) -> "Profiler":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        self.stop()
+
+    def stop(self) -> None:
+        """Stops the trace if one is being captured, e.g. if training ends before `end_epoch`."""
+        if self._tracing:
+            jax.profiler.stop_trace()
+            self._tracing = False
+            logging.info(f"Profiler trace written in {self.trace_dir}.")
@@ -0,0 +1,307 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""On-disk datasets of transitions, e.g. to train offline RL methods on the trajectories of
+`A2CAgent.rollout`. A dataset is a directory of chunks, each holding one `.npy` file per leaf of
+the recorded pytree, along with an index of the leaves and chunk sizes:
+
+    directory/
+        index.json
+        structure.pkl
+        chunk_00000/observation.coordinates.npy
+        chunk_00000/action.npy
+        ...
+
+The index is rewritten after each chunk, so a dataset can be read while it is being recorded.
+"""
+
+import json
+import os
+import pickle
+import queue
+import threading
+from types import TracebackType
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Type
+
+import chex
+import jax
+import numpy as np
+
+# Time in seconds after which blocking queue operations check whether to stop.
+_POLL_INTERVAL = 0.1
+
+_INDEX_FILE = "index.json"
+_STRUCTURE_FILE = "structure.pkl"
+
+
+def _chunk_dir(directory: str, chunk_id: int) -> str:
+    return os.path.join(directory, f"chunk_{chunk_id:05d}")
+
+
+def _leaf_name(path: Sequence[Any]) -> str:
+    """File name of a leaf from its path, e.g. "observation.coordinates"."""
+    entries = []
+    for entry in path:
+        for attribute in ("name", "key", "idx"):
+            if hasattr(entry, attribute):
+                entries.append(str(getattr(entry, attribute)))
+                break
+        else:
+            entries.append(str(entry))
+    return ".".join(entries) or "data"
+
+
+class TrajectoryRecorder:
+    """Appends pytrees of arrays, e.g. `Transition`s of shape (T, B, ...), to an on-disk dataset
+    in a background thread. Use it as a context manager to start the thread, and to write the
+    last (partial) chunk when leaving.
+
+    `record` starts the device-to-host copies without waiting for them, so recording does not
+    block the training loop. At most `max_pending` recordings wait for the thread, `record`
+    blocks beyond that, which bounds the host memory used by the recorder.
+
+    With `StaticObservationWrapper`, the static fields of the observations are None: call
+    `agent.with_static_observation(data)` before recording to store them.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        chunk_size: int = 65_536,
+        num_batch_dims: int = 2,
+        max_pending: int = 4,
+    ):
+        """
+        Args:
+            directory: directory of the dataset, created if needed. It must not already
+                contain a dataset.
+            chunk_size: number of samples per chunk.
+            num_batch_dims: number of leading axes of the recorded pytrees that are flattened
+                into samples, e.g. 2 for transitions of shape (T, B, ...), or 1 for transitions
+                of shape (B, T, ...) to store sequences of length T.
+            max_pending: maximum number of recordings waiting to be written.
+        """
+        if os.path.exists(os.path.join(directory, _INDEX_FILE)):
+            raise FileExistsError(f"A dataset already exists in {directory}.")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.num_batch_dims = num_batch_dims
+        self.num_samples = 0
+        self._treedef: Optional[Any] = None
+        self._leaves_spec: List[Dict] = []
+        self._chunk_sizes: List[int] = []
+        self._buffer: List[List[np.ndarray]] = []
+        self._buffer_size = 0
+        self._pending: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="recorder", daemon=True)
+        self._error: Optional[BaseException] = None
+
+    def __enter__(self) -> "TrajectoryRecorder":
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        # Let the thread write the pending recordings, then write the last partial chunk.
+        while self._pending.unfinished_tasks and self._error is None:
+            self._thread.join(timeout=_POLL_INTERVAL)
+        self._stop_event.set()
+        self._thread.join()
+        if self._error is None and self._buffer_size:
+            self._write_chunk(self._buffer_size)
+        if exc_type is None:
+            self._check_thread(stopping=True)
+
+    def record(self, data: chex.ArrayTree) -> None:
+        """Queues the samples of `data`, whose leaves share the same `num_batch_dims` leading
+        axes, to be appended to the dataset.
+        """
+        for leaf in jax.tree_util.tree_leaves(data):
+            if isinstance(leaf, jax.Array):
+                leaf.copy_to_host_async()
+        while True:
+            self._check_thread()
+            try:
+                self._pending.put(data, timeout=_POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+
+    def _run(self) -> None:
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    data = self._pending.get(timeout=_POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+                self._append(data)
+                self._pending.task_done()
+        except BaseException as error:  # noqa: B902
+            self._error = error
+            self._stop_event.set()
+
+    def _append(self, data: chex.ArrayTree) -> None:
+        leaves_with_path, treedef = jax.tree_util.tree_flatten_with_path(data)
+        leaves = [np.asarray(leaf) for _, leaf in leaves_with_path]
+        batch_shape = leaves[0].shape[: self.num_batch_dims]
+        leaves = [
+            leaf.reshape(-1, *leaf.shape[self.num_batch_dims :]) for leaf in leaves
+        ]
+        if self._treedef is None:
+            self._treedef = treedef
+            self._leaves_spec = [
+                {
+                    "name": _leaf_name(path),
+                    "dtype": leaf.dtype.str,
+                    "shape": list(leaf.shape[1:]),
+                }
+                for (path, _), leaf in zip(leaves_with_path, leaves)
+            ]
+            with open(os.path.join(self.directory, _STRUCTURE_FILE), "wb") as file_:
+                pickle.dump(treedef, file_)
+        elif treedef != self._treedef:
+            raise ValueError(
+                f"Expected the recorded pytrees to have structure {self._treedef}, got "
+                f"{treedef}."
+            )
+        for leaf, spec in zip(leaves, self._leaves_spec):
+            if leaf.shape != (leaves[0].shape[0], *spec["shape"]):
+                raise ValueError(
+                    f"Expected leaf {spec['name']} to have batch shape {batch_shape} and "
+                    f"sample shape {tuple(spec['shape'])}, got shape {leaf.shape}."
+                )
+        self._buffer.append(leaves)
+        self._buffer_size += leaves[0].shape[0]
+        while self._buffer_size >= self.chunk_size:
+            self._write_chunk(self.chunk_size)
+
+    def _write_chunk(self, size: int) -> None:
+        """Writes the first `size` buffered samples as a new chunk and updates the index."""
+        chunk = [
+            np.concatenate(leaf_buffers)
+            for leaf_buffers in zip(*self._buffer)  # type: ignore
+        ]
+        chunk_dir = _chunk_dir(self.directory, len(self._chunk_sizes))
+        os.makedirs(chunk_dir, exist_ok=True)
+        for leaf, spec in zip(chunk, self._leaves_spec):
+            np.save(os.path.join(chunk_dir, f"{spec['name']}.npy"), leaf[:size])
+        self._buffer = [[leaf[size:] for leaf in chunk]] if size < len(chunk[0]) else []
+        self._buffer_size -= size
+        self._chunk_sizes.append(size)
+        self.num_samples += size
+        self._write_index()
+
+    def _write_index(self) -> None:
+        index = {
+            "num_samples": self.num_samples,
+            "chunk_sizes": self._chunk_sizes,
+            "leaves": self._leaves_spec,
+        }
+        path = os.path.join(self.directory, _INDEX_FILE)
+        with open(path + ".tmp", "w") as file_:
+            json.dump(index, file_, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def _check_thread(self, stopping: bool = False) -> None:
+        if self._error is not None:
+            raise RuntimeError("The recording thread failed.") from self._error
+        if self._stop_event.is_set() and not stopping:
+            raise RuntimeError("The recording thread was stopped.")
+
+
+class TrajectoryDataset:
+    """Random access to the samples of a dataset written by `TrajectoryRecorder`. The chunks are
+    memory-mapped, so only the samples that are read are loaded from disk.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, _STRUCTURE_FILE), "rb") as file_:
+            self._treedef = pickle.load(file_)
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Reloads the index, to read the chunks written since the dataset was opened."""
+        with open(os.path.join(self.directory, _INDEX_FILE)) as file_:
+            index = json.load(file_)
+        self._leaves_spec = index["leaves"]
+        self._offsets = np.cumsum([0, *index["chunk_sizes"]])
+        self._chunks: Dict[int, List[np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return int(self._offsets[-1])
+
+    def __getitem__(self, indices: Any) -> chex.ArrayTree:
+        """Gathers the samples at `indices` (an integer array of shape (N,)) into a pytree of
+        numpy arrays of shape (N, ...).
+        """
+        indices = np.asarray(indices)
+        if indices.ndim != 1:
+            raise ValueError(f"Expected indices of shape (N,), got {indices.shape}.")
+        if indices.size and not (0 <= indices.min() and indices.max() < len(self)):
+            raise IndexError(
+                f"Expected indices in [0, {len(self)}), got [{indices.min()}, "
+                f"{indices.max()}]."
+            )
+        leaves = [
+            np.empty((len(indices), *spec["shape"]), np.dtype(spec["dtype"]))
+            for spec in self._leaves_spec
+        ]
+        chunk_ids = np.searchsorted(self._offsets, indices, side="right") - 1
+        for chunk_id in np.unique(chunk_ids):
+            selected = np.flatnonzero(chunk_ids == chunk_id)
+            # Read the rows of each chunk in increasing order to make the disk reads sequential.
+            selected = selected[np.argsort(indices[selected])]
+            rows = indices[selected] - self._offsets[chunk_id]
+            for leaf, chunk_leaf in zip(leaves, self._chunk(chunk_id)):
+                leaf[selected] = chunk_leaf[rows]
+        return jax.tree_util.tree_unflatten(self._treedef, leaves)
+
+    def sample(self, batch_size: int, rng: np.random.Generator) -> chex.ArrayTree:
+        """Samples a minibatch of `batch_size` samples uniformly, with replacement."""
+        return self[rng.integers(len(self), size=batch_size)]
+
+    def iterate(
+        self,
+        batch_size: int,
+        shuffle: bool = True,
+        rng: Optional[np.random.Generator] = None,
+    ) -> Iterator[chex.ArrayTree]:
+        """Yields minibatches covering the dataset once, the last one may be smaller.
+
+        Args:
+            batch_size: number of samples per minibatch.
+            shuffle: whether to visit the samples in a random order.
+            rng: random generator used to shuffle, defaults to `np.random.default_rng()`.
+        """
+        indices = np.arange(len(self))
+        if shuffle:
+            (rng or np.random.default_rng()).shuffle(indices)
+        for start in range(0, len(indices), batch_size):
+            yield self[indices[start : start + batch_size]]
+
+    def _chunk(self, chunk_id: int) -> List[np.ndarray]:
+        if chunk_id not in self._chunks:
+            chunk_dir = _chunk_dir(self.directory, chunk_id)
+            self._chunks[chunk_id] = [
+                np.load(os.path.join(chunk_dir, f"{spec['name']}.npy"), mmap_mode="r")
+                for spec in self._leaves_spec
+            ]
+        return self._chunks[chunk_id]
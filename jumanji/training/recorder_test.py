@@ -0,0 +1,236 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import time
+from typing import Dict, List, NamedTuple
+
+import chex
+import jax
+import jax.numpy as jnp
+import numpy as np
+import py
+import pytest
+
+from jumanji.training.recorder import TrajectoryDataset, TrajectoryRecorder
+
+
+class Sample(NamedTuple):
+    observation: Dict[str, chex.Array]
+    action: chex.Array
+
+
+def make_data(start: int, num_steps: int = 2, batch_size: int = 3) -> Sample:
+    """Data of shape (T, B, ...) whose samples are numbered from `start` in row-major order."""
+    ids = start + np.arange(num_steps * batch_size).reshape(num_steps, batch_size)
+    return Sample(
+        observation={
+            "coordinates": jnp.asarray(np.stack([ids, -ids], axis=-1), jnp.float32),
+            "mask": jnp.asarray(ids % 2 == 0),
+        },
+        action=jnp.asarray(ids, jnp.int32),
+    )
+
+
+def flatten(data: List[Sample]) -> Sample:
+    """Concatenates the samples of several recordings along a single leading axis."""
+    return jax.tree_util.tree_map(
+        lambda *x: np.concatenate([np.reshape(y, (-1, *y.shape[2:])) for y in x]),
+        *data,
+    )
+
+
+def read_index(directory: str) -> Dict:
+    with open(os.path.join(directory, "index.json")) as file_:
+        return json.load(file_)
+
+
+def wait_for_samples(recorder: TrajectoryRecorder, num_samples: int) -> None:
+    """Waits for the recording thread to write at least `num_samples` samples in chunks."""
+    deadline = time.perf_counter() + 10
+    while recorder.num_samples < num_samples:
+        assert time.perf_counter() < deadline, "The recorder did not write its chunks."
+        time.sleep(0.01)
+
+
+def test_trajectory_recorder__round_trip(tmpdir: py.path.local) -> None:
+    """Validate that recordings are split into chunks of `chunk_size` samples, that the last
+    partial chunk is written when exiting, and that the dataset reads back the same samples.
+    """
+    directory = str(tmpdir.join("dataset"))
+    data = [make_data(6 * i) for i in range(3)]
+    with TrajectoryRecorder(directory, chunk_size=4) as recorder:
+        for recording in data:
+            recorder.record(recording)
+    assert recorder.num_samples == 18
+    assert read_index(directory)["chunk_sizes"] == [4, 4, 4, 4, 2]
+    assert sorted(os.listdir(os.path.join(directory, "chunk_00000"))) == [
+        "action.npy",
+        "observation.coordinates.npy",
+        "observation.mask.npy",
+    ]
+
+    dataset = TrajectoryDataset(directory)
+    assert len(dataset) == 18
+    samples = dataset[np.arange(18)]
+    assert isinstance(samples, Sample)
+    chex.assert_trees_all_equal(samples, flatten(data))
+    assert samples.action.dtype == np.int32
+    assert samples.observation["mask"].dtype == bool
+
+
+def test_trajectory_recorder__partial_chunk(tmpdir: py.path.local) -> None:
+    """Validate that samples that do not fill a chunk are only written when exiting."""
+    directory = str(tmpdir.join("dataset"))
+    with TrajectoryRecorder(directory, chunk_size=100) as recorder:
+        recorder.record(make_data(0))
+        time.sleep(0.2)
+        assert recorder.num_samples == 0
+    assert read_index(directory)["chunk_sizes"] == [6]
+    assert len(TrajectoryDataset(directory)) == 6
+
+
+def test_trajectory_recorder__num_batch_dims(tmpdir: py.path.local) -> None:
+    """Validate that a single batch dimension stores whole sequences as samples."""
+    directory = str(tmpdir.join("dataset"))
+    with TrajectoryRecorder(directory, num_batch_dims=1) as recorder:
+        recorder.record(make_data(0))
+    samples = TrajectoryDataset(directory)[np.arange(2)]
+    assert samples.action.shape == (2, 3)
+    assert samples.observation["coordinates"].shape == (2, 3, 2)
+
+
+def test_trajectory_recorder__existing_dataset(tmpdir: py.path.local) -> None:
+    directory = str(tmpdir.join("dataset"))
+    with TrajectoryRecorder(directory) as recorder:
+        recorder.record(make_data(0))
+    with pytest.raises(FileExistsError):
+        TrajectoryRecorder(directory)
+
+
+def test_trajectory_recorder__structure_mismatch(tmpdir: py.path.local) -> None:
+    """Validate that recording a pytree of another structure fails the recording thread and
+    that the error is raised in the main thread.
+    """
+    directory = str(tmpdir.join("dataset"))
+    with pytest.raises(RuntimeError) as error:
+        with TrajectoryRecorder(directory) as recorder:
+            recorder.record(make_data(0))
+            recorder.record({"action": make_data(6).action})
+    assert isinstance(error.value.__cause__, ValueError)
+    assert "structure" in str(error.value.__cause__)
+
+
+def test_trajectory_recorder__shape_mismatch(tmpdir: py.path.local) -> None:
+    directory = str(tmpdir.join("dataset"))
+    data = make_data(0)
+    with pytest.raises(RuntimeError) as error:
+        with TrajectoryRecorder(directory) as recorder:
+            recorder.record(data)
+            recorder.record(data._replace(action=data.action[..., None]))
+    assert isinstance(error.value.__cause__, ValueError)
+
+
+def test_trajectory_recorder__error_propagation(tmpdir: py.path.local) -> None:
+    """Validate that once the recording thread failed, `record` raises instead of blocking, and
+    that an exception raised in the body is not masked when exiting.
+    """
+    directory = str(tmpdir.join("dataset"))
+    with pytest.raises(KeyError):
+        with TrajectoryRecorder(directory, max_pending=1) as recorder:
+            recorder.record(make_data(0))
+            recorder.record({"action": make_data(6).action})
+            with pytest.raises(RuntimeError):
+                for i in range(100):
+                    recorder.record(make_data(6 * i))
+                    time.sleep(0.01)
+            raise KeyError("body")
+
+
+def test_trajectory_dataset__cross_chunk_gather(tmpdir: py.path.local) -> None:
+    """Validate that unordered indices spanning several chunks, with duplicates, are gathered
+    in the requested order.
+    """
+    directory = str(tmpdir.join("dataset"))
+    data = [make_data(6 * i) for i in range(4)]
+    with TrajectoryRecorder(directory, chunk_size=5) as recorder:
+        for recording in data:
+            recorder.record(recording)
+    dataset = TrajectoryDataset(directory)
+    expected = flatten(data)
+    indices = np.array([23, 0, 7, 4, 5, 19, 7, 12])
+    chex.assert_trees_all_equal(
+        dataset[indices], jax.tree_util.tree_map(lambda x: x[indices], expected)
+    )
+    assert dataset[np.array([], int)].action.shape == (0,)
+
+
+@pytest.mark.parametrize("indices", [[24], [-1], [0, 100]])
+def test_trajectory_dataset__out_of_range(
+    tmpdir: py.path.local, indices: List[int]
+) -> None:
+    directory = str(tmpdir.join("dataset"))
+    with TrajectoryRecorder(directory, chunk_size=5) as recorder:
+        for i in range(4):
+            recorder.record(make_data(6 * i))
+    with pytest.raises(IndexError):
+        TrajectoryDataset(directory)[np.array(indices)]
+
+
+def test_trajectory_dataset__invalid_indices_shape(tmpdir: py.path.local) -> None:
+    directory = str(tmpdir.join("dataset"))
+    with TrajectoryRecorder(directory) as recorder:
+        recorder.record(make_data(0))
+    with pytest.raises(ValueError):
+        TrajectoryDataset(directory)[np.zeros((2, 2), int)]
+
+
+def test_trajectory_dataset__refresh(tmpdir: py.path.local) -> None:
+    """Validate that a dataset opened while recording only sees the chunks written when it was
+    opened or last refreshed.
+    """
+    directory = str(tmpdir.join("dataset"))
+    data = [make_data(6 * i) for i in range(4)]
+    with TrajectoryRecorder(directory, chunk_size=6) as recorder:
+        recorder.record(data[0])
+        wait_for_samples(recorder, 6)
+        dataset = TrajectoryDataset(directory)
+        assert len(dataset) == 6
+        recorder.record(data[1])
+        recorder.record(data[2])
+        wait_for_samples(recorder, 18)
+        assert len(dataset) == 6
+        dataset.refresh()
+        assert len(dataset) == 18
+        chex.assert_trees_all_equal(dataset[np.arange(18)], flatten(data[:3]))
+        recorder.record(data[3])
+    dataset.refresh()
+    assert len(dataset) == 24
+
+
+def test_trajectory_dataset__sample_and_iterate(tmpdir: py.path.local) -> None:
+    directory = str(tmpdir.join("dataset"))
+    with TrajectoryRecorder(directory, chunk_size=4) as recorder:
+        for i in range(3):
+            recorder.record(make_data(6 * i))
+    dataset = TrajectoryDataset(directory)
+    rng = np.random.default_rng(0)
+    assert dataset.sample(7, rng).action.shape == (7,)
+    batches = list(dataset.iterate(batch_size=5, rng=rng))
+    assert [len(batch.action) for batch in batches] == [5, 5, 5, 3]
+    actions = np.concatenate([batch.action for batch in batches])
+    assert sorted(actions) == list(range(18))
+    batches = list(dataset.iterate(batch_size=5, shuffle=False))
+    assert list(np.concatenate([batch.action for batch in batches])) == list(range(18))
@@ -0,0 +1,63 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+
+import hydra
+import omegaconf
+
+from jumanji.training.agents.a2c import A2CAgent
+from jumanji.training.inference_server import (
+    BatchedPolicyServer,
+    load_policy_params,
+    make_http_server,
+)
+from jumanji.training.setup_train import setup_agent, setup_env
+
+
+@hydra.main(config_path="configs", config_name="config.yaml")
+def serve(cfg: omegaconf.DictConfig) -> None:
+    """Serves the greedy policy of a checkpointed A2C or PPO agent over HTTP."""
+    logging.getLogger().setLevel(logging.INFO)
+    env = setup_env(cfg)
+    agent = setup_agent(cfg, env)
+    if not isinstance(agent, A2CAgent):
+        raise ValueError(f"Expected agent to be in ['a2c', 'ppo'], got {cfg.agent}.")
+    policy_params = load_policy_params(agent, cfg.serving.checkpoint)
+    logging.info("Compiling the policy for each bucket size...")
+    policy_server = BatchedPolicyServer(
+        policy=agent.make_policy(policy_params, stochastic=False),
+        observation_template=env.observation_spec().generate_value(),
+        max_batch_size=cfg.serving.max_batch_size,
+        max_latency_ms=cfg.serving.max_latency_ms,
+    )
+    http_server = make_http_server(
+        policy_server,
+        cfg.serving.host,
+        cfg.serving.port,
+        request_timeout=cfg.serving.request_timeout_s,
+    )
+    logging.info(f"Serving on http://{cfg.serving.host}:{cfg.serving.port}.")
+    with policy_server:
+        try:
+            http_server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            http_server.server_close()
+            logging.info(policy_server.stats())
+
+
+if __name__ == "__main__":
+    serve()
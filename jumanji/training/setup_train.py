@@ -12,12 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Tuple
+import os
+from typing import List, Optional, Tuple
 
 import chex
 import jax
 import jax.numpy as jnp
 import optax
+from jax.sharding import Mesh
 from omegaconf import DictConfig
 
 import jumanji
@@ -36,9 +38,11 @@ from jumanji.environments import (
     RubiksCube,
     Snake,
 )
-from jumanji.training import networks
+from jumanji.training import networks, sharding
+from jumanji.training.actor_learner import ActorLearner
 from jumanji.training.agents.a2c import A2CAgent
 from jumanji.training.agents.base import Agent
+from jumanji.training.agents.ppo import PPOAgent
 from jumanji.training.agents.random import RandomAgent
 from jumanji.training.evaluator import Evaluator
 from jumanji.training.loggers import (
@@ -49,8 +53,15 @@ from jumanji.training.loggers import (
 )
 from jumanji.training.networks.actor_critic import ActorCriticNetworks
 from jumanji.training.networks.protocols import RandomPolicy
+from jumanji.training.networks.transformer_block import set_precision_policy
+from jumanji.training.recorder import TrajectoryRecorder
 from jumanji.training.types import ActingState, TrainingState
-from jumanji.wrappers import MultiToSingleWrapper, VmapAutoResetWrapper
+from jumanji.wrappers import (
+    EpisodeStatisticsWrapper,
+    MultiToSingleWrapper,
+    StaticObservationWrapper,
+    VmapAutoResetWrapper,
+)
 
 
 def setup_logger(cfg: DictConfig) -> Logger:
@@ -77,8 +88,29 @@ def setup_logger(cfg: DictConfig) -> Logger:
     return logger
 
 
+def setup_mesh(cfg: DictConfig) -> Optional[Mesh]:
+    """Returns None for the pmap code path, or the device mesh to jit the training over."""
+    if cfg.parallelism.mode == "pmap":
+        return None
+    elif cfg.parallelism.mode == "async":
+        # The actors and the learner each run jitted programs on a single device.
+        return sharding.make_mesh(1)
+    elif cfg.parallelism.mode == "sharding":
+        if cfg.parallelism.distributed:
+            # Connects the processes of a multi-host run, must be called before any jax op.
+            jax.distributed.initialize()
+        return sharding.make_mesh(cfg.parallelism.num_devices)
+    else:
+        raise ValueError(
+            "Expected parallelism.mode to be in ['pmap', 'sharding', 'async'], "
+            f"got {cfg.parallelism.mode}."
+        )
+
+
 def _make_raw_env(cfg: DictConfig) -> Environment:
-    env: Environment = jumanji.make(cfg.env.registered_version)
+    env: Environment = jumanji.make(
+        cfg.env.registered_version, **cfg.env.get("kwargs", {})
+    )
     if isinstance(env, Connector):
         env = MultiToSingleWrapper(env)
     return env
@@ -86,11 +118,31 @@ def _make_raw_env(cfg: DictConfig) -> Environment:
 
 def setup_env(cfg: DictConfig) -> Environment:
     env = _make_raw_env(cfg)
+    env = EpisodeStatisticsWrapper(env)
+    if cfg.split_static_observation and env.static_observation_fields:
+        env = StaticObservationWrapper(env)
     env = VmapAutoResetWrapper(env)
     return env
 
 
-def setup_agent(cfg: DictConfig, env: Environment) -> Agent:
+def setup_recorder(cfg: DictConfig) -> Optional[TrajectoryRecorder]:
+    """Recorder of the training trajectories if `record_dir` is set, None otherwise."""
+    if not cfg.record_dir:
+        return None
+    if cfg.agent == "random":
+        raise ValueError(
+            f"record_dir is only supported for agent=a2c or agent=ppo, got {cfg.agent}."
+        )
+    return TrajectoryRecorder(cfg.record_dir)
+
+
+def setup_agent(
+    cfg: DictConfig,
+    env: Environment,
+    mesh: Optional[Mesh] = None,
+    recorder: Optional[TrajectoryRecorder] = None,
+) -> Agent:
+    """The a2c and ppo agents send the transitions of their rollouts to `recorder`, if given."""
     agent: Agent
     if cfg.agent == "random":
         random_policy = _setup_random_policy(cfg, env)
@@ -99,10 +151,11 @@ def setup_agent(cfg: DictConfig, env: Environment) -> Agent:
             n_steps=cfg.env.training.n_steps,
             total_batch_size=cfg.env.training.total_batch_size,
             random_policy=random_policy,
+            mesh=mesh,
         )
     elif cfg.agent == "a2c":
         actor_critic_networks = _setup_actor_critic_neworks(cfg, env)
-        optimizer = optax.adam(cfg.env.a2c.learning_rate)
+        optimizer = _setup_optimizer(cfg)
         agent = A2CAgent(
             env=env,
             n_steps=cfg.env.training.n_steps,
@@ -115,14 +168,49 @@ def setup_agent(cfg: DictConfig, env: Environment) -> Agent:
             l_pg=cfg.env.a2c.l_pg,
             l_td=cfg.env.a2c.l_td,
             l_en=cfg.env.a2c.l_en,
+            remat=cfg.remat,
+            num_micro_batches=cfg.num_micro_batches,
+            mesh=mesh,
+            recorder=recorder,
+        )
+    elif cfg.agent == "ppo":
+        actor_critic_networks = _setup_actor_critic_neworks(cfg, env)
+        optimizer = _setup_optimizer(cfg)
+        agent = PPOAgent(
+            env=env,
+            n_steps=cfg.env.training.n_steps,
+            total_batch_size=cfg.env.training.total_batch_size,
+            actor_critic_networks=actor_critic_networks,
+            optimizer=optimizer,
+            normalize_advantage=cfg.env.a2c.normalize_advantage,
+            discount_factor=cfg.env.a2c.discount_factor,
+            bootstrapping_factor=cfg.env.a2c.bootstrapping_factor,
+            l_pg=cfg.env.a2c.l_pg,
+            l_td=cfg.env.a2c.l_td,
+            l_en=cfg.env.a2c.l_en,
+            remat=cfg.remat,
+            clip_epsilon=cfg.ppo.clip_epsilon,
+            num_update_epochs=cfg.ppo.num_update_epochs,
+            num_minibatches=cfg.ppo.num_minibatches,
+            mesh=mesh,
+            recorder=recorder,
         )
     else:
         raise ValueError(
-            f"Expected agent name to be in ['random', 'a2c'], got {cfg.agent}."
+            f"Expected agent name to be in ['random', 'a2c', 'ppo'], got {cfg.agent}."
         )
     return agent
 
 
+def _setup_optimizer(cfg: DictConfig) -> optax.GradientTransformation:
+    if cfg.population.size > 1:
+        # The learning rate is set per population member in the optimizer state.
+        return optax.inject_hyperparams(optax.adam)(
+            learning_rate=cfg.env.a2c.learning_rate
+        )
+    return optax.adam(cfg.env.a2c.learning_rate)
+
+
 def _setup_random_policy(  # noqa: CCR001
     cfg: DictConfig, env: Environment
 ) -> RandomPolicy:
@@ -175,7 +263,8 @@ def _setup_random_policy(  # noqa: CCR001
 def _setup_actor_critic_neworks(  # noqa: CCR001
     cfg: DictConfig, env: Environment
 ) -> ActorCriticNetworks:
-    assert cfg.agent == "a2c"
+    assert cfg.agent in ["a2c", "ppo"]
+    set_precision_policy(cfg.env.training.get("precision", "float32"))
     if cfg.env.name == "bin_pack":
         assert isinstance(env.unwrapped, BinPack)
         actor_critic_networks = networks.make_actor_critic_networks_bin_pack(
@@ -290,26 +379,91 @@ def _setup_actor_critic_neworks(  # noqa: CCR001
     return actor_critic_networks
 
 
-def setup_evaluators(cfg: DictConfig, agent: Agent) -> Tuple[Evaluator, Evaluator]:
-    env = _make_raw_env(cfg)
-    stochastic_eval = Evaluator(
-        eval_env=env,
+def setup_population(cfg: DictConfig) -> Optional[Tuple[List[float], List[float]]]:
+    """Returns None if population training is disabled, or the learning rate and entropy
+    coefficient of each member.
+    """
+    size = cfg.population.size
+    if size <= 1:
+        return None
+    if cfg.agent not in ["a2c", "ppo"]:
+        raise ValueError(
+            f"Population training requires agent to be a2c or ppo, got {cfg.agent}."
+        )
+    if cfg.parallelism.mode != "pmap":
+        raise ValueError(
+            "Population training is only supported with parallelism.mode=pmap, "
+            f"got {cfg.parallelism.mode}."
+        )
+    hyperparams = []
+    for name in ["learning_rate", "l_en"]:
+        values = cfg.population.get(name) or [cfg.env.a2c[name]] * size
+        if len(values) != size:
+            raise ValueError(
+                f"Expected population.{name} to have population.size={size} values, "
+                f"got {len(values)}."
+            )
+        hyperparams.append([float(value) for value in values])
+    learning_rates, l_ens = hyperparams
+    return learning_rates, l_ens
+
+
+def setup_actor_learner(
+    cfg: DictConfig,
+    env: Environment,
+    agent: Agent,
+    key: chex.PRNGKey,
+    recorder: Optional[TrajectoryRecorder] = None,
+) -> ActorLearner:
+    """The learner sends the trajectories it consumes to `recorder`, if given."""
+    if cfg.agent != "a2c":
+        raise ValueError(
+            f"parallelism.mode=async is only supported for agent=a2c, got {cfg.agent}."
+        )
+    assert isinstance(agent, A2CAgent)
+    return ActorLearner(
+        env=env,
         agent=agent,
-        total_batch_size=cfg.env.evaluation.eval_total_batch_size,
-        stochastic=True,
+        key=key,
+        num_actors=cfg.parallelism.num_actors,
+        queue_size=cfg.parallelism.queue_size,
+        recorder=recorder,
     )
-    greedy_eval = Evaluator(
-        eval_env=env,
+
+
+def setup_evaluator(
+    cfg: DictConfig, agent: Agent, mesh: Optional[Mesh] = None
+) -> Evaluator:
+    """Evaluates the stochastic policy, and the greedy one unless the agent is random, in a
+    single compiled program. If `eval_record_dir` is set, the transitions of each evaluation
+    mode are recorded to its own dataset, e.g. `<eval_record_dir>/greedy`.
+    """
+    total_batch_sizes = {"stochastic": cfg.env.evaluation.eval_total_batch_size}
+    if not isinstance(agent, RandomAgent):
+        total_batch_sizes["greedy"] = cfg.env.evaluation.greedy_eval_total_batch_size
+    recorders = {}
+    if cfg.eval_record_dir:
+        recorders = {
+            mode: TrajectoryRecorder(
+                os.path.join(cfg.eval_record_dir, mode), num_batch_dims=1
+            )
+            for mode in total_batch_sizes
+        }
+    return Evaluator(
+        eval_env=_make_raw_env(cfg),
         agent=agent,
-        total_batch_size=cfg.env.evaluation.greedy_eval_total_batch_size,
-        stochastic=False,
+        total_batch_sizes=total_batch_sizes,
+        mesh=mesh,
+        population=cfg.population.size > 1,
+        recorders=recorders,
     )
-    return stochastic_eval, greedy_eval
 
 
 def setup_training_state(
-    env: Environment, agent: Agent, key: chex.PRNGKey
+    env: Environment, agent: Agent, key: chex.PRNGKey, mesh: Optional[Mesh] = None
 ) -> TrainingState:
+    if mesh is not None:
+        return _setup_sharded_training_state(env, agent, key, mesh)
     params_key, reset_key, acting_key = jax.random.split(key, 3)
 
     # Initialize params.
@@ -338,3 +492,43 @@ def setup_training_state(
         acting_state=acting_state,
     )
     return training_state
+
+
+def _setup_sharded_training_state(
+    env: Environment, agent: Agent, key: chex.PRNGKey, mesh: Mesh
+) -> TrainingState:
+    """Initializes the training state inside a jitted function so that every process of a
+    multi-host run builds its own shards: the environment batch (padded to
+    `agent.batch_size`) is sharded over the mesh while the rest is replicated.
+    """
+    batch_sharding = sharding.batch_sharding(mesh)
+    replicated_sharding = sharding.replicated_sharding(mesh)
+
+    def init(key: chex.PRNGKey) -> TrainingState:
+        params_key, reset_key, acting_key = jax.random.split(key, 3)
+        params_state = agent.init_params(params_key)
+        reset_keys = jax.lax.with_sharding_constraint(
+            jax.random.split(reset_key, agent.batch_size), batch_sharding
+        )
+        env_state, timestep = env.reset(reset_keys)
+        acting_state = ActingState(
+            state=env_state,
+            timestep=timestep,
+            key=acting_key,
+            episode_count=jnp.zeros((), float),
+            env_step_count=jnp.zeros((), float),
+        )
+        return TrainingState(params_state=params_state, acting_state=acting_state)
+
+    out_shardings = TrainingState(
+        params_state=replicated_sharding,
+        acting_state=ActingState(
+            state=batch_sharding,
+            timestep=batch_sharding,
+            key=replicated_sharding,
+            episode_count=replicated_sharding,
+            env_step_count=replicated_sharding,
+        ),
+    )
+    training_state: TrainingState = jax.jit(init, out_shardings=out_shardings)(key)
+    return training_state
@@ -0,0 +1,76 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Helpers for the `jit` + `NamedSharding` data-parallel code path. The environment batch is
+sharded over a 1D mesh of all devices (across all processes), parameters are replicated, and
+batches that are not a multiple of the number of devices are padded with extra environments
+that are masked out of losses and metrics.
+"""
+
+from typing import Optional
+
+import chex
+import jax
+import jax.numpy as jnp
+import numpy as np
+from jax.sharding import Mesh, NamedSharding, PartitionSpec
+
+AXIS_NAME = "devices"
+
+
+def make_mesh(num_devices: Optional[int] = None) -> Mesh:
+    """Builds a 1D mesh over the global devices, i.e. the devices of all processes.
+
+    Args:
+        num_devices: number of devices to use, defaults to all of them.
+    """
+    devices = jax.devices()
+    if num_devices is not None:
+        if not 0 < num_devices <= len(devices):
+            raise ValueError(
+                f"Expected num_devices to be in [1, {len(devices)}], got {num_devices}."
+            )
+        devices = devices[:num_devices]
+    return Mesh(np.array(devices), (AXIS_NAME,))
+
+
+def batch_sharding(mesh: Mesh) -> NamedSharding:
+    """Shards the leading (batch) axis over the mesh."""
+    return NamedSharding(mesh, PartitionSpec(AXIS_NAME))
+
+
+def replicated_sharding(mesh: Mesh) -> NamedSharding:
+    """Replicates the array on every device of the mesh."""
+    return NamedSharding(mesh, PartitionSpec())
+
+
+def padded_batch_size(batch_size: int, num_devices: int) -> int:
+    """Rounds `batch_size` up to the next multiple of `num_devices`."""
+    return -(-batch_size // num_devices) * num_devices
+
+
+def make_batch_mask(batch_size: int, num_devices: int) -> np.ndarray:
+    """Boolean mask of shape (padded_batch_size,) that is False for the padding environments."""
+    return np.arange(padded_batch_size(batch_size, num_devices)) < batch_size
+
+
+def masked_mean(x: chex.Array, mask: chex.Array, batch_axis: int = 0) -> chex.Array:
+    """Mean of `x` over all its axes, ignoring the entries whose index along `batch_axis` is
+    masked out. The mask is either a static numpy array or a traced one.
+    """
+    if isinstance(mask, np.ndarray) and mask.all():
+        return jnp.mean(x)
+    shape = [1] * jnp.ndim(x)
+    shape[batch_axis] = mask.shape[0]
+    return jnp.mean(x, where=jnp.broadcast_to(mask.reshape(shape), jnp.shape(x)))
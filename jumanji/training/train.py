@@ -12,24 +12,29 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import functools
+import contextlib
 import logging
-from typing import Dict, Tuple
+from typing import Callable, Dict, Optional, Tuple
 
 import hydra
 import jax
-import jax.numpy as jnp
 import omegaconf
 from tqdm.auto import trange
 
-from jumanji.training import utils
-from jumanji.training.agents.random import RandomAgent
+from jumanji.training import population, sharding, utils
+from jumanji.training.agents.a2c import A2CAgent
+from jumanji.training.evaluator import AsyncEvaluator
 from jumanji.training.loggers import TerminalLogger
+from jumanji.training.profiler import Profiler
 from jumanji.training.setup_train import (
+    setup_actor_learner,
     setup_agent,
     setup_env,
-    setup_evaluators,
+    setup_evaluator,
     setup_logger,
+    setup_mesh,
+    setup_population,
+    setup_recorder,
     setup_training_state,
 )
 from jumanji.training.timer import Timer
@@ -40,75 +45,160 @@ from jumanji.training.types import TrainingState
 def train(cfg: omegaconf.DictConfig, log_compiles: bool = False) -> None:
     logging.info(omegaconf.OmegaConf.to_yaml(cfg))
     logging.getLogger().setLevel(logging.INFO)
+    mesh = setup_mesh(cfg)
     logging.info({"devices": jax.local_devices()})
+    if mesh is not None:
+        logging.info({"mesh": mesh})
 
     key, init_key = jax.random.split(jax.random.PRNGKey(cfg.seed))
     logger = setup_logger(cfg)
     env = setup_env(cfg)
-    agent = setup_agent(cfg, env)
-    stochastic_eval, greedy_eval = setup_evaluators(cfg, agent)
-    training_state = setup_training_state(env, agent, init_key)
+    recorder = setup_recorder(cfg)
+    # In async mode, the learner records the trajectories it consumes rather than the actors.
+    agent = setup_agent(
+        cfg, env, mesh, recorder=None if cfg.parallelism.mode == "async" else recorder
+    )
+    evaluator = setup_evaluator(cfg, agent, mesh)
+    async_evaluator = AsyncEvaluator(evaluator) if cfg.async_evaluation else None
+    population_hyperparams = setup_population(cfg)
+    actor_learner = None
+    if cfg.parallelism.mode == "async":
+        population_size = 1
+        actor_learner = setup_actor_learner(cfg, env, agent, init_key, recorder)
+        training_state = actor_learner.training_state
+    elif population_hyperparams is None:
+        population_size = 1
+        training_state = setup_training_state(env, agent, init_key, mesh)
+    else:
+        assert isinstance(agent, A2CAgent)
+        learning_rates, l_ens = population_hyperparams
+        population_size = len(learning_rates)
+        training_state = population.setup_population_training_state(
+            env, agent, init_key, learning_rates, l_ens
+        )
     num_steps_per_epoch = (
         cfg.env.training.n_steps
         * cfg.env.training.total_batch_size
         * cfg.env.training.num_learner_steps_per_epoch
     )
-    eval_timer = Timer(out_var_name="metrics")
     train_timer = Timer(
-        out_var_name="metrics", num_steps_per_timing=num_steps_per_epoch
+        out_var_name="metrics",
+        num_steps_per_timing=num_steps_per_epoch * population_size,
     )
 
-    @functools.partial(jax.pmap, axis_name="devices")
-    def epoch_fn(training_state: TrainingState) -> Tuple[TrainingState, Dict]:
+    def run_epoch(training_state: TrainingState) -> Tuple[TrainingState, Dict]:
         training_state, metrics = jax.lax.scan(
             lambda training_state, _: agent.run_epoch(training_state),
             training_state,
             None,
             cfg.env.training.num_learner_steps_per_epoch,
         )
-        metrics = jax.tree_util.tree_map(jnp.mean, metrics)
+        metrics = utils.mean_epoch_metrics(metrics)
         return training_state, metrics
 
-    with jax.log_compiles(log_compiles), logger:
-        for i in trange(
-            cfg.env.training.num_epochs,
-            disable=isinstance(logger, TerminalLogger),
+    if population_hyperparams is not None:
+        run_epoch = jax.vmap(run_epoch)
+
+    epoch_fn: Callable[[TrainingState], Tuple[TrainingState, Dict]]
+    from_device: Callable[[Dict], Dict]
+    if actor_learner is not None:
+        # Waits for the learner thread, which consumes the actors' trajectories.
+        epoch_fn = lambda _: actor_learner.run_epoch(  # type: ignore
+            cfg.env.training.num_learner_steps_per_epoch
+        )
+        from_device = lambda x: x
+    elif mesh is None:
+        epoch_fn = jax.pmap(run_epoch, axis_name=sharding.AXIS_NAME)
+        from_device = utils.first_from_device
+    else:
+        # Keep the training state sharded as it was initialized, metrics are replicated.
+        state_shardings = jax.tree_util.tree_map(lambda x: x.sharding, training_state)
+        epoch_fn = jax.jit(
+            run_epoch,
+            in_shardings=(state_shardings,),
+            out_shardings=(state_shardings, sharding.replicated_sharding(mesh)),
+        )
+        from_device = lambda x: x
+
+    def write(metrics: Dict, label: str, env_steps: int) -> None:
+        metrics = from_device(metrics)
+        if population_hyperparams is None:
+            logger.write(data=metrics, label=label, env_steps=env_steps)
+            return
+        for member, member_metrics in enumerate(
+            population.unstack_metrics(metrics, population_size)
         ):
-            env_steps = i * num_steps_per_epoch
-
-            # Evaluation
-            key, stochastic_eval_key, greedy_eval_key = jax.random.split(key, 3)
-            # Stochastic evaluation
-            with eval_timer:
-                metrics = stochastic_eval.run_evaluation(
-                    training_state.params_state, stochastic_eval_key
-                )
-            logger.write(
-                data=utils.first_from_device(metrics),
-                label="eval_stochastic",
-                env_steps=env_steps,
-            )
-            if not isinstance(agent, RandomAgent):
-                # Greedy evaluation
-                with eval_timer:
-                    metrics = greedy_eval.run_evaluation(
-                        training_state.params_state, greedy_eval_key
-                    )
-                logger.write(
-                    data=utils.first_from_device(metrics),
-                    label="eval_greedy",
-                    env_steps=env_steps,
-                )
-
-            # Training
-            with train_timer:
-                training_state, metrics = epoch_fn(training_state)
             logger.write(
-                data=utils.first_from_device(metrics),
-                label="train",
+                data=member_metrics,
+                label=f"{label}_member_{member}",
                 env_steps=env_steps,
             )
 
+    def write_evaluation(
+        eval_metrics: Dict[str, Dict], env_steps: int, epoch: Optional[int] = None
+    ) -> None:
+        for mode, metrics in eval_metrics.items():
+            if epoch is not None:
+                metrics = {**metrics, "epoch": epoch}
+            write(metrics, f"eval_{mode}", env_steps)
+
+    profiler = Profiler(
+        trace_dir=cfg.profiler.trace_dir,
+        start_epoch=cfg.profiler.start_epoch,
+        end_epoch=cfg.profiler.end_epoch,
+    )
+
+    # The recorders are stopped after the threads and programs feeding them.
+    recorders = list(evaluator.recorders.values())
+    if recorder is not None and actor_learner is None:
+        recorders.append(recorder)
+
+    with jax.log_compiles(
+        log_compiles
+    ), logger, profiler, contextlib.ExitStack() as stack, (
+        actor_learner or contextlib.nullcontext()
+    ), (
+        async_evaluator or contextlib.nullcontext()
+    ):
+        for trajectory_recorder in recorders:
+            stack.enter_context(trajectory_recorder)
+        for i in trange(
+            cfg.env.training.num_epochs,
+            disable=isinstance(logger, TerminalLogger),
+        ):
+            with profiler.epoch(i):
+                env_steps = i * num_steps_per_epoch
+
+                # Evaluation
+                key, eval_key = jax.random.split(key)
+                if async_evaluator is None:
+                    # Stochastic and greedy evaluations, in a single compiled program, timed.
+                    with jax.profiler.TraceAnnotation("eval"):
+                        eval_metrics = evaluator.run_evaluation(
+                            training_state.params_state, eval_key
+                        )
+                    with jax.profiler.TraceAnnotation("logging"):
+                        write_evaluation(eval_metrics, env_steps)
+                else:
+                    # Evaluate the current params while training the next epoch, and log the
+                    # evaluations that completed meanwhile with the epoch they come from.
+                    with jax.profiler.TraceAnnotation("eval_submit"):
+                        async_evaluator.submit(
+                            (env_steps, i), training_state.params_state, eval_key
+                        )
+                    with jax.profiler.TraceAnnotation("logging"):
+                        for tag, eval_metrics in async_evaluator.results():
+                            write_evaluation(eval_metrics, *tag)
+
+                # Training
+                with train_timer, jax.profiler.TraceAnnotation("train"):
+                    training_state, metrics = epoch_fn(training_state)
+                with jax.profiler.TraceAnnotation("logging"):
+                    write(metrics, "train", env_steps)
+        if async_evaluator is not None:
+            for tag, eval_metrics in async_evaluator.results(wait=True):
+                write_evaluation(eval_metrics, *tag)
+
 
 if __name__ == "__main__":
     train()
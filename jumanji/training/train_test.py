@@ -0,0 +1,119 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import py
+import pytest
+from hydra import compose, initialize
+
+from jumanji.training import train as train_module
+from jumanji.training.loggers import Logger
+from jumanji.training.recorder import TrajectoryDataset
+from jumanji.training.types import Transition
+
+
+class LabelLogger(Logger):
+    """Keeps the data written under each label."""
+
+    def __init__(self) -> None:
+        super().__init__(save_checkpoint=False)
+        self.writes: List[Tuple[Optional[str], Dict[str, Any]]] = []
+
+    def write(
+        self,
+        data: Dict[str, Any],
+        label: Optional[str] = None,
+        env_steps: Optional[int] = None,
+    ) -> None:
+        self.writes.append((label, data))
+
+
+@pytest.mark.parametrize("async_evaluation", [False, True])
+def test_train__logs_evaluation_time(
+    monkeypatch: pytest.MonkeyPatch, async_evaluation: bool
+) -> None:
+    """Validate that the time of the evaluations is logged, whether they run in the training
+    loop or in the background.
+    """
+    with initialize(config_path="configs", version_base=None):
+        cfg = compose(
+            config_name="config.yaml",
+            overrides=[
+                "env=snake",
+                "agent=random",
+                f"async_evaluation={async_evaluation}",
+                "env.training.num_epochs=2",
+                "env.training.num_learner_steps_per_epoch=1",
+                "env.training.n_steps=2",
+                "env.training.total_batch_size=2",
+                "env.evaluation.eval_total_batch_size=2",
+            ],
+        )
+    logger = LabelLogger()
+    monkeypatch.setattr(train_module, "setup_logger", lambda cfg: logger)
+    train_module.train(cfg)
+    eval_metrics = [data for label, data in logger.writes if label == "eval_stochastic"]
+    assert len(eval_metrics) == 2
+    for metrics in eval_metrics:
+        assert metrics["time"] > 0
+
+
+@pytest.mark.parametrize("mode", ["pmap", "sharding"])
+def test_train__records_trajectories(
+    monkeypatch: pytest.MonkeyPatch, tmpdir: py.path.local, mode: str
+) -> None:
+    """Validate that the training trajectories and the evaluation episodes are recorded in the
+    synchronous modes.
+    """
+    record_dir, eval_record_dir = str(tmpdir.join("train")), str(tmpdir.join("eval"))
+    with initialize(config_path="configs", version_base=None):
+        cfg = compose(
+            config_name="config.yaml",
+            overrides=[
+                "env=snake",
+                "agent=a2c",
+                f"parallelism.mode={mode}",
+                f"record_dir={record_dir}",
+                f"eval_record_dir={eval_record_dir}",
+                "env.training.num_epochs=2",
+                "env.training.num_learner_steps_per_epoch=2",
+                "env.training.n_steps=3",
+                "env.training.total_batch_size=2",
+                "env.evaluation.eval_total_batch_size=2",
+                "env.evaluation.greedy_eval_total_batch_size=1",
+            ],
+        )
+    logger = LabelLogger()
+    monkeypatch.setattr(train_module, "setup_logger", lambda cfg: logger)
+    train_module.train(cfg)
+
+    dataset = TrajectoryDataset(record_dir)
+    assert len(dataset) == 2 * 2 * 3 * 2
+    transitions = dataset[np.arange(len(dataset))]
+    assert isinstance(transitions, Transition)
+    assert transitions.log_prob is None
+    assert transitions.action.shape == (len(dataset),)
+
+    for mode, num_episodes in [("stochastic", 2), ("greedy", 1)]:
+        eval_metrics = [
+            data for label, data in logger.writes if label == f"eval_{mode}"
+        ]
+        # Each epoch evaluates `num_episodes` episodes, and records each of their steps.
+        num_steps = sum(
+            num_episodes * float(metrics["episode_length"]) for metrics in eval_metrics
+        )
+        assert len(TrajectoryDataset(os.path.join(eval_record_dir, mode))) == num_steps
@@ -22,16 +22,22 @@ from jumanji.types import TimeStep
 
 
 class Transition(NamedTuple):
-    """Container for a transition."""
+    """Container for a transition. The log-probability and logits of the action are None in the
+    rollouts of agents that recompute them, e.g. A2C. With `StaticObservationWrapper`, the static
+    fields of the observations are None and `episode_key` and `next_episode_key` are the keys to
+    regenerate them from.
+    """
 
     observation: chex.ArrayTree
     action: chex.ArrayTree
     reward: chex.ArrayTree
     discount: chex.ArrayTree
     next_observation: chex.ArrayTree
-    log_prob: chex.ArrayTree
-    logits: chex.ArrayTree
-    extras: Optional[Dict]
+    log_prob: Optional[chex.ArrayTree] = None
+    logits: Optional[chex.ArrayTree] = None
+    extras: Optional[Dict] = None
+    episode_key: Optional[chex.PRNGKey] = None
+    next_episode_key: Optional[chex.PRNGKey] = None
 
 
 class ActorCriticParams(NamedTuple):
@@ -45,6 +51,8 @@ class ParamsState(NamedTuple):
     params: ActorCriticParams
     opt_state: optax.OptState
     update_count: float
+    # Loss coefficients overriding the agent's ones, e.g. {"l_en": ...} for population members.
+    hyperparams: Optional[Dict] = None
 
 
 class ActingState(NamedTuple):
@@ -12,14 +12,42 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import TypeVar
+from typing import Dict, TypeVar
 
 import chex
 import jax
+import jax.numpy as jnp
 
 T = TypeVar("T")
 
+# Metrics averaged over the episodes completed during a learner step rather than over its
+# transitions, NaN if no episode was completed. Their count is logged as `num_episodes`.
+EPISODE_STATISTICS = ("episode_return", "episode_length")
+
 
 def first_from_device(tree: T) -> T:
     squeeze_fn = lambda x: x[0] if isinstance(x, chex.Array) else x
     return jax.tree_util.tree_map(squeeze_fn, tree)  # type: ignore
+
+
+def mean_epoch_metrics(metrics: Dict) -> Dict:
+    """Averages metrics stacked along a leading axis of learner steps. Episode statistics are
+    averaged over all the episodes completed during the epoch, i.e. weighted by the number of
+    episodes of each learner step, `num_episodes` is summed and the other metrics, e.g. the
+    losses, are averaged over the learner steps.
+    """
+    metrics = dict(metrics)
+    mean_metrics = {}
+    if "num_episodes" in metrics:
+        num_episodes = metrics.pop("num_episodes")
+        total_num_episodes = jnp.sum(num_episodes)
+        for name in EPISODE_STATISTICS:
+            total = jnp.sum(
+                jnp.where(num_episodes > 0, metrics.pop(name), 0) * num_episodes
+            )
+            mean_metrics[name] = jnp.where(
+                total_num_episodes > 0, total / total_num_episodes, jnp.nan
+            )
+        mean_metrics["num_episodes"] = total_num_episodes
+    mean_metrics.update(jax.tree_util.tree_map(jnp.mean, metrics))
+    return mean_metrics
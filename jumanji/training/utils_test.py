@@ -0,0 +1,49 @@
+# Copyright 2022 InstaDeep Ltd. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import jax.numpy as jnp
+import numpy as np
+
+from jumanji.training.utils import mean_epoch_metrics
+
+
+def test_mean_epoch_metrics() -> None:
+    """Validate that episode statistics are weighted by the number of episodes of each learner
+    step, ignoring the NaN of steps without any episode, while losses are plainly averaged.
+    """
+    metrics = {
+        "total_loss": jnp.array([1.0, 2.0, 6.0]),
+        "episode_return": jnp.array([3.0, jnp.nan, 6.0]),
+        "episode_length": jnp.array([10.0, jnp.nan, 4.0]),
+        "num_episodes": jnp.array([1.0, 0.0, 2.0]),
+    }
+    mean_metrics = mean_epoch_metrics(metrics)
+    assert np.isclose(mean_metrics["total_loss"], 3.0)
+    assert np.isclose(mean_metrics["episode_return"], 5.0)
+    assert np.isclose(mean_metrics["episode_length"], 6.0)
+    assert mean_metrics["num_episodes"] == 3
+
+
+def test_mean_epoch_metrics__no_episode() -> None:
+    metrics = {
+        "total_loss": jnp.array([1.0, 2.0]),
+        "episode_return": jnp.array([jnp.nan, jnp.nan]),
+        "episode_length": jnp.array([jnp.nan, jnp.nan]),
+        "num_episodes": jnp.array([0.0, 0.0]),
+    }
+    mean_metrics = mean_epoch_metrics(metrics)
+    assert np.isclose(mean_metrics["total_loss"], 1.5)
+    assert np.isnan(mean_metrics["episode_return"])
+    assert mean_metrics["num_episodes"] == 0
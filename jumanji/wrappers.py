@@ -13,6 +13,7 @@
 # limitations under the License.
 
 from typing import (
+    TYPE_CHECKING,
     Any,
     Callable,
     ClassVar,
@@ -35,6 +36,11 @@ from jumanji import specs, tree_utils
 from jumanji.env import Environment, State
 from jumanji.types import TimeStep
 
+if TYPE_CHECKING:  # https://github.com/python/mypy/issues/6239
+    from dataclasses import dataclass
+else:
+    from chex import dataclass
+
 Observation = TypeVar("Observation")
 
 # Type alias that corresponds to ObsType in the Gym API
@@ -49,6 +55,7 @@ class Wrapper(Environment[State], Generic[State]):
     def __init__(self, env: Environment):
         super().__init__()
         self._env = env
+        self.static_observation_fields = env.static_observation_fields
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({repr(self._env)})"
@@ -122,14 +129,24 @@ class Wrapper(Environment[State], Generic[State]):
 class JumanjiToDMEnvWrapper(dm_env.Environment):
     """A wrapper that converts Environment to dm_env.Environment."""
 
-    def __init__(self, env: Environment, key: Optional[chex.PRNGKey] = None):
+    def __init__(
+        self,
+        env: Environment,
+        key: Optional[chex.PRNGKey] = None,
+        split_static_observation: bool = False,
+    ):
         """Create the wrapped environment.
 
         Args:
             env: `Environment`to wrap to a `dm_env.Environment`.
             key: optional key to initialize the `Environment` with.
+            split_static_observation: if True, the fields in `env.static_observation_fields`
+                are only returned by `reset`, they are set to None in the observations returned
+                by `step` and can be read from `static_observation`.
         """
         self._env = env
+        self.split_static_observation = split_static_observation
+        self.static_observation: Dict[str, Any] = {}
         if key is None:
             self._key = jax.random.PRNGKey(0)
         else:
@@ -160,6 +177,10 @@ class JumanjiToDMEnvWrapper(dm_env.Environment):
         """
         reset_key, self._key = jax.random.split(self._key)
         self._state, timestep = self._jitted_reset(reset_key)
+        if self.split_static_observation:
+            self.static_observation, _ = self._env.split_observation(
+                timestep.observation
+            )
         return dm_env.restart(observation=timestep.observation)
 
     def step(self, action: chex.ArrayNumpy) -> dm_env.TimeStep:
@@ -192,11 +213,14 @@ class JumanjiToDMEnvWrapper(dm_env.Environment):
                     specification returned by `observation_spec()`.
         """
         self._state, timestep = self._jitted_step(self._state, action)
+        observation = timestep.observation
+        if self.split_static_observation:
+            _, observation = self._env.split_observation(observation)
         return dm_env.TimeStep(
             step_type=timestep.step_type,
             reward=timestep.reward,
             discount=timestep.discount,
-            observation=timestep.observation,
+            observation=observation,
         )
 
     def observation_spec(self) -> dm_env.specs.Array:
@@ -512,6 +536,141 @@ class VmapAutoResetWrapper(Wrapper):
         return super().render(state_0)
 
 
+@dataclass
+class EpisodeStatisticsState:
+    """State of the `EpisodeStatisticsWrapper`.
+
+    env_state: state of the wrapped environment.
+    episode_return: return of the current episode so far.
+    episode_length: number of steps of the current episode so far.
+    """
+
+    env_state: Any
+    episode_return: chex.Array
+    episode_length: chex.Array
+
+    @property
+    def key(self) -> chex.PRNGKey:
+        """Key of the wrapped environment's state, used by the auto-reset wrappers."""
+        return self.env_state.key  # type: ignore
+
+
+class EpisodeStatisticsWrapper(Wrapper):
+    """Keeps track of the return and length of the current episode in the state, and adds the
+    following entries to the timestep's extras:
+    - `episode_done`: whether an episode ended at this timestep, i.e. `timestep.last()`.
+    - `episode_return`: return of the episode that ended, 0 if `episode_done` is False.
+    - `episode_length`: length of the episode that ended, 0 if `episode_done` is False.
+
+    Statistics are reset at the end of each episode, so the wrapper can be used within the
+    auto-reset wrappers, e.g. `VmapAutoResetWrapper(EpisodeStatisticsWrapper(env))`. Averages
+    over completed episodes are then given by `sum(episode_return) / sum(episode_done)`.
+    """
+
+    def reset(
+        self, key: chex.PRNGKey
+    ) -> Tuple[EpisodeStatisticsState, TimeStep[Observation]]:
+        state, timestep = self._env.reset(key)
+        episode_return = jnp.zeros_like(timestep.reward)
+        episode_length = jnp.zeros((), jnp.int32)
+        state = EpisodeStatisticsState(
+            env_state=state,
+            episode_return=episode_return,
+            episode_length=episode_length,
+        )
+        timestep = self._add_statistics(
+            timestep, jnp.zeros((), bool), episode_return, episode_length
+        )
+        return state, timestep
+
+    def step(
+        self, state: EpisodeStatisticsState, action: chex.Array
+    ) -> Tuple[EpisodeStatisticsState, TimeStep[Observation]]:
+        env_state, timestep = self._env.step(state.env_state, action)
+        episode_return = state.episode_return + timestep.reward
+        episode_length = state.episode_length + 1
+        done = timestep.last()
+        timestep = self._add_statistics(
+            timestep,
+            done,
+            jnp.where(done, episode_return, 0),
+            jnp.where(done, episode_length, 0),
+        )
+        state = EpisodeStatisticsState(
+            env_state=env_state,
+            episode_return=jnp.where(done, 0, episode_return),
+            episode_length=jnp.where(done, 0, episode_length),
+        )
+        return state, timestep
+
+    def render(self, state: EpisodeStatisticsState) -> Any:
+        return super().render(state.env_state)
+
+    def _add_statistics(
+        self,
+        timestep: TimeStep,
+        done: chex.Array,
+        episode_return: chex.Array,
+        episode_length: chex.Array,
+    ) -> TimeStep:
+        extras = dict(timestep.extras or {})
+        extras.update(
+            episode_done=done,
+            episode_return=episode_return,
+            episode_length=episode_length,
+        )
+        return timestep.replace(extras=extras)  # type: ignore
+
+
+@dataclass
+class StaticObservationState:
+    """State of the `StaticObservationWrapper`.
+
+    env_state: state of the wrapped environment.
+    episode_key: key the current episode was reset with.
+    """
+
+    env_state: Any
+    episode_key: chex.PRNGKey
+
+    @property
+    def key(self) -> chex.PRNGKey:
+        """Key of the wrapped environment's state, used by the auto-reset wrappers."""
+        return self.env_state.key  # type: ignore
+
+
+class StaticObservationWrapper(Wrapper):
+    """Keeps in the state the key each episode was reset with. Since `reset` is a deterministic
+    function of its key, the static part of the episode's observations (see
+    `Environment.static_observation_fields`) can be regenerated from this key with
+    `static_observation`, rather than being stored along with every step of a trajectory.
+    Can be used within the auto-reset wrappers.
+    """
+
+    def reset(
+        self, key: chex.PRNGKey
+    ) -> Tuple[StaticObservationState, TimeStep[Observation]]:
+        state, timestep = self._env.reset(key)
+        return StaticObservationState(env_state=state, episode_key=key), timestep
+
+    def step(
+        self, state: StaticObservationState, action: chex.Array
+    ) -> Tuple[StaticObservationState, TimeStep[Observation]]:
+        env_state, timestep = self._env.step(state.env_state, action)
+        return state.replace(env_state=env_state), timestep  # type: ignore
+
+    def static_observation(self, episode_key: chex.PRNGKey) -> Dict[str, Any]:
+        """Regenerates the static part of the observations of the episode reset with
+        `episode_key` (unbatched).
+        """
+        _, timestep = self._env.reset(episode_key)
+        static_observation, _ = self.split_observation(timestep.observation)
+        return static_observation
+
+    def render(self, state: StaticObservationState) -> Any:
+        return super().render(state.env_state)
+
+
 class JumanjiToGymWrapper(gym.Env):
     """A wrapper that converts a Jumanji `Environment` to one that follows the `gym.Env` API."""
 
@@ -519,15 +678,27 @@ class JumanjiToGymWrapper(gym.Env):
     # `_reset` as signs of a deprecated gym Env API.
     _gym_disable_underscore_compat: ClassVar[bool] = True
 
-    def __init__(self, env: Environment, seed: int = 0, backend: Optional[str] = None):
+    def __init__(
+        self,
+        env: Environment,
+        seed: int = 0,
+        backend: Optional[str] = None,
+        split_static_observation: bool = False,
+    ):
         """Create the Gym environment.
 
         Args:
             env: `Environment` to wrap to a `gym.Env`.
             seed: the seed that is used to initialize the environment's PRNG.
             backend: the XLA backend.
+            split_static_observation: if True, the fields in `env.static_observation_fields`
+                are left out of the observations (and of `observation_space`). They are
+                transferred to the host once per episode, at reset, and can be read from
+                `static_observation`, whose space is `static_observation_space`.
         """
         self._env = env
+        self.split_static_observation = split_static_observation
+        self.static_observation: Dict[str, Any] = {}
         self.metadata: Dict[str, str] = {}
         self._key = jax.random.PRNGKey(seed)
         self.backend = backend
@@ -535,6 +706,23 @@ class JumanjiToGymWrapper(gym.Env):
         self.observation_space = specs.jumanji_specs_to_gym_spaces(
             self._env.observation_spec()
         )
+        self.static_observation_space = gym.spaces.Dict()
+        if self.split_static_observation:
+            static_fields = self._env.static_observation_fields
+            self.static_observation_space = gym.spaces.Dict(
+                {
+                    key: space
+                    for key, space in self.observation_space.spaces.items()
+                    if key in static_fields
+                }
+            )
+            self.observation_space = gym.spaces.Dict(
+                {
+                    key: space
+                    for key, space in self.observation_space.spaces.items()
+                    if key not in static_fields
+                }
+            )
         self.action_space = specs.jumanji_specs_to_gym_spaces(self._env.action_spec())
 
         def reset(key: chex.PRNGKey) -> Tuple[State, Observation, Optional[Dict]]:
@@ -550,7 +738,10 @@ class JumanjiToGymWrapper(gym.Env):
             """Step function of a Jumanji environment to be jitted."""
             state, timestep = self._env.step(state, action)
             done = jnp.bool_(timestep.last())
-            return state, timestep.observation, timestep.reward, done, timestep.extras
+            observation = timestep.observation
+            if self.split_static_observation:
+                _, observation = self._env.split_observation(observation)
+            return state, observation, timestep.reward, done, timestep.extras
 
         self._step = jax.jit(step, backend=self.backend)
 
@@ -572,6 +763,9 @@ class JumanjiToGymWrapper(gym.Env):
             self.seed(seed)
         key, self._key = jax.random.split(self._key)
         self._state, obs, extras = self._reset(key)
+        if self.split_static_observation:
+            static_observation, obs = self._env.split_observation(obs)
+            self.static_observation = jumanji_to_gym_obs(static_observation)
 
         # Convert the observation to a numpy array or a nested dict thereof
         obs = jumanji_to_gym_obs(obs)
@@ -642,10 +836,17 @@ def jumanji_to_gym_obs(observation: Observation) -> GymObservation:
             either have the `__dict__` or `_asdict` methods implemented.
 
     Returns:
-        Numpy array or nested dictionary of numpy arrays.
+        Numpy array or nested dictionary of numpy arrays. Fields set to None, e.g. static
+        fields removed by `Environment.split_observation`, are left out.
     """
     if isinstance(observation, chex.Array):
         return np.asarray(observation)
+    elif isinstance(observation, dict):
+        return {
+            key: jumanji_to_gym_obs(value)
+            for key, value in observation.items()
+            if value is not None
+        }
     elif hasattr(observation, "__dict__"):
         # Applies to various containers including `chex.dataclass`
         return {
@@ -656,6 +857,7 @@ def jumanji_to_gym_obs(observation: Observation) -> GymObservation:
         return {
             key: jumanji_to_gym_obs(value)
             for key, value in observation._asdict().items()  # type: ignore
+            if value is not None
         }
     else:
         raise NotImplementedError(
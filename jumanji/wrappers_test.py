@@ -28,14 +28,20 @@ from jumanji import specs
 from jumanji.env import Environment
 from jumanji.environments.packing.bin_pack import conftest as bin_pack_conftest
 from jumanji.environments.packing.bin_pack.env import BinPack
+from jumanji.environments.packing.knapsack import Knapsack
+from jumanji.environments.routing.tsp import TSP
 from jumanji.testing.fakes import FakeEnvironment, FakeMultiEnvironment, FakeState
 from jumanji.testing.pytrees import assert_trees_are_different
 from jumanji.types import StepType, TimeStep
 from jumanji.wrappers import (
     AutoResetWrapper,
+    EpisodeStatisticsState,
+    EpisodeStatisticsWrapper,
     JumanjiToDMEnvWrapper,
     JumanjiToGymWrapper,
     MultiToSingleWrapper,
+    StaticObservationState,
+    StaticObservationWrapper,
     VmapAutoResetWrapper,
     VmapWrapper,
     Wrapper,
@@ -715,6 +721,168 @@ class TestVmapAutoResetWrapper:
         assert fake_vmap_auto_reset_environment._env is fake_environment
 
 
+class TestEpisodeStatisticsWrapper:
+    @pytest.fixture
+    def fake_episode_statistics_environment(
+        self, fake_environment: FakeEnvironment
+    ) -> EpisodeStatisticsWrapper:
+        class UnitRewardWrapper(Wrapper[FakeState]):
+            def step(
+                self, state: FakeState, action: chex.Array
+            ) -> Tuple[FakeState, TimeStep]:
+                state, timestep = self._env.step(state, action)
+                return state, timestep.replace(  # type: ignore
+                    reward=jnp.ones_like(timestep.reward)
+                )
+
+        fake_environment.time_limit = 3
+        return EpisodeStatisticsWrapper(UnitRewardWrapper(fake_environment))
+
+    def test_episode_statistics_wrapper__reset(
+        self,
+        fake_episode_statistics_environment: EpisodeStatisticsWrapper,
+        key: chex.PRNGKey,
+    ) -> None:
+        """Validates that the statistics start at 0 and are added to the extras."""
+        state, timestep = jax.jit(fake_episode_statistics_environment.reset)(key)
+        assert isinstance(state, EpisodeStatisticsState)
+        assert state.episode_return == 0 and state.episode_length == 0
+        assert set(timestep.extras) == {
+            "episode_done",
+            "episode_return",
+            "episode_length",
+        }
+        assert not timestep.extras["episode_done"]
+
+    def test_episode_statistics_wrapper__step(
+        self,
+        fake_episode_statistics_environment: EpisodeStatisticsWrapper,
+        key: chex.PRNGKey,
+    ) -> None:
+        """Validates that the completed episode statistics are only emitted on the last step
+        and that the running statistics are then reset.
+        """
+        state, _ = fake_episode_statistics_environment.reset(key)
+        action = fake_episode_statistics_environment.action_spec().generate_value()
+        step_fn = jax.jit(fake_episode_statistics_environment.step)
+        for step in range(1, 3):
+            state, timestep = step_fn(state, action)
+            assert state.episode_return == state.episode_length == step
+            assert not timestep.extras["episode_done"]
+            assert timestep.extras["episode_return"] == 0
+        state, timestep = step_fn(state, action)
+        assert timestep.last()
+        assert timestep.extras["episode_done"]
+        assert (
+            timestep.extras["episode_return"] == timestep.extras["episode_length"] == 3
+        )
+        assert state.episode_return == state.episode_length == 0
+
+    def test_episode_statistics_wrapper__vmap_auto_reset(
+        self,
+        fake_episode_statistics_environment: EpisodeStatisticsWrapper,
+        keys: chex.PRNGKey,
+    ) -> None:
+        """Validates that the wrapper can be auto-reset, keeping the extras of the last step."""
+        env = VmapAutoResetWrapper(fake_episode_statistics_environment)
+        state, _ = env.reset(keys)
+        action = jax.vmap(lambda _: env.action_spec().generate_value())(keys)
+        for _ in range(3):
+            state, timestep = jax.jit(env.step)(state, action)
+        assert jnp.all(timestep.first())
+        assert jnp.all(timestep.extras["episode_done"])
+        assert jnp.all(timestep.extras["episode_length"] == 3)
+        assert jnp.all(state.episode_length == 0)
+
+
+class TestStaticObservation:
+    @pytest.fixture
+    def tsp_env(self) -> TSP:
+        return TSP(num_cities=5)
+
+    def test_environment__split_and_merge_observation(
+        self, tsp_env: TSP, key: chex.PRNGKey
+    ) -> None:
+        """Validates that merging the split observation gives back the observation."""
+        _, timestep = tsp_env.reset(key)
+        static_observation, dynamic_observation = tsp_env.split_observation(
+            timestep.observation
+        )
+        assert set(static_observation) == {"coordinates"}
+        assert dynamic_observation.coordinates is None
+        chex.assert_trees_all_equal(
+            tsp_env.merge_observation(static_observation, dynamic_observation),
+            timestep.observation,
+        )
+
+    def test_static_observation_wrapper__static_observation(
+        self, tsp_env: TSP, keys: chex.PRNGKey
+    ) -> None:
+        """Validates that the static observation can be regenerated from the episode key after
+        steps and auto-resets.
+        """
+        env = VmapAutoResetWrapper(StaticObservationWrapper(tsp_env))
+        assert env.static_observation_fields == ("coordinates",)
+        state, timestep = env.reset(keys)
+        assert isinstance(state, StaticObservationState)
+        step_fn = jax.jit(env.step)
+        for action in range(tsp_env.num_cities + 2):
+            state, timestep = step_fn(state, jnp.full(keys.shape[0], action))
+        assert jnp.all(timestep.mid())
+        static_observation = jax.vmap(env.static_observation)(state.episode_key)
+        chex.assert_trees_all_equal(
+            static_observation["coordinates"], timestep.observation.coordinates
+        )
+
+    def test_dm_env__split_static_observation(
+        self, tsp_env: TSP, key: chex.PRNGKey
+    ) -> None:
+        """Validates that the static fields are only returned at reset."""
+        dm_environment = JumanjiToDMEnvWrapper(
+            tsp_env, key=key, split_static_observation=True
+        )
+        first_timestep = dm_environment.reset()
+        timestep = dm_environment.step(jnp.array(0))
+        assert timestep.observation.coordinates is None
+        chex.assert_trees_all_equal(
+            dm_environment.static_observation["coordinates"],
+            first_timestep.observation.coordinates,
+        )
+
+    def test_gym_env__split_static_observation(self, tsp_env: TSP) -> None:
+        """Validates that the static fields are left out of the observations and of the
+        observation space, and are only read at reset.
+        """
+        gym_environment = JumanjiToGymWrapper(tsp_env, split_static_observation=True)
+        first_observation = gym_environment.reset()
+        observation, *_ = gym_environment.step(np.array(0))
+        assert "coordinates" not in first_observation
+        assert "coordinates" not in observation
+        assert "coordinates" not in gym_environment.observation_space.spaces
+        assert "coordinates" in gym_environment.static_observation_space.spaces
+        full_observation = JumanjiToGymWrapper(tsp_env).reset()
+        np.testing.assert_array_equal(
+            gym_environment.static_observation["coordinates"],
+            full_observation["coordinates"],
+        )
+
+    def test_gym_env__split_static_observation_space(self) -> None:
+        """Validates that the observations and the static observation belong to their spaces."""
+        knapsack = Knapsack(num_items=5, total_budget=2.0)
+        gym_environment = JumanjiToGymWrapper(knapsack, split_static_observation=True)
+        observation = gym_environment.reset()
+        assert set(gym_environment.static_observation_space.spaces) == {
+            "weights",
+            "values",
+        }
+        assert gym_environment.observation_space.contains(observation)
+        assert gym_environment.static_observation_space.contains(
+            gym_environment.static_observation
+        )
+        observation, *_ = gym_environment.step(np.array(0))
+        assert gym_environment.observation_space.contains(observation)
+
+
 class TestJumanjiToGymObservation:
     """Tests for checking the behaviour of jumanji_to_gym_obs."""
 